@@ -3,27 +3,59 @@
 import datetime
 import operator
 import os
-from typing import Annotated, TypedDict
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Annotated, Optional, TypedDict
 
 from dotenv import load_dotenv
+from langchain_core.callbacks import dispatch_custom_event
 from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage, ToolMessage
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
 
-from agents.tools.flights_finder import flights_finder
+from agents.checkpoints import make_checkpointer
+from agents.destinations import day_heading, get_destination
+from agents.email_template import render_email_html, render_text_email_html
+from agents.itinerary import DateOption, Itinerary, TripOption, flights_markdown, hotels_markdown, render_markdown
+from agents.llm import get_email_llm, get_tools_llm
+from agents.query_parser import DEFAULT_NIGHTS, TravelQuery, parse_query
+from agents.streaming import ITINERARY_PROGRESS_EVENT, ITINERARY_SECTION_EVENT
+from agents.tools.flights_finder import flights_finder, search_flights
 from agents.tools.hotels_finder import hotels_finder
-from agents.tools.airport_lookup import airport_code_lookup
+from agents.tools.airport_index import get_airport_index
+from agents.tools.airport_lookup import airport_code_lookup, airport_codes_lookup, metro_airports, resolve_airports
 
 _ = load_dotenv()
 
 CURRENT_YEAR = datetime.datetime.now().year
 
+# Upper bound for a single tool call (airport lookup, flights or hotels search)
+# when the tools are fanned out in parallel by `invoke_tools`.
+TOOL_TIMEOUT_SECONDS = float(os.getenv('TOOL_TIMEOUT_SECONDS', '30'))
+
+# A parsed query skips the tool-calling LLM only if both cities resolve at least this well.
+FAST_PATH_MIN_CONFIDENCE = 0.8
+
+# Set EMAIL_RENDERER=llm to have GPT-4o write the email HTML instead of the template.
+LLM_EMAIL = os.getenv('EMAIL_RENDERER', 'template').lower() == 'llm'
+
+# One Agent serves every session, so its tool pool is sized for concurrent searches.
+TOOL_WORKERS = int(os.getenv('TOOL_WORKERS', '16'))
+
+# Date combinations listed for flexible-dates queries ("cheapest week in October").
+CHEAPEST_DATES = 3
+
+# Set PRINT_AGENT_GRAPH=1 to print the graph's mermaid diagram when an Agent is built.
+PRINT_GRAPH = os.getenv('PRINT_AGENT_GRAPH', '0') == '1'
+
 
 class AgentState(TypedDict):
     messages: Annotated[list[AnyMessage], operator.add]
+    # TravelQuery.to_dict() from the local parser, set by the `parse_query` node
+    query: Optional[dict]
 
 
 TOOLS_SYSTEM_PROMPT = f"""You are a smart travel agency. Use the tools to look up information.
@@ -39,7 +71,7 @@ TOOLS_SYSTEM_PROMPT = f"""You are a smart travel agency. Use the tools to look u
     Total: $3,488
     """
 
-TOOLS = [flights_finder, hotels_finder, airport_code_lookup]
+TOOLS = [flights_finder, hotels_finder, airport_code_lookup, airport_codes_lookup]
 
 EMAILS_SYSTEM_PROMPT = """Your task is to convert structured markdown-like text into a valid HTML email body.
 
@@ -122,274 +154,217 @@ Expected Output:
 
 class Agent:
 
-    def __init__(self):
+    def __init__(self, parallel_tools=True, tool_timeout=TOOL_TIMEOUT_SECONDS, metro_search=True, llm_email=LLM_EMAIL,
+                 fast_path=True, checkpointer=None):
         self._tools = {t.name: t for t in TOOLS}
-        from langchain_groq import ChatGroq
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        if not groq_api_key:
-            raise ValueError("GROQ_API_KEY not found in environment variables. Please add it to your .env file.")
-        self._tools_llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            groq_api_key=groq_api_key,
-            temperature=0.3
-        ).bind_tools(TOOLS)
+        # Complete, unambiguous queries go straight to `invoke_tools` without the LLM round trip.
+        self._fast_path = fast_path
+        self._route_counts = Counter()
+        self._route_lock = threading.Lock()
+        # Emails are rendered from a template; the GPT-4o conversion is opt-in.
+        self._llm_email = llm_email
+        # Search all airports of a metro area (e.g. LHR,LGW,STN) in a single flights request.
+        self._metro_search = metro_search
+        # In parallel mode the independent lookups and searches in `invoke_tools`
+        # run on a thread pool; otherwise they run one after the other.
+        self._tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix='tools') if parallel_tools else None
+        self._tool_timeout = tool_timeout
+        # Shared by all agents; the graph below keeps no per-session state outside the checkpointer
+        self._tools_llm = get_tools_llm(TOOLS)
 
         builder = StateGraph(AgentState)
+        builder.add_node('parse_query', self.parse_query)
         builder.add_node('call_tools_llm', self.call_tools_llm)
         builder.add_node('invoke_tools', self.invoke_tools)
         builder.add_node('email_sender', self.email_sender)
-        builder.set_entry_point('call_tools_llm')
+        builder.set_entry_point('parse_query')
+        builder.add_conditional_edges('parse_query', self.route_query, {'fast_path': 'invoke_tools', 'llm': 'call_tools_llm'})
         # Only call tools once, then go to email_sender or END
         builder.add_conditional_edges('call_tools_llm', Agent.exists_action, {'more_tools': 'invoke_tools', 'email_sender': 'email_sender'})
         builder.add_edge('invoke_tools', 'email_sender')
         builder.add_edge('email_sender', END)
-        memory = MemorySaver()
-        self.graph = builder.compile(checkpointer=memory, interrupt_before=['email_sender'])
-        print(self.graph.get_graph().draw_mermaid())
+        # Bounded (TTL + LRU) so per-search threads don't accumulate for the life of the process
+        self.checkpointer = checkpointer if checkpointer is not None else make_checkpointer()
+        self.graph = builder.compile(checkpointer=self.checkpointer, interrupt_before=['email_sender'])
+        if PRINT_GRAPH:
+            print(self.draw_mermaid())
+
+    def draw_mermaid(self):
+        """Mermaid diagram of the compiled graph (rendered on request; it is slow to lay out)."""
+        return self.graph.get_graph().draw_mermaid()
 
     def format_travel_itinerary(self, flights_result, hotels_result):
-        # Format flights
-        flights_info = ""
-        # Handle list, dict, or string
-        if isinstance(flights_result, list) and flights_result:
-            flights_info += "\n✈️ FLIGHTS\n\n"
-            for idx, flight_option in enumerate(flights_result, start=1):
-                flights_info += f"<div style=\"font-weight:700;font-size:1.15em;\">Option {idx}:</div>\n"
-                # flight_price = flight_option.get('price', 'N/A')
-                # flight_currency = flight_option.get('currency', 'USD')
-                # flights_info += f"- Price: {flight_price} {flight_currency}\n"
-
-                for f in flight_option.get('flights', []):
-                    departure_airport = f.get('departure_airport', {})
-                    arrival_airport = f.get('arrival_airport', {})
-                    airline = f.get('airline', 'Unknown Airline')
-                    airline_logo_url = f.get('airline_logo', '')
-                    flight_number = f.get('flight_number', '')
-                    departure_time = departure_airport.get('time', '').split(' ')[1] if departure_airport.get('time') else ''
-                    arrival_time = arrival_airport.get('time', '').split(' ')[1] if arrival_airport.get('time') else ''
-                    outbound_date = departure_airport.get('time', '').split(' ')[0] if departure_airport.get('time') else ''
-                    
-                    flights_info += f"  - {airline} {flight_number} from {departure_airport.get('name', '')} ({departure_airport.get('id', '')}) at {departure_time} to {arrival_airport.get('name', '')} ({arrival_airport.get('id', '')}) at {arrival_time} on {outbound_date}\n"
-                    if airline_logo_url:
-                        flights_info += f"    <img src=\"{airline_logo_url}\" alt=\"{airline}\" width=\"70\" height=\"70\"><br>\n"
-
-                # Link for the entire flight option
-                if 'google_flights_url' in flight_option:
-                    flights_info += f"  [Book on Google Flights]({flight_option['google_flights_url']})\n"
-                elif 'link' in flight_option:
-                    flights_info += f"  [Book]({flight_option['link']})\n"
-
-        elif isinstance(flights_result, dict):
-            flights_info += "\n✈️ FLIGHTS\n\n"
-            # Assuming a single flight result directly has the structure of a flight_option, with a 'flights' list
-            flight_price = flights_result.get('price', 'N/A')
-            flight_currency = flights_result.get('currency', 'USD')
-            flights_info += f"- Price: {flight_price} {flight_currency}\n"
-
-            for flight_leg in flights_result.get('flights', []):
-                departure_airport = flight_leg.get('departure_airport', {})
-                arrival_airport = flight_leg.get('arrival_airport', {})
-                airline = flight_leg.get('airline', 'Unknown Airline')
-                airline_logo_url = flight_leg.get('airline_logo', '')
-                flight_number = flight_leg.get('flight_number', '')
-                departure_time = departure_airport.get('time', '').split(' ')[1] if departure_airport.get('time') else ''
-                arrival_time = arrival_airport.get('time', '').split(' ')[1] if arrival_airport.get('time') else ''
-                outbound_date = departure_airport.get('time', '').split(' ')[0] if departure_airport.get('time') else ''
-
-                flights_info += f"  - {airline} {flight_number} from {departure_airport.get('name', '')} ({departure_airport.get('id', '')}) at {departure_time} to {arrival_airport.get('name', '')} ({arrival_airport.get('id', '')}) at {arrival_time} on {outbound_date}\n"
-                if airline_logo_url:
-                    flights_info += f"    <img src=\"{airline_logo_url}\" alt=\"{airline}\" width=\"70\" height=\"70\"><br>\n"
-            
-            if 'google_flights_url' in flights_result:
-                flights_info += f"  [Book on Google Flights]({flights_result['google_flights_url']})\n"
-            elif 'link' in flights_result:
-                flights_info += f"  [Book]({flights_result['link']})\n"
-        elif isinstance(flights_result, str):
-            flights_info += f"Flights: {flights_result}\n"
-        else:
-            flights_info += "No flights found.\n"
-
-        # Format hotels
-        hotels_info = ""
-        if isinstance(hotels_result, list) and hotels_result:
-            hotels_info += "\n🏨 HOTELS\n\n"
-            for idx, h in enumerate(hotels_result, start=1):
-                hotels_info += f"\n<div style=\"font-weight:700;font-size:1.15em;\">Option {idx}:</div>\n"
-                hotels_info += f"Hotel: {h.get('name', 'Unknown Hotel')}\n"
-                hotels_info += f"Description: {h.get('description', '')}\n"
-                hotels_info += f"Class: {h.get('hotel_class', '')}\n"
-                hotels_info += f"Rating: {h.get('overall_rating', 'N/A')}/5 ({h.get('reviews', 'N/A')} reviews)\n"
-                hotels_info += f"Check-in: {h.get('check_in_time', '')}, Check-out: {h.get('check_out_time', '')}\n"
-                if 'rate_per_night' in h and isinstance(h['rate_per_night'], dict):
-                    hotels_info += f"Rate per night: {h['rate_per_night'].get('extracted_lowest', h['rate_per_night'].get('lowest', 'N/A'))}\n"
-                elif 'rate_per_night' in h:
-                    hotels_info += f"Rate per night: {h['rate_per_night']}\n"
-                if 'total_rate' in h and isinstance(h['total_rate'], dict):
-                    hotels_info += f"Total rate: {h['total_rate'].get('extracted_lowest', h['total_rate'].get('lowest', 'N/A'))}\n"
-                elif 'total_rate' in h:
-                    hotels_info += f"Total rate: {h['total_rate']}\n"
-                if 'amenities' in h:
-                    hotels_info += f"Amenities: {', '.join(h['amenities'])}\n"
-                if 'nearby_places' in h:
-                    hotels_info += "Nearby places:\n"
-                    for place in h['nearby_places']:
-                        hotels_info += f"  - {place.get('name', '')}: "
-                        if 'transportations' in place:
-                            transports = [f"{t['type']} ({t['duration']})" for t in place['transportations']]
-                            hotels_info += ", ".join(transports)
-                        hotels_info += "\n"
-                hotel_link = h.get('link', '')
-                if hotel_link:
-                    hotels_info += f"Website: <a href=\"{hotel_link}\">{hotel_link}</a>\n"
-        elif isinstance(hotels_result, dict):
-            hotels_info += "\n🏨 HOTELS\n\n"
-            h = hotels_result
-            hotels_info += f"\nHotel: {h.get('name', 'Unknown Hotel')}\n"
-            hotels_info += f"Description: {h.get('description', '')}\n"
-            hotels_info += f"Class: {h.get('hotel_class', '')}\n"
-            hotels_info += f"Rating: {h.get('overall_rating', 'N/A')}/5 ({h.get('reviews', 'N/A')} reviews)\n"
-            hotels_info += f"Check-in: {h.get('check_in_time', '')}, Check-out: {h.get('check_out_time', '')}\n"
-            if 'rate_per_night' in h and isinstance(h['rate_per_night'], dict):
-                hotels_info += f"Rate per night: {h['rate_per_night'].get('extracted_lowest', h['rate_per_night'].get('lowest', 'N/A'))}\n"
-            elif 'rate_per_night' in h:
-                hotels_info += f"Rate per night: {h['rate_per_night']}\n"
-            if 'total_rate' in h and isinstance(h['total_rate'], dict):
-                hotels_info += f"Total rate: {h['total_rate'].get('extracted_lowest', h['total_rate'].get('lowest', 'N/A'))}\n"
-            elif 'total_rate' in h:
-                hotels_info += f"Total rate: {h['total_rate']}\n"
-            if 'amenities' in h:
-                hotels_info += f"Amenities: {', '.join(h['amenities'])}\n"
-            if 'nearby_places' in h:
-                hotels_info += "Nearby places:\n"
-                for place in h['nearby_places']:
-                    hotels_info += f"  - {place.get('name', '')}: "
-                    if 'transportations' in place:
-                        transports = [f"{t['type']} ({t['duration']})" for t in place['transportations']]
-                        hotels_info += ", ".join(transports)
-                    hotels_info += "\n"
-            hotel_link = h.get('link', '')
-            if hotel_link:
-                hotels_info += f"Website: <a href=\"{hotel_link}\">{hotel_link}</a>\n"
-        elif isinstance(hotels_result, str):
-            hotels_info += f"Hotels: {hotels_result}\n"
-        else:
-            hotels_info += "No hotels found.\n"
+        itinerary = Itinerary()
+        itinerary.set_flights(flights_result)
+        itinerary.set_hotels(hotels_result)
+        return render_markdown(itinerary)
+
+    def format_flights(self, flights_result):
+        itinerary = Itinerary()
+        itinerary.set_flights(flights_result)
+        return flights_markdown(itinerary)
 
-        return flights_info + "\n" + hotels_info
+    def format_hotels(self, hotels_result):
+        itinerary = Itinerary()
+        itinerary.set_hotels(hotels_result)
+        return hotels_markdown(itinerary)
 
     def create_daily_itinerary(self, departure_city, arrival_city, check_in_date, check_out_date, hotel_info=None):
         """
-        Create a detailed daily itinerary with time-wise planning for each day of the trip.
+        Create a detailed daily itinerary with time-wise planning for each day of the trip,
+        from the destination's pre-rendered day schedules (see agents.destinations).
         """
         try:
-            from datetime import datetime, timedelta
-            
-            # Parse dates
-            if isinstance(check_in_date, str):
-                check_in = datetime.strptime(check_in_date, "%Y-%m-%d")
-            else:
-                check_in = check_in_date
-                
-            if isinstance(check_out_date, str):
-                check_out = datetime.strptime(check_out_date, "%Y-%m-%d")
-            else:
-                check_out = check_out_date
-            
-            # Calculate number of days
+            check_in = datetime.datetime.strptime(check_in_date, "%Y-%m-%d") if isinstance(check_in_date, str) else check_in_date
+            check_out = datetime.datetime.strptime(check_out_date, "%Y-%m-%d") if isinstance(check_out_date, str) else check_out_date
             num_days = (check_out - check_in).days
-            
-            itinerary = f"\n🗓️ **DAILY ITINERARY FOR {arrival_city.upper()}**\n"
-            itinerary += f"📅 Trip Duration: {num_days} days ({check_in.strftime('%B %d, %Y')} - {check_out.strftime('%B %d, %Y')})\n\n"
-            
-            # Generate itinerary for each day
-            for day in range(num_days):
-                current_date = check_in + timedelta(days=day)
-                day_number = day + 1
-                
-                itinerary += f"## 📅 **DAY {day_number} - {current_date.strftime('%A, %B %d, %Y')}**\n\n"
-                
-                if day == 0:  # Arrival day
-                    itinerary += self._get_arrival_day_schedule(arrival_city, current_date)
-                elif day == num_days - 1:  # Departure day
-                    itinerary += self._get_departure_day_schedule(departure_city, current_date)
-                else:  # Full days
-                    itinerary += self._get_full_day_schedule(arrival_city, current_date, day_number)
-                
-                itinerary += "\n---\n\n"
-            
-            return itinerary
-            
-        except Exception as e:
+        except (TypeError, ValueError) as e:
             print(f"Error creating itinerary: {e}")
             return f"\n🗓️ **Daily Itinerary for {arrival_city}**\n\nUnable to generate detailed itinerary due to date parsing error."
 
-    def _get_arrival_day_schedule(self, city, date):
-        """Generate schedule for arrival day"""
-        return f"""**🌅 MORNING (8:00 AM - 12:00 PM)**
-- 8:00 AM: Arrive at airport
-- 9:00 AM: Immigration & baggage claim
-- 10:00 AM: Airport transfer to hotel
-- 11:00 AM: Hotel check-in and freshen up
-
-**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
-- 12:00 PM: Lunch at local restaurant
-- 2:00 PM: Explore {city} city center
-- 4:00 PM: Visit local market or shopping area
-- 5:00 PM: Coffee break at café
-
-**🌙 EVENING (6:00 PM - 10:00 PM)**
-- 6:00 PM: Return to hotel
-- 7:00 PM: Dinner at hotel or nearby restaurant
-- 9:00 PM: Relax and prepare for next day
-- 10:00 PM: Early rest for tomorrow's adventures"""
-
-    def _get_departure_day_schedule(self, departure_city, date):
-        """Generate schedule for departure day"""
-        return f"""**🌅 MORNING (8:00 AM - 12:00 PM)**
-- 8:00 AM: Hotel check-out
-- 9:00 AM: Final shopping or last-minute sightseeing
-- 10:00 AM: Return to hotel for luggage
-- 11:00 AM: Airport transfer
-
-**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
-- 12:00 PM: Arrive at airport
-- 1:00 PM: Check-in and security
-- 2:00 PM: Duty-free shopping or airport lounge
-- 3:00 PM: Boarding for flight to {departure_city}
-
-**🌙 EVENING (6:00 PM - 10:00 PM)**
-- 6:00 PM: In-flight meal and entertainment
-- 8:00 PM: Rest on flight
-- 10:00 PM: Arrival at {departure_city}"""
-
-    def _get_full_day_schedule(self, city, date, day_number):
-        """Generate schedule for full days"""
-        activities = {
-            1: ["Visit main historical sites", "Explore local museums", "City walking tour"],
-            2: ["Day trip to nearby attractions", "Local food tour", "Cultural experiences"],
-            3: ["Nature and outdoor activities", "Shopping districts", "Local entertainment"],
-            4: ["Hidden gems and local spots", "Relaxation activities", "Evening entertainment"],
-            5: ["Adventure activities", "Photography spots", "Local festivals or events"]
-        }
-        
-        day_activities = activities.get(day_number, ["Explore local attractions", "Visit recommended spots", "Enjoy local culture"])
-        
-        return f"""**🌅 MORNING (8:00 AM - 12:00 PM)**
-- 8:00 AM: Hotel breakfast
-- 9:00 AM: {day_activities[0]}
-- 11:00 AM: Coffee break and rest
-
-**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
-- 12:00 PM: Local lunch
-- 2:00 PM: {day_activities[1]}
-- 4:00 PM: {day_activities[2]}
-- 5:30 PM: Return to hotel for rest
-
-**🌙 EVENING (6:00 PM - 10:00 PM)**
-- 6:00 PM: Hotel rest and freshen up
-- 7:30 PM: Dinner at recommended restaurant
-- 9:00 PM: Evening stroll or local entertainment
-- 10:00 PM: Return to hotel"""
+        destination = get_destination(arrival_city)
+        # hotels_finder output: the (ranked) properties, or an error string
+        hotel = hotel_info[0] if isinstance(hotel_info, list) and hotel_info else hotel_info
+        hotel_name = hotel.get('name') if isinstance(hotel, dict) else None
+
+        parts = [f"\n🗓️ **DAILY ITINERARY FOR {destination.city.upper()}**\n",
+                 f"📅 Trip Duration: {num_days} days ({check_in:%B %d, %Y} - {check_out:%B %d, %Y})\n\n"]
+        for day in range(num_days):
+            parts.append(day_heading(day + 1, check_in + datetime.timedelta(days=day)))
+            if day == 0:  # Arrival day
+                parts.append(destination.arrival_day(hotel_name))
+            elif day == num_days - 1:  # Departure day
+                parts.append(destination.departure_day(departure_city.title()))
+            else:  # Full days
+                parts.append(destination.full_day(day + 1))
+            parts.append("\n---\n\n")
+        return ''.join(parts)
+
+    def _run_tool(self, name, tool_input):
+        try:
+            return self._tools[name].invoke(tool_input)
+        except Exception as e:
+            print(f'{name} failed: {e!r}')
+            return f"❌ {name} failed: {e}"
+
+    def _submit_tool(self, name, tool_input):
+        """Start a tool call and return a (name, future, deadline) handle for `_tool_result`."""
+        deadline = time.monotonic() + self._tool_timeout
+        if self._tool_executor is None:
+            future = Future()
+            future.set_result(self._run_tool(name, tool_input))
+        else:
+            future = self._tool_executor.submit(self._run_tool, name, tool_input)
+        return name, future, deadline
+
+    def _tool_result(self, call):
+        """Wait for a tool call until its deadline; a timeout becomes an error string."""
+        name, future, deadline = call
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            print(f'{name} timed out after {self._tool_timeout}s')
+            return f"❌ {name} timed out after {self._tool_timeout:g} seconds."
+
+    def _flexible_flights(self, query, flights_args):
+        """
+        (flights_result, date_options) for a flexible query: the flight options of the
+        cheapest dates in its window and the cheapest combinations, or ([], []) if none priced.
+        """
+        from agents.price_calendar import search_calendar
+
+        try:
+            nights = query.nights
+        except (TypeError, ValueError):  # dates as the LLM wrote them
+            nights = None
+        calendar = search_calendar(search_flights, {k: v for k, v in flights_args.items() if not k.endswith('_date')},
+                                   datetime.date.fromisoformat(query.window_start),
+                                   datetime.date.fromisoformat(query.window_end),
+                                   nights if nights and nights > 0 else DEFAULT_NIGHTS,
+                                   deadline=time.monotonic() + self._tool_timeout)
+        cheapest = calendar.cheapest(CHEAPEST_DATES)
+        print(f'Price calendar: {calendar.searches} searches, {len(cheapest)} priced combinations')
+        if not cheapest:
+            return [], []
+        date_options = [DateOption(outbound.isoformat(), return_date.isoformat(), price)
+                        for outbound, return_date, price in cheapest]
+        return calendar.options_for(*cheapest[0][:2]), date_options
+
+    def parse_query(self, state: AgentState):
+        return {'query': parse_query(state['messages'][0].content).to_dict()}
+
+    def route_query(self, state: AgentState):
+        """'fast_path' when the parsed query is complete and both cities resolve confidently, else 'llm'."""
+        query = TravelQuery.from_dict(state['query'])
+        route = 'llm'
+        if self._fast_path and query.is_complete:
+            resolved = resolve_airports([query.departure_city, query.arrival_city])
+            if all(r['iata'] and r['confidence'] >= FAST_PATH_MIN_CONFIDENCE for r in resolved):
+                route = 'fast_path'
+        self._count(route)
+        print(f"[Router] {route}: {query}")
+        return route
+
+    def route_stats(self):
+        """How often each path was taken: fast_path, llm, and llm_tool_args (LLM arguments used)."""
+        with self._route_lock:
+            return dict(self._route_counts)
+
+    def _count(self, name):
+        with self._route_lock:
+            self._route_counts[name] += 1
+
+    def _tool_query(self, state):
+        """
+        The query the searches run with: the parsed query on the fast path; after the
+        LLM, its tool-call arguments, with the parsed query filling in what they leave out.
+        """
+        query = TravelQuery.from_dict(state['query']) if state.get('query') else parse_query(state['messages'][0].content)
+        tool_calls = getattr(state['messages'][-1], 'tool_calls', None) or []
+        if tool_calls and self._apply_tool_calls(query, tool_calls):
+            query.source = 'llm'
+            self._count('llm_tool_args')
+        return query
+
+    @staticmethod
+    def _apply_tool_calls(query, tool_calls):
+        """Copy cities, dates and hotel class from the LLM's tool calls into `query`; True if any were used."""
+        index = get_airport_index()
+
+        def city(value):
+            # The LLM may pass IATA codes (or metro lists) instead of city names
+            value = str(value or '').split(',')[0].strip()
+            if len(value) == 3 and value.isupper():
+                airport = index.find_iata(value)
+                if airport is not None:
+                    return airport.city.lower()
+            return value.lower()
+
+        used = {}
+
+        def take(values, override=True):
+            for name, value in values.items():
+                if value and (override or name not in used):
+                    used[name] = value
+
+        for call in tool_calls:
+            args = call.get('args') or {}
+            params = args.get('params', args)
+            if call['name'] == 'flights_finder':
+                take({'departure_city': city(params.get('departure_airport')), 'arrival_city': city(params.get('arrival_airport')),
+                      'check_in': params.get('outbound_date'), 'check_out': params.get('return_date')})
+            elif call['name'] == 'hotels_finder':
+                take({'arrival_city': city(params.get('q')), 'check_in': params.get('check_in_date'),
+                      'check_out': params.get('check_out_date')}, override=False)
+                take({'hotel_class': params.get('hotel_class')})
+            elif call['name'] == 'airport_codes_lookup' and len(params.get('cities') or []) == 2:
+                take({'departure_city': city(params['cities'][0]), 'arrival_city': city(params['cities'][1])}, override=False)
+        for name, value in used.items():
+            setattr(query, name, str(value))
+        if 'check_in' in used and 'check_out' in used:
+            query.dates_found = True
+        return bool(used)
 
     @staticmethod
     def exists_action(state: AgentState):
@@ -399,15 +374,28 @@ class Agent:
             return 'email_sender'
         return 'more_tools'
 
+    def email_html(self, message):
+        """
+        HTML body for the itinerary in `message`: rendered from the structured records
+        attached by `invoke_tools`, or converted by GPT-4o when `llm_email` is enabled.
+        """
+        if self._llm_email:
+            email_message = [SystemMessage(content=EMAILS_SYSTEM_PROMPT), HumanMessage(content=message.content)]
+            return get_email_llm().invoke(email_message).content
+        artifact = getattr(message, 'artifact', None)
+        if artifact:
+            return render_email_html(Itinerary.from_dict(artifact))
+        return render_text_email_html(message.content)
+
     def email_sender(self, state: AgentState):
         print('Sending email')
-        email_llm = ChatOpenAI(model='gpt-4o', temperature=0.1)  # Instantiate another LLM
-        email_message = [SystemMessage(content=EMAILS_SYSTEM_PROMPT), HumanMessage(content=state['messages'][-1].content)]
-        email_response = email_llm.invoke(email_message)
-        print('Email content:', email_response.content)
+        email_content = self.email_html(state['messages'][-1])
+        print('Email content:', email_content)
 
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail
         message = Mail(from_email=os.environ['FROM_EMAIL'], to_emails=os.environ['TO_EMAIL'], subject=os.environ['EMAIL_SUBJECT'],
-                       html_content=email_response.content)
+                       html_content=email_content)
         try:
             sg = SendGridAPIClient(os.environ.get('SENDGRID_API_KEY'))
             response = sg.send(message)
@@ -424,148 +412,146 @@ class Agent:
         message = self._tools_llm.invoke(messages)
         return {'messages': [message]}
 
-    def invoke_tools(self, state: AgentState):
-        # Extract details from user query for tool inputs
-        user_message = state['messages'][0].content.lower()
-        # Improved extraction logic for departure, arrival cities and dates
-        import re
-        from datetime import datetime, timedelta
-        today = datetime.now()
-
-        # Extract departure and arrival cities - improved regex patterns
-        # Pattern 1: "from X to Y" - stop before dates or other keywords
-        from_to_match = re.search(r'from\s+([a-zA-Z\s]+?)\s+to\s+([a-zA-Z\s]+?)(?:\s+from\s+\d|\s+on\s+\d|\s+find|\s*$)', user_message)
-        if not from_to_match:
-            # Pattern 2: "X to Y" (without "from") - stop before dates or other keywords
-            from_to_match = re.search(r'([a-zA-Z\s]{2,}?)\s+to\s+([a-zA-Z\s]{2,}?)(?:\s+from\s+\d|\s+on\s+\d|\s+find|\s*$)', user_message)
-        
-        if from_to_match:
-            departure_city = from_to_match.group(1).strip()
-            arrival_city = from_to_match.group(2).strip()
-            # Clean up: remove extra spaces, common typos and variations
-            departure_city = re.sub(r'\s+', ' ', departure_city).strip()
-            arrival_city = re.sub(r'\s+', ' ', arrival_city).strip()
-            arrival_city = arrival_city.replace('mardrid', 'madrid').replace('mardid', 'madrid')
-            
-            # Remove common words that might have been captured
-            departure_city = re.sub(r'\b(plan|trip|want|need|going|travel)\b', '', departure_city, flags=re.IGNORECASE).strip()
-            arrival_city = re.sub(r'\b(plan|trip|want|need|going|travel)\b', '', arrival_city, flags=re.IGNORECASE).strip()
-            
-            print(f"Extracted cities - Departure: '{departure_city}', Arrival: '{arrival_city}'")
-        else:
-            print(f"WARNING: Could not extract cities from query: '{user_message}'")
-            print("Please use format: 'from [city] to [city]' or '[city] to [city]'")
-            error_msg = "❌ Could not identify departure and arrival cities. Please use format: 'from [city] to [city]' or '[city] to [city]'"
-            return {'messages': [ToolMessage(tool_call_id='flights_finder', name='flights_finder', content=error_msg)]}
+    @staticmethod
+    def _emit(config, name, data):
+        if config is None:
+            return
+        try:
+            dispatch_custom_event(name, data, config=config)
+        except Exception as e:  # no parent run, e.g. invoke_tools called outside the graph
+            print(f'Could not dispatch {name}: {e!r}')
 
-        # Extract dates
-        dates_match = re.search(r'from\s*(\d{1,2}(?:st|nd|rd|th)?)\s*([a-zA-Z]+)\s*to\s*(\d{1,2}(?:st|nd|rd|th)?)\s*([a-zA-Z]+)\s*(\d{4})', user_message)
-        if dates_match:
-            day1, month1, day2, month2, year = dates_match.groups()
-            
-            # Standardize month abbreviations (e.g., 'oct' to 'Oct')
-            month1_abbr = month1.title()[:3] # 'oct' -> 'Oct'
-            month2_abbr = month2.title()[:3] # 'nov' -> 'Nov'
-
-            outbound_date_str = f"{day1} {month1_abbr} {year}"
-            return_date_str = f"{day2} {month2_abbr} {year}"
-            
-            print(f'Extracted date parts: day1={day1}, month1={month1}, day2={day2}, month2={month2}, year={year}')
-            print(f'Constructed outbound_date_str for parsing: {outbound_date_str}')
-            print(f'Constructed return_date_str for parsing: {return_date_str}')
-
-            # Convert to datetime objects
-            try:
-                outbound_date = datetime.strptime(outbound_date_str.replace("st", "").replace("nd", "").replace("rd", "").replace("th", ""), '%d %b %Y')
-                return_date = datetime.strptime(return_date_str.replace("st", "").replace("nd", "").replace("rd", "").replace("th", ""), '%d %b %Y')
-            except ValueError as e:
-                print(f'ValueError during date parsing: {e}')
-                # Fallback if specific date parsing fails
-                outbound_date = today + timedelta(days=1)
-                return_date = outbound_date + timedelta(days=3) # Default to 3 days if date parsing fails
-                outbound_date_str = outbound_date.strftime('%Y-%m-%d') # Assign default here
-                return_date_str = return_date.strftime('%Y-%m-%d') # Assign default here
-        else:
-            print('Date regex did not match. Using default dates.')
-            # Fallback to current date + offset if no dates are found
-            outbound_date = today + timedelta(days=1)
-            return_date = outbound_date + timedelta(days=3)
-            outbound_date_str = outbound_date.strftime('%Y-%m-%d') # Assign default here
-            return_date_str = return_date.strftime('%Y-%m-%d') # Assign default here
+    def invoke_tools(self, state: AgentState, config: RunnableConfig = None):
+        from agents.ranking import rank_flights, rank_hotels
+        from agents.trip_budget import best_trips, cheapest_trips
 
-        check_in_str = outbound_date.strftime('%Y-%m-%d')
-        check_out_str = return_date.strftime('%Y-%m-%d')
+        query = self._tool_query(state)
+        departure_city, arrival_city = query.departure_city, query.arrival_city
+        check_in_str, check_out_str, hotel_class = query.check_in, query.check_out, query.hotel_class
+        print(f"Extracted cities - Departure: '{departure_city}', Arrival: '{arrival_city}' ({query.source})")
 
         # Check if cities were extracted
         if not departure_city or not arrival_city:
-            error_msg = "Could not extract departure and arrival cities from your query. Please use format: 'from [city] to [city]'"
-            print(error_msg)
-            return {'messages': [ToolMessage(tool_call_id='flights_finder', name='flights_finder', content=error_msg)]}
-        
-        # Lookup airport codes
-        departure_airport_code = self._tools['airport_code_lookup'].invoke(input={'q': departure_city})
-        if not departure_airport_code or "N/A" in str(departure_airport_code) or "Error:" in str(departure_airport_code):
-            error_msg = f"❌ Could not find airport code for departure city: {departure_city}. Please check the city name spelling."
-            print(error_msg)
-            return {'messages': [ToolMessage(tool_call_id='flights_finder', name='flights_finder', content=error_msg)]}
-        
-        arrival_airport_code = self._tools['airport_code_lookup'].invoke(input={'q': arrival_city})
-        if not arrival_airport_code or "N/A" in str(arrival_airport_code) or "Error:" in str(arrival_airport_code):
-            error_msg = f"❌ Could not find airport code for arrival city: {arrival_city}. Please check the city name spelling."
-            print(error_msg)
+            print(f"WARNING: Could not extract cities from query: '{state['messages'][0].content}'")
+            error_msg = "❌ Could not identify departure and arrival cities. Please use format: 'from [city] to [city]' or '[city] to [city]'"
             return {'messages': [ToolMessage(tool_call_id='flights_finder', name='flights_finder', content=error_msg)]}
-        
-        print(f"Airport codes - Departure: {departure_airport_code}, Arrival: {arrival_airport_code}")
-
-        # Extract hotel class
-        hotel_class_match = re.search(r'(\d+)\s*star hotel', user_message)
-        hotel_class = hotel_class_match.group(1) if hotel_class_match else None
-
-        flights_args = {
-            'departure_airport': departure_airport_code,
-            'arrival_airport': arrival_airport_code,
-            'outbound_date': check_in_str,
-            'return_date': check_out_str,
-            'adults': 1,
-            'children': 0,
-            'infants_in_seat': 0,
-            'infants_on_lap': 0
-        }
+
+        # Resolve both airports in one local pass (no tool round trips). A confident
+        # fuzzy match also corrects the city name sent to the hotels search.
+        departure, arrival = resolve_airports([departure_city, arrival_city])
+        departure_airport_code, arrival_airport_code = departure['iata'], arrival['iata']
+        if arrival['match'] == 'fuzzy' and arrival['confidence'] >= 0.8:
+            hotels_city = arrival['city']
+        else:
+            hotels_city = arrival_city
+
+        flights_args = None
+        if not departure_airport_code:
+            flights_result = f"❌ Could not find airport code for departure city: {departure_city}. Please check the city name spelling."
+        elif not arrival_airport_code:
+            flights_result = f"❌ Could not find airport code for arrival city: {arrival_city}. Please check the city name spelling."
+        else:
+            if self._metro_search:
+                departure_airport_code = ','.join(a['iata'] for a in metro_airports(departure))
+                arrival_airport_code = ','.join(a['iata'] for a in metro_airports(arrival))
+            print(f"Airport codes - Departure: {departure_airport_code}, Arrival: {arrival_airport_code}")
+            flights_args = {
+                'departure_airport': departure_airport_code,
+                'arrival_airport': arrival_airport_code,
+                'outbound_date': check_in_str,
+                'return_date': check_out_str,
+                'adults': query.adults,
+                'children': query.children,
+                'infants_in_seat': 0,
+                'infants_on_lap': query.infants
+            }
+
+        date_options = []
+        if query.flexible and flights_args is not None:
+            # Flexible dates: price the whole window first, then search hotels for the cheapest dates
+            self._emit(config, ITINERARY_PROGRESS_EVENT,
+                       {'message': f'Comparing prices {departure_city.title()} → {arrival_city.title()} '
+                                   f'from {query.window_start} to {query.window_end}...'})
+            flights_result, date_options = self._flexible_flights(query, flights_args)
+            if date_options:
+                check_in_str, check_out_str = date_options[0].outbound, date_options[0].return_date
+                flights_args.update(outbound_date=check_in_str, return_date=check_out_str)
+
         hotels_args = {
-            'q': arrival_city,
+            'q': hotels_city,
             'check_in_date': check_in_str,
             'check_out_date': check_out_str,
-            'adults': 1,
-            'children': 0,
+            'adults': query.adults,
+            'children': query.children + query.infants,
             'rooms': 1,
             'sort_by': 8,
             'hotel_class': hotel_class
         }
-        print(f'Calling flights_finder with: {flights_args}')
         print(f'Calling hotels_finder with: {hotels_args}')
-        flights_result = self._tools['flights_finder'].invoke({'params': flights_args})
+        hotels_call = self._submit_tool('hotels_finder', {'params': hotels_args})
+        self._emit(config, ITINERARY_PROGRESS_EVENT,
+                   {'message': f'Searching flights {departure_city.title()} → {arrival_city.title()} and hotels in {hotels_city.title()}...'})
+
+        if flights_args is not None and not date_options:
+            print(f'Calling flights_finder with: {flights_args}')
+            flights_result = self._tool_result(self._submit_tool('flights_finder', {'params': flights_args}))
+            metro_failed = isinstance(flights_result, str) and 'timed out' not in flights_result
+            if metro_failed and ',' in departure_airport_code + arrival_airport_code:
+                # Some secondary airports are unknown to Google Flights; retry with the main ones.
+                flights_args.update(departure_airport=departure['iata'], arrival_airport=arrival['iata'])
+                print(f'Retrying flights_finder with the main airports: {flights_args}')
+                flights_result = self._tool_result(self._submit_tool('flights_finder', {'params': flights_args}))
+        # Every option found, for pairing with the hotels against the budget
+        all_flights = flights_result if isinstance(flights_result, list) else []
+        if all_flights:
+            flights_result = rank_flights(all_flights, query.priorities, query.budget)
         print(f'flights_finder output: {flights_result}')
-        hotels_result = self._tools['hotels_finder'].invoke({'params': hotels_args})
+        itinerary = Itinerary(departure_city=departure_city, arrival_city=arrival_city,
+                              check_in=check_in_str, check_out=check_out_str, date_options=date_options,
+                              budget=query.budget)
+        # Each section is streamed as soon as it is ready; a failed or timed out search
+        # still leaves the other half (flights without hotels, or hotels without flights)
+        itinerary.set_flights(flights_result)
+        flights_info = flights_markdown(itinerary)
+        self._emit(config, ITINERARY_SECTION_EVENT, {'section': 'flights', 'content': flights_info})
+
+        hotels_result = self._tool_result(hotels_call)
+        if isinstance(hotels_result, list):
+            try:
+                nights = (datetime.date.fromisoformat(check_out_str) - datetime.date.fromisoformat(check_in_str)).days
+            except (TypeError, ValueError):  # dates as the LLM wrote them
+                nights = None
+            if query.budget and all_flights:
+                if 'price' in query.priorities:
+                    trips = cheapest_trips(all_flights, hotels_result, query.budget, nights=nights)
+                else:
+                    trips = best_trips(all_flights, hotels_result, query.budget, priorities=query.priorities, nights=nights)
+                print(f'Trips within {query.budget:g}: {len(trips)}')
+                itinerary.trip_options = [TripOption.from_serpapi(*trip) for trip in trips]
+            hotels_result = rank_hotels(hotels_result, query.priorities, query.budget,
+                                        center=get_destination(hotels_city).center, nights=nights)
         print(f'hotels_finder output: {hotels_result}')
-        
-        # Create the basic travel itinerary
-        basic_itinerary = self.format_travel_itinerary(flights_result, hotels_result)
-        
+        itinerary.set_hotels(hotels_result)
+        hotels_info = hotels_markdown(itinerary)
+        self._emit(config, ITINERARY_SECTION_EVENT, {'section': 'hotels', 'content': hotels_info})
+
         # Create detailed daily itinerary
-        daily_itinerary = self.create_daily_itinerary(
+        itinerary.daily_plan = self.create_daily_itinerary(
             departure_city, 
             arrival_city, 
             check_in_str, 
             check_out_str, 
             hotels_result
         )
-        
-        # Combine both itineraries
-        full_itinerary = basic_itinerary + daily_itinerary
-        
+        self._emit(config, ITINERARY_SECTION_EVENT, {'section': 'daily_plan', 'content': itinerary.daily_plan})
+
+        # Combine the rendered sections; the structured records travel along as the artifact
+        full_itinerary = ''.join((flights_info, "\n", hotels_info, itinerary.daily_plan))
+
         print('Formatted itinerary:', full_itinerary)
         results = [
-            ToolMessage(tool_call_id='flights_finder', name='flights_finder', content=full_itinerary)
+            ToolMessage(tool_call_id='flights_finder', name='flights_finder', content=full_itinerary,
+                        artifact=itinerary.to_dict())
         ]
         print('Final tool results:', results)
         print('Back to the model!')
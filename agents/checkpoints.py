@@ -0,0 +1,306 @@
+"""
+Bounded checkpointers for the agent graph.
+
+Every search runs on a fresh thread_id, and each checkpoint holds the full message
+history including the raw SerpApi results, so LangGraph's plain MemorySaver grows for
+as long as the process lives. Both savers here keep only the latest `history`
+checkpoints per thread and drop threads idle for longer than `ttl` seconds, then the
+least recently used ones beyond `max_threads`.
+
+`SqliteCheckpointSaver` stores the same data in SQLite, so threads interrupted before
+`email_sender` survive restarts and can be resumed from any Streamlit worker that
+shares the file.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.base import WRITES_IDX_MAP, BaseCheckpointSaver, CheckpointTuple, get_checkpoint_id
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.types import TASKS
+
+from agents.tools.airport_index import PROJECT_ROOT
+
+DEFAULT_MAX_THREADS = 256
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+# The latest checkpoint is all that resuming at the email_sender interrupt needs;
+# its parent is kept for the pending sends LangGraph reads from it.
+DEFAULT_HISTORY = 2
+
+
+class BoundedMemorySaver(MemorySaver):
+    """MemorySaver with per-thread history trimming, TTL expiry and an LRU cap on threads."""
+
+    def __init__(self, *, max_threads=DEFAULT_MAX_THREADS, ttl=DEFAULT_TTL_SECONDS, history=DEFAULT_HISTORY, serde=None):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self.history = history
+        self.evictions = 0
+        self._last_used = OrderedDict()  # thread_id -> monotonic time, least recently used first
+        self._lock = threading.RLock()
+
+    def get_tuple(self, config):
+        thread_id = config['configurable']['thread_id']
+        with self._lock:
+            # MemorySaver's defaultdicts would otherwise create an entry for every lookup
+            if thread_id not in self.storage:
+                return None
+            if self._expired(thread_id, time.monotonic()):
+                self._drop(thread_id)
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            if config and config['configurable']['thread_id'] not in self.storage:
+                return iter(())
+            return iter(list(super().list(config, filter=filter, before=before, limit=limit)))
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = saved['configurable']['thread_id']
+            self._touch(thread_id)
+            self._trim(thread_id, saved['configurable']['checkpoint_ns'])
+            self._evict()
+            return saved
+
+    def put_writes(self, config, writes, task_id):
+        with self._lock:
+            super().put_writes(config, writes, task_id)
+            self._touch(config['configurable']['thread_id'])
+
+    def stats(self):
+        with self._lock:
+            checkpoints = [entry for namespaces in self.storage.values() for saved in namespaces.values() for entry in saved.values()]
+            stored = sum(len(checkpoint[1]) + len(metadata[1]) for checkpoint, metadata, _ in checkpoints)
+            stored += sum(len(value[1]) for writes in self.writes.values() for _, _, value in writes.values())
+            return {'threads': len(self.storage), 'checkpoints': len(checkpoints), 'bytes': stored, 'evictions': self.evictions}
+
+    def _touch(self, thread_id):
+        self._last_used[thread_id] = time.monotonic()
+        self._last_used.move_to_end(thread_id)
+
+    def _expired(self, thread_id, now):
+        return self.ttl is not None and now - self._last_used.get(thread_id, now) > self.ttl
+
+    def _trim(self, thread_id, checkpoint_ns):
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if self.history is None or len(checkpoints) <= self.history:
+            return
+        for checkpoint_id in sorted(checkpoints)[:-self.history]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+    def _drop(self, thread_id):
+        for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        self._last_used.pop(thread_id, None)
+        self.evictions += 1
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._last_used:
+            thread_id = next(iter(self._last_used))
+            if not (self._expired(thread_id, now) or len(self._last_used) > self.max_threads):
+                break
+            self._drop(thread_id)
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """Checkpoints in a SQLite file (WAL mode, so several processes can share it), bounded like BoundedMemorySaver."""
+
+    get_next_version = MemorySaver.get_next_version
+
+    def __init__(self, path, *, max_threads=DEFAULT_MAX_THREADS, ttl=DEFAULT_TTL_SECONDS, history=DEFAULT_HISTORY,
+                 serde=None):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self.history = history
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, parent_checkpoint_id TEXT,
+                type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id));
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, task_id TEXT, idx INTEGER,
+                channel TEXT, type TEXT, value BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx));
+            CREATE TABLE IF NOT EXISTS threads (thread_id TEXT PRIMARY KEY, last_used REAL);
+            CREATE INDEX IF NOT EXISTS threads_last_used ON threads (last_used);
+        ''')
+        self._conn.commit()
+        with self._lock:
+            self._evict()
+
+    def get_tuple(self, config):
+        configurable = config['configurable']
+        thread_id, checkpoint_ns = configurable['thread_id'], configurable.get('checkpoint_ns', '')
+        checkpoint_id = get_checkpoint_id(config)
+        with self._lock:
+            row = self._conn.execute('SELECT last_used FROM threads WHERE thread_id = ?', (thread_id,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and time.time() - row[0] > self.ttl:
+                self._drop([thread_id])
+                return None
+            query = 'SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?'
+            if checkpoint_id:
+                row = self._conn.execute(query + ' AND checkpoint_id = ?', (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            else:
+                row = self._conn.execute(query + ' ORDER BY checkpoint_id DESC LIMIT 1', (thread_id, checkpoint_ns)).fetchone()
+            if row is None:
+                return None
+            self._touch(thread_id)
+            self._conn.commit()
+            return self._tuple(row)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        clauses, args = [], []
+        if config:
+            clauses.append('thread_id = ?')
+            args.append(config['configurable']['thread_id'])
+            if config['configurable'].get('checkpoint_ns') is not None:
+                clauses.append('checkpoint_ns = ?')
+                args.append(config['configurable']['checkpoint_ns'])
+            if get_checkpoint_id(config):
+                clauses.append('checkpoint_id = ?')
+                args.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            clauses.append('checkpoint_id < ?')
+            args.append(get_checkpoint_id(before))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            rows = self._conn.execute(f'SELECT * FROM checkpoints{where} ORDER BY checkpoint_id DESC', args).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                metadata = self.serde.loads_typed((row[6], row[7]))
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                results.append(self._tuple(row))
+        return iter(results)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        configurable = config['configurable']
+        thread_id, checkpoint_ns = configurable['thread_id'], configurable['checkpoint_ns']
+        saved = dict(checkpoint)
+        saved.pop('pending_sends', None)
+        checkpoint_type, checkpoint_data = self.serde.dumps_typed(saved)
+        metadata_type, metadata_data = self.serde.dumps_typed(metadata)
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               (thread_id, checkpoint_ns, checkpoint['id'], configurable.get('checkpoint_id'),
+                                checkpoint_type, checkpoint_data, metadata_type, metadata_data))
+            self._touch(thread_id)
+            if self.history is not None:
+                keep = 'SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?1 AND checkpoint_ns = ?2 ORDER BY checkpoint_id DESC LIMIT ?3'
+                for table in ('checkpoints', 'writes'):
+                    self._conn.execute(f'DELETE FROM {table} WHERE thread_id = ?1 AND checkpoint_ns = ?2 AND checkpoint_id NOT IN ({keep})',
+                                       (thread_id, checkpoint_ns, self.history))
+            self._evict()
+            self._conn.commit()
+        return {'configurable': {'thread_id': thread_id, 'checkpoint_ns': checkpoint_ns, 'checkpoint_id': checkpoint['id']}}
+
+    def put_writes(self, config, writes, task_id):
+        configurable = config['configurable']
+        key = (configurable['thread_id'], configurable['checkpoint_ns'], configurable['checkpoint_id'])
+        rows = [(*key, task_id, WRITES_IDX_MAP.get(channel, idx), channel, *self.serde.dumps_typed(value))
+                for idx, (channel, value) in enumerate(writes)]
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._touch(configurable['thread_id'])
+            self._conn.commit()
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in await asyncio.to_thread(self.list, config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id)
+
+    def stats(self):
+        with self._lock:
+            threads, = self._conn.execute('SELECT COUNT(*) FROM threads').fetchone()
+            checkpoints, checkpoint_bytes = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints').fetchone()
+            write_bytes, = self._conn.execute('SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes').fetchone()
+        return {'threads': threads, 'checkpoints': checkpoints, 'bytes': checkpoint_bytes + write_bytes, 'evictions': self.evictions}
+
+    def _tuple(self, row):
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint_type, checkpoint_data, metadata_type, metadata_data = row
+        writes = self._conn.execute(
+            'SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? '
+            'ORDER BY task_id, idx', (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        sends = []
+        if parent_id:
+            sends = self._conn.execute(
+                'SELECT type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? AND channel = ? '
+                'ORDER BY task_id, idx', (thread_id, checkpoint_ns, parent_id, TASKS)).fetchall()
+        return CheckpointTuple(
+            config={'configurable': {'thread_id': thread_id, 'checkpoint_ns': checkpoint_ns, 'checkpoint_id': checkpoint_id}},
+            checkpoint={**self.serde.loads_typed((checkpoint_type, checkpoint_data)),
+                        'pending_sends': [self.serde.loads_typed(send) for send in sends]},
+            metadata=self.serde.loads_typed((metadata_type, metadata_data)),
+            parent_config={'configurable': {'thread_id': thread_id, 'checkpoint_ns': checkpoint_ns, 'checkpoint_id': parent_id}}
+            if parent_id else None,
+            pending_writes=[(task_id, channel, self.serde.loads_typed((value_type, value)))
+                            for task_id, channel, value_type, value in writes],
+        )
+
+    def _touch(self, thread_id):
+        self._conn.execute('INSERT OR REPLACE INTO threads VALUES (?, ?)', (thread_id, time.time()))
+
+    def _drop(self, thread_ids):
+        for thread_id in thread_ids:
+            for table in ('checkpoints', 'writes', 'threads'):
+                self._conn.execute(f'DELETE FROM {table} WHERE thread_id = ?', (thread_id,))
+        self.evictions += len(thread_ids)
+        self._conn.commit()
+
+    def _evict(self):
+        stale = []
+        if self.ttl is not None:
+            stale = [row[0] for row in self._conn.execute('SELECT thread_id FROM threads WHERE last_used < ?',
+                                                          (time.time() - self.ttl,))]
+        stale += [row[0] for row in self._conn.execute(
+            'SELECT thread_id FROM threads WHERE last_used >= ? ORDER BY last_used DESC LIMIT -1 OFFSET ?',
+            (time.time() - self.ttl if self.ttl is not None else 0, self.max_threads))]
+        if stale:
+            self._drop(stale)
+
+
+def make_checkpointer():
+    """
+    Checkpointer configured from the environment: CHECKPOINTER ('memory', the default,
+    or 'sqlite'), CHECKPOINT_PATH (SQLite file, default .cache/checkpoints.sqlite; relative
+    paths are taken from the project root, not the working directory), CHECKPOINT_MAX_THREADS, CHECKPOINT_TTL_SECONDS and CHECKPOINT_HISTORY.
+    """
+    options = {
+        'max_threads': int(os.getenv('CHECKPOINT_MAX_THREADS', DEFAULT_MAX_THREADS)),
+        'ttl': int(os.getenv('CHECKPOINT_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+        'history': int(os.getenv('CHECKPOINT_HISTORY', DEFAULT_HISTORY)),
+    }
+    if os.getenv('CHECKPOINTER', 'memory') == 'sqlite':
+        path = os.path.join(PROJECT_ROOT, os.getenv('CHECKPOINT_PATH', os.path.join('.cache', 'checkpoints.sqlite')))
+        return SqliteCheckpointSaver(path, **options)
+    return BoundedMemorySaver(**options)
@@ -0,0 +1,170 @@
+"""
+Destination content for the daily itinerary.
+
+data/destinations.json holds one content pack per city, one line each: the city
+center, the arrival-day and departure-day highlights, a rotation of full-day
+programmes and evening ideas. Packs are keyed by the normalized city name as
+airports.dat spells it, so any query that resolves to that city's airports finds
+the pack ("bombay", "new delhi", "londn"). Other cities get the generic '_default'
+pack.
+
+Each pack's day schedules are rendered to Markdown once, on first use. A day plan is
+then a lookup per day and one join, so a three-week trip costs about the same per day
+as a weekend.
+"""
+import json
+import os
+import threading
+from functools import lru_cache
+
+from agents.tools.airport_index import PROJECT_ROOT, normalize_city
+
+DESTINATIONS_PATH = os.path.join(PROJECT_ROOT, 'data', 'destinations.json')
+DEFAULT_PACK = '_default'
+
+# Day headings spell dates from these instead of strftime (several times faster per day)
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+               'November', 'December')
+
+
+def day_heading(day_number, day):
+    """'## 📅 **DAY 2 - Monday, November 02, 2026**' heading for a day of the plan."""
+    return (f"## 📅 **DAY {day_number} - {WEEKDAY_NAMES[day.weekday()]}, {MONTH_NAMES[day.month - 1]} "
+            f"{day.day:02d}, {day.year}**\n\n")
+
+
+class Destination:
+    """One city's pack with its day schedules pre-rendered."""
+
+    def __init__(self, key, city, pack):
+        self.key = key
+        self.city = pack.get('name', city)
+        self.country = pack.get('country', '')
+        # (latitude, longitude) of the city center, or None
+        self.center = tuple(pack['center']) if pack.get('center') else None
+        arrival = [activity.replace('{city}', self.city) for activity in pack['arrival']]
+        self._arrival_head = """**🌅 MORNING (8:00 AM - 12:00 PM)**
+- 8:00 AM: Arrive at airport
+- 9:00 AM: Immigration & baggage claim
+- 10:00 AM: Airport transfer to hotel
+"""
+        self._arrival_tail = f"""
+**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
+- 12:00 PM: Lunch at local restaurant
+- 2:00 PM: {arrival[0]}
+- 4:00 PM: {arrival[1]}
+- 5:00 PM: Coffee break at café
+
+**🌙 EVENING (6:00 PM - 10:00 PM)**
+- 6:00 PM: Return to hotel
+- 7:00 PM: Dinner at hotel or nearby restaurant
+- 9:00 PM: Relax and prepare for next day
+- 10:00 PM: Early rest for tomorrow's adventures"""
+        self._departure_head = f"""**🌅 MORNING (8:00 AM - 12:00 PM)**
+- 8:00 AM: Hotel check-out
+- 9:00 AM: {pack['departure']}
+- 10:00 AM: Return to hotel for luggage
+- 11:00 AM: Airport transfer
+
+**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
+- 12:00 PM: Arrive at airport
+- 1:00 PM: Check-in and security
+- 2:00 PM: Duty-free shopping or airport lounge
+"""
+        evenings = pack['evenings']
+        self.full_days = tuple(
+            f"""**🌅 MORNING (8:00 AM - 12:00 PM)**
+- 8:00 AM: Hotel breakfast
+- 9:00 AM: {morning}
+- 11:00 AM: Coffee break and rest
+
+**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
+- 12:00 PM: Local lunch
+- 2:00 PM: {afternoon}
+- 4:00 PM: {late_afternoon}
+- 5:30 PM: Return to hotel for rest
+
+**🌙 EVENING (6:00 PM - 10:00 PM)**
+- 6:00 PM: Hotel rest and freshen up
+- 7:30 PM: Dinner at recommended restaurant
+- 9:00 PM: {evenings[day % len(evenings)]}
+- 10:00 PM: Return to hotel"""
+            for day, (morning, afternoon, late_afternoon) in enumerate(pack['days'])
+        )
+
+    def arrival_day(self, hotel_name=None):
+        check_in = f'Check in at {hotel_name}' if hotel_name else 'Hotel check-in'
+        return f'{self._arrival_head}- 11:00 AM: {check_in} and freshen up\n{self._arrival_tail}'
+
+    def departure_day(self, departure_city):
+        return f"""{self._departure_head}- 3:00 PM: Boarding for flight to {departure_city}
+
+**🌙 EVENING (6:00 PM - 10:00 PM)**
+- 6:00 PM: In-flight meal and entertainment
+- 8:00 PM: Rest on flight
+- 10:00 PM: Arrival at {departure_city}"""
+
+    def full_day(self, day_number):
+        """Schedule for day `day_number` of the trip (day 1 is the arrival day); the programmes repeat."""
+        return self.full_days[(day_number - 2) % len(self.full_days)]
+
+    def __repr__(self):
+        return f'Destination({self.city!r}, generic={self.key == DEFAULT_PACK})'
+
+
+class DestinationStore:
+    """All packs from a destinations.json, with Destination objects built on first lookup."""
+
+    def __init__(self, packs):
+        self._packs = packs
+        self._destinations = {}
+        self._lock = threading.Lock()
+        self.find = lru_cache(maxsize=1024)(self._find)
+
+    @classmethod
+    def open(cls, path=DESTINATIONS_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self._packs) - (DEFAULT_PACK in self._packs)
+
+    def __contains__(self, city):
+        return normalize_city(city) in self._packs
+
+    def _find(self, city):
+        # find(city) -> Destination: the city's pack, or the generic one under the city's name
+        key = normalize_city(city)
+        if key not in self._packs and key:
+            from agents.tools.airport_lookup import resolve_airports
+
+            resolved = resolve_airports([city])[0]
+            if resolved.get('city') and resolved['confidence'] >= 0.8:
+                key = normalize_city(resolved['city'])
+        if key not in self._packs:
+            return Destination(DEFAULT_PACK, city.title(), self._packs[DEFAULT_PACK])
+        # One Destination per pack, however many spellings lead to it
+        with self._lock:
+            destination = self._destinations.get(key)
+            if destination is None:
+                destination = self._destinations[key] = Destination(key, key.title(), self._packs[key])
+        return destination
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_destination_store():
+    """Process-wide store, loaded from DESTINATIONS_PATH on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DestinationStore.open()
+        return _store
+
+
+def get_destination(city):
+    """Destination for a city name as the user wrote it."""
+    return get_destination_store().find(city)
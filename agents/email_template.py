@@ -0,0 +1,134 @@
+"""
+Deterministic HTML email for an itinerary, rendered from the structured records.
+
+Produces the same layout the GPT-4o conversion was prompted for (see
+EMAILS_SYSTEM_PROMPT in agents/agent.py): one list item per flight option and per
+hotel, with logos, prices and booking links, followed by the daily plan.
+"""
+import html
+import io
+from string import Template
+
+from agents.pdf.html import markdown_fragment
+
+_DOCUMENT = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>$title</title>
+</head>
+<body style="font-family: Helvetica, Arial, sans-serif; color: #222; line-height: 1.5;">
+$body</body>
+</html>
+""")
+
+_CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹', 'JPY': '¥'}
+
+
+def format_price(amount, currency='USD'):
+    if amount is None or amount == '':
+        return 'N/A'
+    if isinstance(amount, (int, float)):
+        amount = f'{amount:,.0f}' if float(amount).is_integer() else f'{amount:,.2f}'
+        symbol = _CURRENCY_SYMBOLS.get(currency)
+        return f'{symbol}{amount}' if symbol else f'{amount} {currency}'
+    return str(amount)
+
+
+def format_minutes(minutes):
+    if not minutes:
+        return ''
+    hours, minutes = divmod(int(minutes), 60)
+    parts = [f'{hours} hour{"s" if hours != 1 else ""}'] if hours else []
+    if minutes:
+        parts.append(f'{minutes} minutes')
+    return ' '.join(parts)
+
+
+def _row(out, label, value):
+    if value not in (None, ''):
+        out.write(f'            <strong>{label}:</strong> {html.escape(str(value))}<br>\n')
+
+
+def _write_flights(out, itinerary):
+    route = f' from {itinerary.departure_city.title()} to {itinerary.arrival_city.title()}' if itinerary.arrival_city else ''
+    if itinerary.date_options:
+        out.write('    <h2>Cheapest dates</h2>\n    <ul>\n')
+        for option in itinerary.date_options:
+            out.write(f'        <li>{html.escape(option.summary())}</li>\n')
+        out.write('    </ul>\n')
+    out.write(f'    <h2>Flights{html.escape(route)}</h2>\n')
+    if not itinerary.flights:
+        out.write(f'    <p>{html.escape(itinerary.flights_message or "No flights found.")}</p>\n')
+        return
+    out.write('    <ol>\n')
+    for option in itinerary.flights:
+        airlines = ', '.join(dict.fromkeys(leg.airline for leg in option.legs)) or 'Flight'
+        out.write(f'        <li>\n            <strong>{html.escape(airlines)}</strong><br>\n')
+        for leg in option.legs:
+            _row(out, 'Flight', leg.flight_number)
+            _row(out, 'Departure', f'{leg.departure_airport} ({leg.departure_id}) at {leg.departs_at} on {leg.date}')
+            _row(out, 'Arrival', f'{leg.arrival_airport} ({leg.arrival_id}) at {leg.arrives_at}')
+            _row(out, 'Aircraft', leg.airplane)
+            _row(out, 'Class', leg.travel_class)
+        _row(out, 'Duration', format_minutes(option.total_duration))
+        _row(out, 'Price', format_price(option.price, option.currency))
+        for logo, airline in dict.fromkeys((leg.airline_logo, leg.airline) for leg in option.legs if leg.airline_logo):
+            out.write(f'            <img src="{html.escape(logo)}" alt="{html.escape(airline)}"><br>\n')
+        if option.booking:
+            label, url = option.booking
+            out.write(f'            <a href="{html.escape(url)}">{html.escape(label)}</a>\n')
+        out.write('        </li>\n')
+    out.write('    </ol>\n')
+
+
+def _write_hotels(out, itinerary):
+    out.write(f'    <h2>Hotels{" in " + html.escape(itinerary.arrival_city.title()) if itinerary.arrival_city else ""}</h2>\n')
+    if not itinerary.hotels:
+        out.write(f'    <p>{html.escape(itinerary.hotels_message or "No hotels found.")}</p>\n')
+        return
+    out.write('    <ol>\n')
+    for hotel in itinerary.hotels:
+        out.write(f'        <li>\n            <strong>{html.escape(hotel.name)}</strong><br>\n')
+        _row(out, 'Description', hotel.description)
+        _row(out, 'Class', hotel.hotel_class)
+        _row(out, 'Rate per Night', format_price(hotel.rate_per_night) if hotel.rate_per_night is not None else None)
+        _row(out, 'Total Rate', format_price(hotel.total_rate) if hotel.total_rate is not None else None)
+        if hotel.overall_rating != 'N/A':
+            _row(out, 'Rating', f'{hotel.overall_rating}/5 ({hotel.reviews} reviews)')
+        _row(out, 'Check-in', hotel.check_in_time)
+        _row(out, 'Check-out', hotel.check_out_time)
+        if hotel.amenities:
+            _row(out, 'Amenities', ', '.join(hotel.amenities))
+        if hotel.thumbnail:
+            out.write(f'            <img src="{html.escape(hotel.thumbnail)}" alt="{html.escape(hotel.name)}"><br>\n')
+        if hotel.link:
+            out.write(f'            <a href="{html.escape(hotel.link)}">Visit Website</a>\n')
+        out.write('        </li>\n')
+    out.write('    </ol>\n')
+
+
+def _write_trips(out, itinerary):
+    if not itinerary.trip_options:
+        return
+    out.write(f'    <h2>{html.escape(itinerary.trips_heading)}</h2>\n    <ul>\n')
+    for trip in itinerary.trip_options:
+        out.write(f'        <li>{html.escape(trip.summary())}</li>\n')
+    out.write('    </ul>\n')
+
+
+def render_email_html(itinerary, title='Flight and Hotel Options'):
+    """Email-ready HTML document for an `agents.itinerary.Itinerary`."""
+    out = io.StringIO()
+    _write_flights(out, itinerary)
+    _write_hotels(out, itinerary)
+    _write_trips(out, itinerary)
+    if itinerary.daily_plan:
+        out.write(markdown_fragment(itinerary.daily_plan))
+        out.write('\n')
+    return _DOCUMENT.substitute(title=html.escape(title), body=out.getvalue())
+
+
+def render_text_email_html(content, title='Your Travel Itinerary'):
+    """Email HTML for itinerary text without structured data (e.g. a direct LLM answer)."""
+    return _DOCUMENT.substitute(title=html.escape(title), body=markdown_fragment(content) + '\n')
@@ -0,0 +1,409 @@
+"""
+Typed itinerary records, populated once from the SerpApi results.
+
+The Markdown shown in Streamlit, the HTML used for PDFs and emails, and the native
+PDF layout are all rendered from these records, each writer streaming into a single
+buffer instead of concatenating strings.
+"""
+import html
+import io
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from typing import List, Optional
+
+from agents.pdf.html import html_document, markdown_fragment
+
+
+def _rate(value):
+    # SerpApi rates are dicts ({'lowest': '$120', 'extracted_lowest': 120}) or plain values
+    if isinstance(value, dict):
+        return value.get('extracted_lowest', value.get('lowest', 'N/A'))
+    return value
+
+
+def _money(amount, currency='USD'):
+    if not isinstance(amount, (int, float)):
+        return 'N/A'
+    return f'${amount:,.0f}' if currency == 'USD' else f'{amount:,.0f} {currency}'
+
+
+@dataclass(slots=True)
+class FlightLeg:
+    airline: str = 'Unknown Airline'
+    flight_number: str = ''
+    airline_logo: str = ''
+    departure_airport: str = ''
+    departure_id: str = ''
+    departure_time: str = ''  # 'YYYY-MM-DD HH:MM'
+    arrival_airport: str = ''
+    arrival_id: str = ''
+    arrival_time: str = ''
+    duration: Optional[int] = None
+    airplane: str = ''
+    travel_class: str = ''
+
+    @classmethod
+    def from_serpapi(cls, leg):
+        departure = leg.get('departure_airport', {})
+        arrival = leg.get('arrival_airport', {})
+        return cls(
+            airline=leg.get('airline', 'Unknown Airline'),
+            flight_number=leg.get('flight_number', ''),
+            airline_logo=leg.get('airline_logo', ''),
+            departure_airport=departure.get('name', ''),
+            departure_id=departure.get('id', ''),
+            departure_time=departure.get('time', ''),
+            arrival_airport=arrival.get('name', ''),
+            arrival_id=arrival.get('id', ''),
+            arrival_time=arrival.get('time', ''),
+            duration=leg.get('duration'),
+            airplane=leg.get('airplane', ''),
+            travel_class=leg.get('travel_class', ''),
+        )
+
+    @property
+    def date(self):
+        return self.departure_time.split(' ')[0] if self.departure_time else ''
+
+    @property
+    def departs_at(self):
+        return self.departure_time.split(' ')[-1] if self.departure_time else ''
+
+    @property
+    def arrives_at(self):
+        return self.arrival_time.split(' ')[-1] if self.arrival_time else ''
+
+    def summary(self):
+        return (f"{self.airline} {self.flight_number} from {self.departure_airport} ({self.departure_id}) "
+                f"at {self.departs_at} to {self.arrival_airport} ({self.arrival_id}) at {self.arrives_at} on {self.date}")
+
+
+@dataclass(slots=True)
+class FlightOption:
+    legs: List[FlightLeg] = field(default_factory=list)
+    price: Optional[float] = None
+    currency: str = 'USD'
+    total_duration: Optional[int] = None
+    google_flights_url: str = ''
+    link: str = ''
+
+    @classmethod
+    def from_serpapi(cls, option):
+        return cls(
+            legs=[FlightLeg.from_serpapi(leg) for leg in option.get('flights', [])],
+            price=option.get('price'),
+            currency=option.get('currency', 'USD'),
+            total_duration=option.get('total_duration'),
+            google_flights_url=option.get('google_flights_url', ''),
+            link=option.get('link', ''),
+        )
+
+    @property
+    def booking(self):
+        """(label, url) of the booking link, or None."""
+        if self.google_flights_url:
+            return 'Book on Google Flights', self.google_flights_url
+        if self.link:
+            return 'Book', self.link
+        return None
+
+
+@dataclass(slots=True)
+class DateOption:
+    """One outbound/return combination from a flexible-dates price calendar."""
+    outbound: str = ''  # 'YYYY-MM-DD'
+    return_date: str = ''
+    price: Optional[float] = None
+    currency: str = 'USD'
+
+    def summary(self):
+        outbound, return_date = date.fromisoformat(self.outbound), date.fromisoformat(self.return_date)
+        return (f"{outbound:%a %d %b} → {return_date:%a %d %b} "
+                f"({(return_date - outbound).days} nights): from {_money(self.price, self.currency)}")
+
+
+@dataclass(slots=True)
+class TripOption:
+    """A flight and hotel pair within the trip budget (see agents.trip_budget)."""
+    flight: str = ''  # airlines and stops
+    hotel: str = ''
+    flight_price: Optional[float] = None
+    hotel_price: Optional[float] = None
+    total: Optional[float] = None
+    currency: str = 'USD'
+
+    @classmethod
+    def from_serpapi(cls, option, hotel, total):
+        legs = [FlightLeg.from_serpapi(leg) for leg in option.get('flights', [])]
+        stops = len(option.get('layovers', legs[1:]))
+        airlines = ', '.join(dict.fromkeys(leg.airline for leg in legs)) or 'Flight'
+        return cls(
+            flight=f"{airlines}, {'nonstop' if not stops else f'{stops} stop' + ('s' if stops > 1 else '')}",
+            hotel=hotel.get('name', 'Unknown Hotel'),
+            flight_price=option.get('price'),
+            hotel_price=_rate(hotel.get('total_rate')),
+            total=total,
+            currency=option.get('currency', 'USD'),
+        )
+
+    def summary(self):
+        return (f"{self.flight} + {self.hotel}: {_money(self.total, self.currency)} "
+                f"(flight {_money(self.flight_price, self.currency)}, hotel {_money(self.hotel_price, self.currency)})")
+
+
+@dataclass(slots=True)
+class NearbyPlace:
+    name: str = ''
+    transportations: List[str] = field(default_factory=list)  # e.g. 'Taxi (10 min)'
+
+
+@dataclass(slots=True)
+class HotelOption:
+    name: str = 'Unknown Hotel'
+    description: str = ''
+    hotel_class: str = ''
+    overall_rating: object = 'N/A'
+    reviews: object = 'N/A'
+    check_in_time: str = ''
+    check_out_time: str = ''
+    rate_per_night: object = None
+    total_rate: object = None
+    amenities: Optional[List[str]] = None
+    nearby_places: Optional[List[NearbyPlace]] = None
+    link: str = ''
+    thumbnail: str = ''
+
+    @classmethod
+    def from_serpapi(cls, hotel):
+        nearby = hotel.get('nearby_places')
+        return cls(
+            name=hotel.get('name', 'Unknown Hotel'),
+            description=hotel.get('description', ''),
+            hotel_class=hotel.get('hotel_class', ''),
+            overall_rating=hotel.get('overall_rating', 'N/A'),
+            reviews=hotel.get('reviews', 'N/A'),
+            check_in_time=hotel.get('check_in_time', ''),
+            check_out_time=hotel.get('check_out_time', ''),
+            rate_per_night=_rate(hotel['rate_per_night']) if 'rate_per_night' in hotel else None,
+            total_rate=_rate(hotel['total_rate']) if 'total_rate' in hotel else None,
+            amenities=list(hotel['amenities']) if 'amenities' in hotel else None,
+            nearby_places=None if nearby is None else [
+                NearbyPlace(place.get('name', ''), [f"{t['type']} ({t['duration']})" for t in place.get('transportations', [])])
+                for place in nearby
+            ],
+            link=hotel.get('link', ''),
+            thumbnail=next((image.get('thumbnail', '') for image in hotel.get('images', [])[:1]), ''),
+        )
+
+    def fields(self):
+        """(label, value) rows in display order; optional rows are left out when SerpApi had no data."""
+        rows = [
+            ('Hotel', self.name),
+            ('Description', self.description),
+            ('Class', self.hotel_class),
+            ('Rating', f'{self.overall_rating}/5 ({self.reviews} reviews)'),
+            ('Check-in', f'{self.check_in_time}, Check-out: {self.check_out_time}'),
+        ]
+        if self.rate_per_night is not None:
+            rows.append(('Rate per night', self.rate_per_night))
+        if self.total_rate is not None:
+            rows.append(('Total rate', self.total_rate))
+        if self.amenities is not None:
+            rows.append(('Amenities', ', '.join(self.amenities)))
+        return rows
+
+
+@dataclass(slots=True)
+class Itinerary:
+    departure_city: str = ''
+    arrival_city: str = ''
+    check_in: str = ''
+    check_out: str = ''
+    flights: List[FlightOption] = field(default_factory=list)
+    hotels: List[HotelOption] = field(default_factory=list)
+    # Set instead of the options when a search failed or timed out
+    flights_message: Optional[str] = None
+    hotels_message: Optional[str] = None
+    daily_plan: str = ''
+    # Cheapest date combinations when the dates were flexible, cheapest (and chosen) first
+    date_options: List[DateOption] = field(default_factory=list)
+    # Best flight + hotel pairs when the query set a budget
+    budget: Optional[float] = None
+    trip_options: List[TripOption] = field(default_factory=list)
+
+    def set_flights(self, result):
+        """Populate from flights_finder output: a list of options, one option dict, or an error string."""
+        self.flights, self.flights_message = [], None
+        if isinstance(result, dict):
+            result = [result]
+        if isinstance(result, list):
+            self.flights = [FlightOption.from_serpapi(option) for option in result]
+        elif isinstance(result, str):
+            self.flights_message = result
+
+    def set_hotels(self, result):
+        """Populate from hotels_finder output: a list of properties, one property dict, or an error string."""
+        self.hotels, self.hotels_message = [], None
+        if isinstance(result, dict):
+            result = [result]
+        if isinstance(result, list):
+            self.hotels = [HotelOption.from_serpapi(hotel) for hotel in result]
+        elif isinstance(result, str):
+            self.hotels_message = result
+
+    @property
+    def trips_heading(self):
+        if self.budget is None:
+            return 'Best flight + hotel combinations'
+        return f'Best trips under {_money(self.budget)}'
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data['flights'] = [
+            FlightOption(**dict(option, legs=[FlightLeg(**leg) for leg in option.get('legs', [])]))
+            for option in data.get('flights', [])
+        ]
+        data['hotels'] = [
+            HotelOption(**dict(hotel, nearby_places=None if hotel.get('nearby_places') is None else [
+                NearbyPlace(**place) for place in hotel['nearby_places']
+            ]))
+            for hotel in data.get('hotels', [])
+        ]
+        data['date_options'] = [DateOption(**option) for option in data.get('date_options', [])]
+        data['trip_options'] = [TripOption(**option) for option in data.get('trip_options', [])]
+        return cls(**data)
+
+
+# Markdown (Streamlit display, chat history)
+
+def write_flights_markdown(out, itinerary):
+    if itinerary.date_options:
+        out.write("\n📅 CHEAPEST DATES\n\n")
+        for option in itinerary.date_options:
+            out.write(f"  - {option.summary()}\n")
+    if itinerary.flights:
+        out.write("\n✈️ FLIGHTS\n\n")
+        for idx, option in enumerate(itinerary.flights, start=1):
+            out.write(f"<div style=\"font-weight:700;font-size:1.15em;\">Option {idx}:</div>\n")
+            for leg in option.legs:
+                out.write(f"  - {leg.summary()}\n")
+                if leg.airline_logo:
+                    out.write(f"    <img src=\"{leg.airline_logo}\" alt=\"{leg.airline}\" width=\"70\" height=\"70\"><br>\n")
+            if option.booking:
+                label, url = option.booking
+                out.write(f"  [{label}]({url})\n")
+    elif itinerary.flights_message is not None:
+        out.write(f"Flights: {itinerary.flights_message}\n")
+    else:
+        out.write("No flights found.\n")
+
+
+def write_hotels_markdown(out, itinerary):
+    if itinerary.hotels:
+        out.write("\n🏨 HOTELS\n\n")
+        for idx, hotel in enumerate(itinerary.hotels, start=1):
+            out.write(f"\n<div style=\"font-weight:700;font-size:1.15em;\">Option {idx}:</div>\n")
+            for label, value in hotel.fields():
+                out.write(f"{label}: {value}\n")
+            if hotel.nearby_places is not None:
+                out.write("Nearby places:\n")
+                for place in hotel.nearby_places:
+                    out.write(f"  - {place.name}: {', '.join(place.transportations)}\n")
+            if hotel.link:
+                out.write(f"Website: <a href=\"{hotel.link}\">{hotel.link}</a>\n")
+    elif itinerary.hotels_message is not None:
+        out.write(f"Hotels: {itinerary.hotels_message}\n")
+    else:
+        out.write("No hotels found.\n")
+    if itinerary.trip_options:
+        out.write(f"\n💰 {itinerary.trips_heading.upper()}\n\n")
+        for trip in itinerary.trip_options:
+            out.write(f"  - {trip.summary()}\n")
+
+
+def _render(writer, itinerary):
+    out = io.StringIO()
+    writer(out, itinerary)
+    return out.getvalue()
+
+
+def flights_markdown(itinerary):
+    return _render(write_flights_markdown, itinerary)
+
+
+def hotels_markdown(itinerary):
+    return _render(write_hotels_markdown, itinerary)
+
+
+def write_markdown(out, itinerary):
+    write_flights_markdown(out, itinerary)
+    out.write("\n")
+    write_hotels_markdown(out, itinerary)
+    out.write(itinerary.daily_plan)
+
+
+def render_markdown(itinerary):
+    """The full itinerary as Streamlit Markdown: flights, hotels, then the daily plan."""
+    return _render(write_markdown, itinerary)
+
+
+# HTML (browser PDF backend, email)
+
+def write_html(out, itinerary):
+    e = html.escape
+    if itinerary.date_options:
+        out.write('<h2>📅 Cheapest dates</h2>\n<ul>\n')
+        for option in itinerary.date_options:
+            out.write(f'<li>{e(option.summary())}</li>\n')
+        out.write('</ul>\n')
+    if itinerary.flights:
+        out.write('<h2>✈️ Flights</h2>\n<ol>\n')
+        for option in itinerary.flights:
+            out.write('<li class="block">\n')
+            for leg in option.legs:
+                out.write(f'<div>{e(leg.summary())}</div>\n')
+                if leg.airline_logo:
+                    out.write(f'<img src="{e(leg.airline_logo)}" alt="{e(leg.airline)}" width="70" height="70"><br>\n')
+            if option.booking:
+                label, url = option.booking
+                out.write(f'<a href="{e(url)}">{e(label)}</a>\n')
+            out.write('</li>\n')
+        out.write('</ol>\n')
+    else:
+        out.write(f'<p>{e(itinerary.flights_message or "No flights found.")}</p>\n')
+
+    if itinerary.hotels:
+        out.write('<h2>🏨 Hotels</h2>\n<ol>\n')
+        for hotel in itinerary.hotels:
+            out.write('<li class="block">\n')
+            for label, value in hotel.fields():
+                out.write(f'<strong>{e(label)}:</strong> {e(str(value))}<br>\n')
+            if hotel.nearby_places:
+                out.write('<strong>Nearby places:</strong>\n<ul>\n')
+                for place in hotel.nearby_places:
+                    out.write(f'<li>{e(place.name)}: {e(", ".join(place.transportations))}</li>\n')
+                out.write('</ul>\n')
+            if hotel.link:
+                out.write(f'<strong>Website:</strong> <a href="{e(hotel.link)}">{e(hotel.link)}</a>\n')
+            out.write('</li>\n')
+        out.write('</ol>\n')
+    else:
+        out.write(f'<p>{e(itinerary.hotels_message or "No hotels found.")}</p>\n')
+
+    if itinerary.trip_options:
+        out.write(f'<h2>💰 {e(itinerary.trips_heading)}</h2>\n<ul>\n')
+        for trip in itinerary.trip_options:
+            out.write(f'<li>{e(trip.summary())}</li>\n')
+        out.write('</ul>\n')
+
+    if itinerary.daily_plan:
+        out.write(markdown_fragment(itinerary.daily_plan))
+
+
+def render_html(itinerary):
+    """The full itinerary as a standalone, styled HTML document."""
+    return html_document(_render(write_html, itinerary))
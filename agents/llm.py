@@ -0,0 +1,54 @@
+"""
+Process-wide LLM clients shared by every Agent (and so by every Streamlit session).
+
+Each provider gets one pooled httpx.Client, so concurrent sessions reuse keep-alive
+connections instead of each opening their own; the chat model objects are stateless
+between calls and safe to share across threads.
+"""
+import os
+import threading
+
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', '20'))
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '60'))
+
+TOOLS_MODEL = 'llama-3.3-70b-versatile'
+EMAIL_MODEL = 'gpt-4o'
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _shared(name, factory):
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def _http_client():
+    import httpx
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+        timeout=LLM_TIMEOUT_SECONDS,
+    )
+
+
+def get_tools_llm(tools):
+    """The Groq tool-calling model with `tools` bound; built once per process."""
+    def build():
+        from langchain_groq import ChatGroq
+        groq_api_key = os.getenv("GROQ_API_KEY")
+        if not groq_api_key:
+            raise ValueError("GROQ_API_KEY not found in environment variables. Please add it to your .env file.")
+        return ChatGroq(model=TOOLS_MODEL, groq_api_key=groq_api_key, temperature=0.3,
+                        http_client=_http_client()).bind_tools(tools)
+    return _shared(('tools_llm', *(tool.name for tool in tools)), build)
+
+
+def get_email_llm():
+    """GPT-4o for the opt-in LLM email conversion; built on first use."""
+    def build():
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model=EMAIL_MODEL, temperature=0.1, http_client=_http_client())
+    return _shared('email_llm', build)
+
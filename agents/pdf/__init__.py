@@ -0,0 +1,12 @@
+from agents.pdf.backends import PDF_BACKENDS, PdfBackend, register_backend, render_itinerary_pdf
+from agents.pdf.browser_pool import BrowserPool, PoolMetrics, get_browser_pool
+
+__all__ = [
+    'PDF_BACKENDS',
+    'BrowserPool',
+    'PdfBackend',
+    'PoolMetrics',
+    'get_browser_pool',
+    'register_backend',
+    'render_itinerary_pdf',
+]
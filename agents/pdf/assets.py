@@ -0,0 +1,143 @@
+"""
+Local cache of the images (airline logos, hotel photos) embedded in native PDFs.
+
+Images are stored as baseline JPEG, which PDF embeds as-is (DCTDecode), under
+PDF_ASSET_CACHE (default .cache/pdf_assets, relative to the project root) keyed by the URL hash. Other formats are
+converted with Pillow when it is installed and skipped otherwise.
+"""
+import hashlib
+import io
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from agents.tools.airport_index import PROJECT_ROOT
+
+ASSET_CACHE_DIR = os.path.join(PROJECT_ROOT, os.getenv('PDF_ASSET_CACHE', os.path.join('.cache', 'pdf_assets')))
+FETCH_TIMEOUT_SECONDS = 5
+FETCH_WORKERS = 8
+# Logos are shown at most ~140pt wide; larger photos are downscaled before caching.
+MAX_PIXELS = 400
+
+# JPEG start-of-frame markers (all except DHT, JPG and DAC)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class JpegImage(NamedTuple):
+    data: bytes
+    width: int
+    height: int
+    components: int
+
+
+def jpeg_info(data):
+    """JpegImage for raw JPEG bytes, or None if `data` is not a readable JPEG."""
+    if not data.startswith(b'\xff\xd8'):
+        return None
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        (length,) = struct.unpack('>H', data[position + 2:position + 4])
+        if marker in _SOF_MARKERS:
+            if position + 10 > len(data):
+                return None
+            height, width = struct.unpack('>HH', data[position + 5:position + 9])
+            return JpegImage(data, width, height, data[position + 9])
+        position += 2 + length
+    return None
+
+
+def _to_jpeg(data):
+    info = jpeg_info(data)
+    if info is not None and info.components in (1, 3) and max(info.width, info.height) <= MAX_PIXELS:
+        return data
+    try:
+        from PIL import Image
+    except ImportError:
+        return data if info is not None else None
+    image = Image.open(io.BytesIO(data))
+    image.thumbnail((MAX_PIXELS, MAX_PIXELS))
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # Flatten transparent logos onto the white page
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode != 'L':
+        image = image.convert('RGB')
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=85)
+    return output.getvalue()
+
+
+class AssetCache:
+
+    def __init__(self, directory=ASSET_CACHE_DIR):
+        self._directory = directory
+        self._images = {}  # source -> JpegImage, or None when it could not be loaded
+        self._lock = threading.Lock()
+        import requests  # only needed once a PDF embeds remote images
+        self._session = requests.Session()
+
+    def get(self, source):
+        """JpegImage for a URL or local path, fetched once and then served from disk/memory."""
+        with self._lock:
+            if source in self._images:
+                return self._images[source]
+        image = self._load(source)
+        with self._lock:
+            self._images[source] = image
+        return image
+
+    def prefetch(self, sources):
+        """Load several images concurrently; returns {source: JpegImage or None}."""
+        sources = list(dict.fromkeys(sources))
+        if len(sources) <= 1:
+            return {source: self.get(source) for source in sources}
+        with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(sources))) as executor:
+            return dict(zip(sources, executor.map(self.get, sources)))
+
+    def _load(self, source):
+        path = os.path.join(self._directory, hashlib.sha1(source.encode('utf-8')).hexdigest() + '.jpg')
+        try:
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return jpeg_info(f.read())
+
+            if source.startswith(('http://', 'https://')):
+                response = self._session.get(source, timeout=FETCH_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                data = response.content
+            else:
+                with open(source, 'rb') as f:
+                    data = f.read()
+
+            jpeg = _to_jpeg(data)
+            if jpeg is None:
+                return None
+            os.makedirs(self._directory, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(jpeg)
+            return jpeg_info(jpeg)
+        except Exception as e:
+            print(f'[PdfAssets] Could not load image {source}: {e!r}')
+            return None
+
+
+_asset_cache = None
+_asset_cache_lock = threading.Lock()
+
+
+def get_asset_cache():
+    global _asset_cache
+    with _asset_cache_lock:
+        if _asset_cache is None:
+            _asset_cache = AssetCache()
+        return _asset_cache
@@ -0,0 +1,102 @@
+"""
+Pluggable PDF backends for itinerary export.
+
+`render_itinerary_pdf` tries the backend named by PDF_BACKEND (default "native") and
+falls back to the others in registration order, so a missing Chromium never blocks
+the export and a native layout problem (or text in a script the standard PDF fonts
+cannot draw) can still fall back to the browser.
+"""
+import importlib.util
+import os
+
+from agents.pdf.browser_pool import get_browser_pool
+from agents.pdf.html import markdown_to_html
+from agents.pdf.native import UnsupportedTextError, render_pdf
+
+
+class PdfBackend:
+    """
+    Turns an itinerary into PDF bytes. `content` is an `agents.itinerary.Itinerary`
+    or, for itineraries without structured data, the Markdown text with inline HTML.
+    """
+
+    name = None
+
+    def available(self) -> bool:
+        return True
+
+    def render(self, content) -> bytes:
+        raise NotImplementedError
+
+
+class NativeBackend(PdfBackend):
+    """Pure-Python layout: no browser, no subprocess, cached JPEG logos."""
+
+    name = 'native'
+
+    def render(self, content):
+        # Text outside WinAnsi raises UnsupportedTextError, so a browser backend gets to draw it
+        return render_pdf(content, strict=True)
+
+
+class PlaywrightBackend(PdfBackend):
+    """Headless Chromium from the shared browser pool; full CSS fidelity."""
+
+    name = 'playwright'
+
+    def available(self):
+        return importlib.util.find_spec('playwright') is not None
+
+    def render(self, content):
+        if isinstance(content, str):
+            html = markdown_to_html(content)
+        else:
+            from agents.itinerary import render_html
+            html = render_html(content)
+        pool = get_browser_pool()
+        pdf_bytes = pool.render(html)
+        print(f'[PDF] Rendered itinerary PDF, pool stats: {pool.stats()}')
+        return pdf_bytes
+
+
+PDF_BACKENDS = {}
+
+
+def register_backend(backend):
+    """Add (or replace) a backend instance under its `name`."""
+    PDF_BACKENDS[backend.name] = backend
+    return backend
+
+
+register_backend(NativeBackend())
+register_backend(PlaywrightBackend())
+
+
+def backend_order(preferred=None):
+    preferred = preferred or os.getenv('PDF_BACKEND', 'native')
+    names = [preferred] + [name for name in PDF_BACKENDS if name != preferred]
+    return [PDF_BACKENDS[name] for name in names if name in PDF_BACKENDS]
+
+
+def render_itinerary_pdf(content, preferred=None):
+    """
+    PDF bytes from the first available backend that succeeds; raises the last error otherwise.
+    When only the text was the native backend's problem, its PDF with '?' for the letters
+    the standard fonts lack beats no PDF at all.
+    """
+    error = RuntimeError('No PDF backend is available. Install playwright or enable the native backend.')
+    unsupported_text = False
+    for backend in backend_order(preferred):
+        if not backend.available():
+            continue
+        try:
+            return backend.render(content)
+        except UnsupportedTextError as e:
+            print(f'[PDF] {backend.name} backend cannot draw the text: {e}')
+            unsupported_text = True
+        except Exception as e:
+            print(f'[PDF] {backend.name} backend failed: {e!r}')
+            error = e
+    if unsupported_text:
+        return render_pdf(content)
+    raise error
@@ -0,0 +1,252 @@
+"""
+Process-wide pool of warm headless Chromium browsers for HTML -> PDF rendering.
+
+Each worker thread owns one Playwright instance and one browser (the sync API must
+stay on the thread that created it) and renders queued jobs in a fresh browser
+context. Browsers are health-checked before every job and recycled after
+`max_pages` renders, so a leaking or crashed Chromium is replaced transparently.
+A worker that cannot start Playwright leaves the pool; queued jobs only fail once
+no worker is left, and the next render starts the missing workers again.
+"""
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+PDF_OPTIONS = {
+    'format': 'A4',
+    'print_background': True,
+    'margin': {'top': '12mm', 'bottom': '12mm', 'left': '12mm', 'right': '12mm'},
+}
+VIEWPORT = {'width': 1024, 'height': 1280}
+
+# Recent render durations kept for the latency percentiles.
+_TIMING_WINDOW = 200
+
+
+class PoolMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.failures = 0
+        self.launches = 0
+        self.recycles = 0
+        self.busy = 0
+        self._render_ms = deque(maxlen=_TIMING_WINDOW)
+        self._wait_ms = deque(maxlen=_TIMING_WINDOW)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record(self, wait_ms, render_ms):
+        with self._lock:
+            self.renders += 1
+            self._wait_ms.append(wait_ms)
+            self._render_ms.append(render_ms)
+
+    def snapshot(self):
+        with self._lock:
+            render_ms = sorted(self._render_ms)
+            wait_ms = sorted(self._wait_ms)
+            counts = {name: getattr(self, name) for name in ('renders', 'failures', 'launches', 'recycles', 'busy')}
+
+        def percentile(values, p):
+            return round(values[min(len(values) - 1, int(p * len(values)))], 1) if values else None
+        return dict(counts,
+                    render_ms_p50=percentile(render_ms, 0.5), render_ms_p95=percentile(render_ms, 0.95),
+                    queue_wait_ms_p50=percentile(wait_ms, 0.5), queue_wait_ms_p95=percentile(wait_ms, 0.95))
+
+
+class _Job:
+    __slots__ = ('html', 'future', 'queued_at')
+
+    def __init__(self, html):
+        self.html = html
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+
+
+class BrowserPool:
+    """
+    Bounded pool of `workers` warm browsers fed from a queue of at most `queue_size`
+    jobs. Workers start lazily on the first render.
+    """
+
+    def __init__(self, workers=2, max_pages=50, queue_size=32, timeout=60.0):
+        self.workers = workers
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.metrics = PoolMetrics()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._live = 0  # workers started and not failed
+        self._start_error = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, html):
+        """Queue `html` for rendering; the returned Future resolves to the PDF bytes."""
+        if self._closed:
+            raise RuntimeError('PDF browser pool is closed')
+        self._start()
+        job = _Job(html)
+        try:
+            self._queue.put(job, timeout=self.timeout)
+        except queue.Full:
+            raise RuntimeError(f'PDF render queue is full ({self._queue.maxsize} jobs waiting)') from None
+        with self._lock:
+            orphaned = self._live == 0
+        if orphaned:
+            # Every worker failed to start after this job's _start(); nobody is left to take it
+            self._fail_queued(self._start_error)
+        return job.future
+
+    def render(self, html, timeout=None):
+        """Render `html` to PDF bytes, waiting for a free browser. Raises on failure or timeout."""
+        future = self.submit(html)
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except TimeoutError:
+            # Still queued: drop it, so a browser is not spent on a render nobody waits for
+            future.cancel()
+            raise
+
+    def stats(self):
+        """Queue depth, worker counts and render latency (ms) for monitoring."""
+        return dict(self.metrics.snapshot(), queue_depth=self._queue.qsize(), workers=self._live)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = [thread for thread in self._threads if thread.is_alive()]
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=10)
+
+    def _start(self):
+        if self._live >= self.workers:
+            return
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while self._live < self.workers:
+                self._live += 1
+                thread = threading.Thread(target=self._work, name=f'pdf-browser-{len(self._threads)}', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def _fail_queued(self, error):
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None and job.future.set_running_or_notify_cancel():
+                self.metrics.add(failures=1)
+                job.future.set_exception(error)
+
+    def _work(self):
+        try:
+            if sys.platform.startswith('win'):
+                import asyncio
+                # Proactor loop supports the subprocess Playwright uses on Windows
+                asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+            from playwright.sync_api import sync_playwright
+            with sync_playwright() as playwright:
+                self._serve(playwright)
+        except Exception as e:
+            # Playwright missing or unable to start: leave the jobs to the healthy workers
+            with self._lock:
+                self._live -= 1
+                self._start_error = e
+                left = self._live
+            print(f'[BrowserPool] Worker could not start Playwright ({left} left): {e!r}')
+            if not left:
+                # ... unless there are none, rather than leaving the jobs queued until they time out
+                self._fail_queued(e)
+
+    def _serve(self, playwright):
+        browser, pages = None, 0
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self.metrics.add(busy=1)
+            try:
+                # Health check: replace crashed browsers and recycle long-lived ones
+                if browser is not None and (not browser.is_connected() or pages >= self.max_pages):
+                    self.metrics.add(recycles=1)
+                    self._close_browser(browser)
+                    browser = None
+                if browser is None:
+                    browser, pages = playwright.chromium.launch(headless=True), 0
+                    self.metrics.add(launches=1)
+
+                started = time.perf_counter()
+                pdf_bytes = self._render(browser, job.html)
+                pages += 1
+                self.metrics.record((started - job.queued_at) * 1000, (time.perf_counter() - started) * 1000)
+                job.future.set_result(pdf_bytes)
+            except Exception as e:
+                print(f'[BrowserPool] Render failed: {e!r}')
+                self.metrics.add(failures=1)
+                job.future.set_exception(e)
+                # A failed render may have left the browser unusable; start fresh next time
+                self._close_browser(browser)
+                browser = None
+            finally:
+                self.metrics.add(busy=-1)
+        self._close_browser(browser)
+
+    @staticmethod
+    def _render(browser, html):
+        context = browser.new_context(viewport=VIEWPORT)
+        try:
+            page = context.new_page()
+            page.set_content(html, wait_until='load')
+            page.emulate_media(media='print')
+            return page.pdf(**PDF_OPTIONS)
+        finally:
+            context.close()
+
+    @staticmethod
+    def _close_browser(browser):
+        if browser is None:
+            return
+        try:
+            browser.close()
+        except Exception:
+            pass
+
+
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Process-wide pool shared by all Streamlit sessions, configured from the environment:
+    PDF_BROWSER_WORKERS (default 2), PDF_BROWSER_MAX_PAGES (renders before a browser is
+    recycled, default 50) and PDF_RENDER_TIMEOUT (seconds, default 60).
+    """
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool(
+                workers=int(os.getenv('PDF_BROWSER_WORKERS', '2')),
+                max_pages=int(os.getenv('PDF_BROWSER_MAX_PAGES', '50')),
+                timeout=float(os.getenv('PDF_RENDER_TIMEOUT', '60')),
+            )
+            atexit.register(_browser_pool.close)
+        return _browser_pool
@@ -0,0 +1,63 @@
+# Basic CSS for readability in PDF
+STYLES = """
+    <style>
+      body { font-family: -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif; color: #222; line-height: 1.5; }
+      h1, h2, h3 { margin: 0.6rem 0 0.4rem; font-weight: 700; }
+      h1 { font-size: 1.6rem; }
+      h2 { font-size: 1.3rem; }
+      h3 { font-size: 1.1rem; }
+      p { margin: 0.3rem 0; }
+      ul, ol { margin: 0.2rem 0 0.6rem 1.2rem; }
+      li { margin: 0.15rem 0; }
+      hr { border: none; border-top: 1px solid #ddd; margin: 0.8rem 0; }
+      img { max-width: 140px; height: auto; display: inline-block; margin: 0.2rem 0; }
+      .section-title { margin-top: 0.8rem; font-size: 1.2rem; font-weight: 700; }
+      .badge { display: inline-block; padding: 2px 8px; border-radius: 6px; background: #f2f4f7; font-size: 0.85rem; }
+      .muted { color: #666; }
+      a { color: #0b63c9; text-decoration: none; }
+      a:hover { text-decoration: underline; }
+      .block { margin: 0.6rem 0; }
+      .mono { font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace; }
+    </style>
+    """
+
+
+def markdown_fragment(content: str) -> str:
+    """Convert mixed Markdown/HTML to an HTML fragment."""
+    try:
+        import markdown  # type: ignore
+        # Convert markdown to HTML while preserving any inline HTML
+        return markdown.markdown(
+            content,
+            extensions=[
+                'extra',
+                'sane_lists',
+                'nl2br',
+                'smarty'
+            ]
+        )
+    except Exception:
+        # Fallback: minimal escaping and line breaks
+        import html as _html
+        return _html.escape(content).replace('\n', '<br>')
+
+
+def html_document(html_body: str) -> str:
+    """Wrap an HTML fragment in a clean document with the PDF styles."""
+    return f"""
+    <html>
+      <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        {STYLES}
+      </head>
+      <body>
+        {html_body}
+      </body>
+    </html>
+    """
+
+
+def markdown_to_html(content: str) -> str:
+    """Convert mixed Markdown/HTML to full HTML with basic styles for PDF."""
+    return html_document(markdown_fragment(content))
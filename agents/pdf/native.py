@@ -0,0 +1,418 @@
+"""
+Browser-free PDF renderer for itineraries.
+
+Lays out the itinerary text (the Markdown / inline-HTML mix produced by the agent)
+directly as PDF drawing operations with the standard Helvetica fonts, so no font
+files, browser or subprocess are needed. Images are embedded as JPEG via the
+asset cache, links become clickable annotations.
+"""
+import html
+import re
+import unicodedata
+import zlib
+
+from agents.pdf.assets import get_asset_cache
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89  # A4 in points
+MARGIN = 34.0  # 12mm
+LINK_COLOR = (0.04, 0.39, 0.79)
+RULE_COLOR = 0.87
+
+# Helvetica / Helvetica-Bold advance widths (1/1000 em) for ASCII 32..126, from the AFM files
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+_FONTS = {'regular': ('F1', _HELVETICA), 'bold': ('F2', _HELVETICA_BOLD), 'link': ('F1', _HELVETICA)}
+
+# Symbols the standard fonts cannot draw; other symbols and emoji outside cp1252 are dropped.
+_SYMBOLS = {'⭐': '*', '★': '*', '→': '->', '–': '-', '—': '-', '•': '-'}
+_WIN_ANSI = frozenset(bytes(range(256)).decode('cp1252', errors='ignore'))
+# Stands in for a letter the fonts lack ("東京"); drawn as '?'
+MISSING_GLYPH = '\ufffd'
+
+_IMG = re.compile(r'<img\s[^>]*?src="([^"]+)"[^>]*>', re.IGNORECASE)
+_INLINE = re.compile(r'\*\*(.+?)\*\*|\[([^\]]+)\]\(([^)\s]+)\)|<a\s[^>]*?href="([^"]+)"[^>]*>(.*?)</a>', re.IGNORECASE)
+_TAG = re.compile(r'<[^>]+>')
+_BOLD_DIV = re.compile(r'<div[^>]*font-weight:\s*(?:700|bold)', re.IGNORECASE)
+_HEADING = re.compile(r'^(#{1,6})\s+(.*)$')
+_BULLET = re.compile(r'^(\s*)[-*]\s+(.*)$')
+_SECTION = re.compile(r'^[^\w\s*#<\[]+\s*[A-Z][A-Z &-]+$')  # "✈️ FLIGHTS", "🏨 HOTELS"
+
+
+class UnsupportedTextError(ValueError):
+    """The itinerary has text (e.g. a non-Latin script) the standard PDF fonts cannot draw."""
+
+
+def _glyph(c):
+    if c in _WIN_ANSI:
+        return c
+    # Emoji, variation selectors and joiners are decoration; anything else is content
+    return '' if unicodedata.category(c) in ('So', 'Sk', 'Mn', 'Me', 'Cf', 'Co', 'Cs') else MISSING_GLYPH
+
+
+def pdf_text(text):
+    """Text the WinAnsi-encoded standard fonts can draw, with MISSING_GLYPH for letters they lack."""
+    text = ''.join(_SYMBOLS.get(c, c) for c in html.unescape(text))
+    if all(c in _WIN_ANSI for c in text):
+        return text
+    return ''.join(map(_glyph, text))
+
+
+def text_width(text, style, size):
+    widths = _FONTS[style][1]
+    return sum(widths[ord(c) - 32] if 32 <= ord(c) <= 126 else 556 for c in text) * size / 1000
+
+
+def _escape(text):
+    data = text.encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def parse_inline(text, style='regular'):
+    """[(text, style, url)] runs for one line: bold, Markdown / HTML links, plain text."""
+    runs = []
+    position = 0
+    for match in _INLINE.finditer(text):
+        if match.start() > position:
+            runs.append((text[position:match.start()], style, None))
+        if match.group(1) is not None:
+            runs.extend(parse_inline(match.group(1), 'bold'))
+        elif match.group(2) is not None:
+            runs.append((match.group(2), 'link', match.group(3)))
+        else:
+            runs.append((match.group(5), 'link', match.group(4)))
+        position = match.end()
+    runs.append((text[position:], style, None))
+    cleaned = [(pdf_text(_TAG.sub('', run)), run_style, url) for run, run_style, url in runs]
+    # Emoji that cannot be drawn leave their separating space behind
+    while cleaned and not cleaned[0][0].strip():
+        cleaned.pop(0)
+    if cleaned:
+        cleaned[0] = (cleaned[0][0].lstrip(),) + cleaned[0][1:]
+    return [run for run in cleaned if run[0]]
+
+
+def parse_blocks(content):
+    """
+    Split itinerary text into layout blocks:
+    ('heading', level, runs), ('bullet', depth, runs), ('text', runs), ('image', src), ('rule',), ('space',).
+    """
+    blocks = []
+    for line in content.splitlines():
+        images = _IMG.findall(line)
+        stripped = _IMG.sub('', line).strip()
+        if stripped in ('', '<br>', '<br/>'):
+            if not images and blocks and blocks[-1][0] != 'space':
+                blocks.append(('space',))
+        elif re.fullmatch(r'-{3,}|\*{3,}|<hr\s*/?>', stripped):
+            blocks.append(('rule',))
+        elif _HEADING.match(stripped):
+            hashes, text = _HEADING.match(stripped).groups()
+            blocks.append(('heading', len(hashes), parse_inline(text, 'bold')))
+        elif _SECTION.match(stripped):
+            blocks.append(('heading', 2, parse_inline(stripped, 'bold')))
+        elif _BOLD_DIV.match(stripped):
+            blocks.append(('heading', 4, parse_inline(stripped, 'bold')))
+        elif _BULLET.match(line.rstrip()):
+            indent, text = _BULLET.match(line.rstrip()).groups()
+            blocks.append(('bullet', len(indent.replace('\t', '  ')) // 2, parse_inline(text)))
+        else:
+            blocks.append(('text', parse_inline(stripped)))
+        blocks.extend(('image', src) for src in images)
+    return [block for block in blocks if block[0] not in ('heading', 'bullet', 'text') or block[-1]]
+
+
+def _plain(text, style='regular', url=None):
+    return [(pdf_text(str(text)), style, url)]
+
+
+def itinerary_blocks(itinerary):
+    """Layout blocks straight from an `agents.itinerary.Itinerary`, without going through Markdown."""
+    blocks = []
+    if itinerary.date_options:
+        blocks.append(('heading', 2, _plain('CHEAPEST DATES', 'bold')))
+        blocks.extend(('bullet', 1, _plain(option.summary())) for option in itinerary.date_options)
+        blocks.append(('space',))
+    if itinerary.flights:
+        blocks.append(('heading', 2, _plain('FLIGHTS', 'bold')))
+        for idx, option in enumerate(itinerary.flights, start=1):
+            blocks.append(('heading', 4, _plain(f'Option {idx}:', 'bold')))
+            for leg in option.legs:
+                blocks.append(('bullet', 1, _plain(leg.summary())))
+                if leg.airline_logo:
+                    blocks.append(('image', leg.airline_logo))
+            if option.booking:
+                label, url = option.booking
+                blocks.append(('text', _plain(label, 'link', url)))
+    else:
+        blocks.append(('text', _plain(f'Flights: {itinerary.flights_message}' if itinerary.flights_message
+                                      else 'No flights found.')))
+    blocks.append(('space',))
+
+    if itinerary.hotels:
+        blocks.append(('heading', 2, _plain('HOTELS', 'bold')))
+        for idx, hotel in enumerate(itinerary.hotels, start=1):
+            blocks.append(('heading', 4, _plain(f'Option {idx}:', 'bold')))
+            for label, value in hotel.fields():
+                blocks.append(('text', _plain(f'{label}: ', 'bold') + _plain(value)))
+            if hotel.nearby_places is not None:
+                blocks.append(('text', _plain('Nearby places:', 'bold')))
+                for place in hotel.nearby_places:
+                    blocks.append(('bullet', 1, _plain(f"{place.name}: {', '.join(place.transportations)}")))
+            if hotel.link:
+                blocks.append(('text', _plain('Website: ', 'bold') + _plain(hotel.link, 'link', hotel.link)))
+    else:
+        blocks.append(('text', _plain(f'Hotels: {itinerary.hotels_message}' if itinerary.hotels_message
+                                      else 'No hotels found.')))
+    if itinerary.trip_options:
+        blocks.append(('space',))
+        blocks.append(('heading', 2, _plain(itinerary.trips_heading.upper(), 'bold')))
+        blocks.extend(('bullet', 1, _plain(trip.summary())) for trip in itinerary.trip_options)
+
+    blocks.extend(parse_blocks(itinerary.daily_plan))
+    return [block for block in blocks if block[0] not in ('heading', 'bullet', 'text') or any(run[0] for run in block[-1])]
+
+
+class PdfDocument:
+    """Minimal PDF 1.4 object writer."""
+
+    def __init__(self):
+        self._objects = []
+
+    def reserve(self):
+        self._objects.append(None)
+        return len(self._objects)
+
+    def set(self, number, body):
+        self._objects[number - 1] = body
+
+    def add(self, body):
+        number = self.reserve()
+        self.set(number, body)
+        return number
+
+    def add_stream(self, dictionary, data, compress=True):
+        if compress:
+            data = zlib.compress(data)
+            dictionary += b' /Filter /FlateDecode'
+        return self.add(b'<< ' + dictionary + b' /Length %d >>\nstream\n' % len(data) + data + b'\nendstream')
+
+    def tobytes(self, root):
+        output = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(self._objects, start=1):
+            offsets.append(len(output))
+            output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+        xref = len(output)
+        output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(self._objects) + 1)
+        output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        output += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(self._objects) + 1, root, xref)
+        return bytes(output)
+
+
+class _Page:
+
+    def __init__(self):
+        self.ops = []
+        self.links = []  # (x0, y0, x1, y1, url)
+        self.images = {}  # resource name -> object number
+
+
+class NativePdfRenderer:
+    """Flows itinerary blocks onto A4 pages."""
+
+    BODY_SIZE = 10.5
+    HEADING_SIZES = {1: 18, 2: 15, 3: 13, 4: 12, 5: 11, 6: 11}
+    LEADING = 1.35
+    LOGO_HEIGHT = 28.0
+    MAX_IMAGE_WIDTH = 140.0
+
+    def __init__(self, assets=None, strict=False):
+        self._assets = assets or get_asset_cache()
+        self._strict = strict
+
+    def render(self, content):
+        blocks = parse_blocks(content) if isinstance(content, str) else itinerary_blocks(content)
+        if self._strict:
+            missing = sum(text.count(MISSING_GLYPH) for block in blocks if block[0] in ('heading', 'bullet', 'text')
+                          for text, _, _ in block[-1])
+            if missing:
+                raise UnsupportedTextError(f'{missing} characters are outside the standard PDF fonts')
+        images = self._assets.prefetch(block[1] for block in blocks if block[0] == 'image')
+
+        self._doc = PdfDocument()
+        self._image_objects = {}
+        self._pages = []
+        self._new_page()
+        for block in blocks:
+            kind = block[0]
+            if kind == 'heading':
+                size = self.HEADING_SIZES[block[1]]
+                self._space(size * 0.5)
+                self._paragraph(block[2], size)
+                self._space(size * 0.2)
+            elif kind == 'bullet':
+                indent = 12 + 14 * block[1]
+                self._paragraph([('-  ', 'regular', None)] + block[2], self.BODY_SIZE, indent, hanging=9)
+            elif kind == 'text':
+                self._paragraph(block[1], self.BODY_SIZE)
+            elif kind == 'image' and images.get(block[1]) is not None:
+                self._image(images[block[1]])
+            elif kind == 'rule':
+                self._rule()
+            elif kind == 'space':
+                self._space(self.BODY_SIZE * 0.6)
+        return self._finish()
+
+    # Layout
+
+    def _new_page(self):
+        self._page = _Page()
+        self._pages.append(self._page)
+        self._y = PAGE_HEIGHT - MARGIN
+
+    def _ensure(self, height):
+        if self._y - height < MARGIN:
+            self._new_page()
+
+    def _space(self, height):
+        if self._y < PAGE_HEIGHT - MARGIN:
+            self._y -= height
+
+    def _paragraph(self, runs, size, indent=0.0, hanging=0.0):
+        width = PAGE_WIDTH - 2 * MARGIN - indent
+        for number, line in enumerate(self._wrap(runs, size, width, hanging)):
+            line_height = size * self.LEADING
+            self._ensure(line_height)
+            self._y -= line_height
+            x = MARGIN + indent + (hanging if number else 0)
+            for text, style, url in line:
+                run_width = text_width(text, style, size)
+                self._text(x, self._y + size * 0.25, text, style, size)
+                if url:
+                    self._page.links.append((x, self._y, x + run_width, self._y + line_height, url))
+                x += run_width
+
+    @staticmethod
+    def _wrap(runs, size, width, hanging):
+        """Greedy word wrap across styled runs; words wider than a line (URLs) are cut."""
+        lines, line, used = [], [], 0.0
+
+        def push(text, style, url):
+            nonlocal used
+            if line and line[-1][1:] == (style, url):
+                line[-1] = (line[-1][0] + text, style, url)
+            else:
+                line.append((text, style, url))
+            used += text_width(text, style, size)
+
+        def flush():
+            nonlocal line, used
+            text, style, url = line[-1]
+            line[-1] = (text.rstrip(), style, url)
+            lines.append([run for run in line if run[0]])
+            line, used = [], 0.0
+
+        for text, style, url in runs:
+            for word in re.findall(r'\s+|\S+', text):
+                if word.isspace():
+                    if line:
+                        push(' ', style, url)
+                    continue
+                limit = width - (hanging if lines else 0)
+                word_width = text_width(word, style, size)
+                if line and used + word_width > limit:
+                    flush()
+                    limit = width - hanging
+                while word_width > limit - used:
+                    cut = 1
+                    while cut < len(word) and used + text_width(word[:cut + 1], style, size) <= limit:
+                        cut += 1
+                    push(word[:cut], style, url)
+                    flush()
+                    word, limit = word[cut:], width - hanging
+                    word_width = text_width(word, style, size)
+                if word:
+                    push(word, style, url)
+        if line:
+            flush()
+        return lines
+
+    def _text(self, x, y, text, style, size):
+        font = _FONTS[style][0]
+        color = b'%.2f %.2f %.2f rg ' % LINK_COLOR if style == 'link' else b'0.13 0.13 0.13 rg '
+        self._page.ops.append(color + b'BT /%s %.1f Tf %.2f %.2f Td (%s) Tj ET' % (
+            font.encode(), size, x, y, _escape(text)))
+
+    def _image(self, image):
+        height = self.LOGO_HEIGHT if image.height <= 100 else min(image.height, 96.0)
+        width = image.width * height / image.height
+        if width > self.MAX_IMAGE_WIDTH:
+            width, height = self.MAX_IMAGE_WIDTH, image.height * self.MAX_IMAGE_WIDTH / image.width
+        self._ensure(height + 4)
+        self._y -= height + 4
+        name = self._image_resource(image)
+        self._page.images[name] = self._image_objects[id(image)][1]
+        self._page.ops.append(b'q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q' % (width, height, MARGIN + 12, self._y, name.encode()))
+
+    def _image_resource(self, image):
+        if id(image) not in self._image_objects:
+            colorspace = {1: b'/DeviceGray', 4: b'/DeviceCMYK'}.get(image.components, b'/DeviceRGB')
+            number = self._doc.add_stream(
+                b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 /Filter /DCTDecode'
+                % (image.width, image.height, colorspace), image.data, compress=False)
+            self._image_objects[id(image)] = (f'Im{len(self._image_objects) + 1}', number)
+        return self._image_objects[id(image)][0]
+
+    def _rule(self):
+        self._ensure(12)
+        self._y -= 6
+        self._page.ops.append(b'%.2f G 0.5 w %.2f %.2f m %.2f %.2f l S' % (
+            RULE_COLOR, MARGIN, self._y, PAGE_WIDTH - MARGIN, self._y))
+        self._y -= 6
+
+    # Output
+
+    def _finish(self):
+        doc = self._doc
+        regular = doc.add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+        bold = doc.add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>')
+        pages_number = doc.reserve()
+        kids = []
+        for page in self._pages:
+            content = doc.add_stream(b'', b'\n'.join(page.ops))
+            xobjects = b' '.join(b'/%s %d 0 R' % (name.encode(), number) for name, number in page.images.items())
+            annots = [doc.add(b'<< /Type /Annot /Subtype /Link /Rect [%.2f %.2f %.2f %.2f] /Border [0 0 0] '
+                              b'/A << /S /URI /URI (%s) >> >>' % (x0, y0, x1, y1, _escape(url)))
+                      for x0, y0, x1, y1, url in page.links]
+            kids.append(doc.add(
+                b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] /Contents %d 0 R '
+                b'/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> /XObject << %s >> >> /Annots [%s] >>' % (
+                    pages_number, PAGE_WIDTH, PAGE_HEIGHT, content, regular, bold, xobjects,
+                    b' '.join(b'%d 0 R' % a for a in annots))))
+        doc.set(pages_number, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % kid for kid in kids), len(kids)))
+        root = doc.add(b'<< /Type /Catalog /Pages %d 0 R >>' % pages_number)
+        return doc.tobytes(root)
+
+
+def render_pdf(content, assets=None, strict=False):
+    """
+    PDF bytes for itinerary text or an Itinerary, laid out without a browser. Letters the
+    standard fonts lack are drawn as '?', or raise UnsupportedTextError when `strict`.
+    """
+    return NativePdfRenderer(assets, strict).render(content)
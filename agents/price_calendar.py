@@ -0,0 +1,112 @@
+"""
+Flexible-dates price calendar: round-trip prices for every departure in a window.
+
+One Google Flights search per (outbound, return) pair goes through the search cache
+(which shares concurrent identical searches) from a small worker pool, so at most
+CALENDAR_CONCURRENCY run at once and the whole batch is bounded by a deadline. Each
+search's cheapest option fills one cell of an outbound x return NumPy matrix (NaN
+where nothing was found or the pair was not searched), so the cheapest combinations
+are a single argpartition away.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+CALENDAR_CONCURRENCY = int(os.getenv('CALENDAR_CONCURRENCY', '6'))
+# Each pair is one SerpApi search; longer windows are sampled down to this many
+CALENDAR_MAX_SEARCHES = int(os.getenv('CALENDAR_MAX_SEARCHES', '36'))
+# Trip lengths searched around the requested one: nights - flex .. nights + flex
+CALENDAR_NIGHTS_FLEX = int(os.getenv('CALENDAR_NIGHTS_FLEX', '1'))
+
+
+def cheapest_option(data):
+    """(price, options) for one flights response: the lowest price and the options to show, or (None, [])."""
+    if not isinstance(data, dict):
+        return None, []
+    options = [*data.get('best_flights', []), *data.get('other_flights', [])]
+    prices = [option['price'] for option in options if isinstance(option.get('price'), (int, float))]
+    return (min(prices) if prices else None), options
+
+
+@dataclass
+class PriceCalendar:
+    outbound: List[date]
+    returns: List[date]
+    prices: np.ndarray  # (len(outbound), len(returns)) float, NaN = no price
+    # Flight options of each searched cell, for rendering the chosen dates
+    options: Dict[Tuple[int, int], list] = field(default_factory=dict)
+    searches: int = 0
+
+    @property
+    def found(self):
+        return bool(np.isfinite(self.prices).any())
+
+    def cheapest(self, k=3):
+        """Up to k (outbound, return, price) of the cheapest combinations, cheapest first."""
+        flat = np.where(np.isfinite(self.prices), self.prices, np.inf).ravel()
+        k = min(k, int(np.isfinite(flat).sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(flat, k - 1)[:k]
+        top = top[np.argsort(flat[top], kind='stable')]
+        rows, cols = np.unravel_index(top, self.prices.shape)
+        return [(self.outbound[i], self.returns[j], float(self.prices[i, j])) for i, j in zip(rows, cols)]
+
+    def options_for(self, outbound, return_date):
+        return self.options.get((self.outbound.index(outbound), self.returns.index(return_date)), [])
+
+
+def calendar_pairs(window_start, window_end, nights, flex=CALENDAR_NIGHTS_FLEX, max_searches=CALENDAR_MAX_SEARCHES):
+    """
+    (outbound dates, return dates, [(i, j)] cells to search) for departures in the window.
+
+    Every departure day is tried with trip lengths nights-flex..nights+flex; when that is
+    more than `max_searches`, departures are spread evenly across the window instead.
+    """
+    days = (window_end - window_start).days + 1
+    lengths = [n for n in range(nights - flex, nights + flex + 1) if n >= 1]
+    step = max(1, -(-days * len(lengths) // max_searches))
+    outbound = [window_start + timedelta(days=d) for d in range(0, days, step)]
+    returns = sorted({day + timedelta(days=n) for day in outbound for n in lengths})
+    index = {day: j for j, day in enumerate(returns)}
+    cells = [(i, index[day + timedelta(days=n)]) for i, day in enumerate(outbound) for n in lengths]
+    return outbound, returns, cells[:max_searches]
+
+
+def search_calendar(search, flights_args, window_start, window_end, nights, deadline=None,
+                    concurrency=CALENDAR_CONCURRENCY, **pair_options):
+    """
+    PriceCalendar for `flights_args` (flights_finder arguments without dates) over the window.
+
+    `search(args)` returns the Google Flights response for one set of arguments, e.g.
+    `search_flights`; searches still running at `deadline` (time.monotonic()) are left out.
+    """
+    outbound, returns, cells = calendar_pairs(window_start, window_end, nights, **pair_options)
+    prices = np.full((len(outbound), len(returns)), np.nan)
+    calendar = PriceCalendar(outbound, returns, prices, searches=len(cells))
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='calendar')
+    try:
+        futures = {
+            pool.submit(search, dict(flights_args, outbound_date=outbound[i].isoformat(),
+                                     return_date=returns[j].isoformat())): (i, j)
+            for i, j in cells
+        }
+        done, _ = wait(futures, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+    finally:
+        # Searches past the deadline finish in the background (and still fill the cache)
+        pool.shutdown(wait=False, cancel_futures=True)
+    for future in done:
+        cell = futures[future]
+        if future.exception() is not None:
+            print(f'[PriceCalendar] Search for {outbound[cell[0]]} - {returns[cell[1]]} failed: {future.exception()!r}')
+            continue
+        price, options = cheapest_option(future.result())
+        if price is not None:
+            prices[cell] = price
+            calendar.options[cell] = options
+    return calendar
@@ -0,0 +1,429 @@
+"""
+Local extraction of the trip details (cities, dates, travellers, hotel class) from a travel query.
+
+Used by the graph's router to skip the tool-calling LLM when the query is complete,
+and by `invoke_tools` to fill in whatever the LLM's tool-call arguments leave out.
+
+All patterns are compiled once at import; month names, ordinals and number words
+come from lookup tables. Dates are extracted first, then everything else (budget,
+priorities, durations, flexible-date wording, hotel class, travellers) in a single
+scan of one combined regex, and all of it is blanked out, so the remaining text only
+has to be split into cities.
+Supported date phrasings include "1st oct to 7th nov 2026", "oct 1-7", "1 to 7 october",
+"2026-10-01 to 2026-10-07", "tomorrow", "next weekend", "in 2 weeks" and
+"for 5 nights" / "for a week" after a start date. Flexible requests ("the cheapest week
+in october", "flexible dates between 1 and 20 nov for 5 nights") set a departure
+window for the price calendar instead of fixed dates. A budget ("under $2,000") and
+ranking priorities ("cheapest", "direct", "best rated", ...) are picked up for ranking.
+"""
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+DEFAULT_NIGHTS = 3
+# Departure window of a flexible request that names no month or dates
+DEFAULT_FLEXIBLE_DAYS = 30
+
+MONTHS = {
+    'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3, 'april': 4, 'apr': 4,
+    'may': 5, 'june': 6, 'jun': 6, 'july': 7, 'jul': 7, 'august': 8, 'aug': 8,
+    'september': 9, 'sept': 9, 'sep': 9, 'october': 10, 'oct': 10, 'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12,
+}
+NUMBERS = {
+    'a': 1, 'an': 1, 'one': 1, 'single': 1, 'two': 2, 'couple of': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'fourteen': 14,
+}
+ORDINALS = {
+    'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5, 'sixth': 6, 'seventh': 7, 'eighth': 8,
+    'ninth': 9, 'tenth': 10, 'eleventh': 11, 'twelfth': 12, 'fifteenth': 15, 'twentieth': 20, 'thirtieth': 30,
+}
+WEEKDAYS = {'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6}
+# Days per unit for durations and offsets
+UNITS = {'night': 1, 'nights': 1, 'day': 1, 'days': 1, 'week': 7, 'weeks': 7, 'fortnight': 14}
+# Nights for "a week", "the cheapest weekend", ...
+STAY_NIGHTS = {'week': 7, 'fortnight': 14, 'weekend': 2}
+# Phrases that state what matters most -> ranking priority (see agents.ranking)
+PRIORITY_WORDS = {
+    'cheapest': 'price', 'cheap': 'price', 'lowest price': 'price', 'low cost': 'price',
+    'fastest': 'duration', 'quickest': 'duration', 'shortest': 'duration',
+    'direct': 'direct', 'non-stop': 'direct', 'nonstop': 'direct', 'non stop': 'direct', 'no layovers': 'direct',
+    'best rated': 'rating', 'top rated': 'rating', 'highest rated': 'rating', 'best reviewed': 'rating',
+    'central': 'distance', 'city centre': 'distance', 'city center': 'distance', 'downtown': 'distance',
+}
+HOTEL_CLASS_WORDS = {'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5'}
+TRAVELLER_WORDS = {
+    'adult': 'adults', 'adults': 'adults', 'people': 'adults', 'persons': 'adults', 'person': 'adults',
+    'passengers': 'adults', 'passenger': 'adults', 'travellers': 'adults', 'travelers': 'adults',
+    'pax': 'adults', 'guests': 'adults', 'guest': 'adults',
+    'children': 'children', 'child': 'children', 'kids': 'children', 'kid': 'children',
+    'infants': 'infants', 'infant': 'infants', 'babies': 'infants', 'baby': 'infants',
+}
+# Travel-speak that is not part of a city name
+FILLER_WORDS = {
+    'i', 'we', 'me', 'us', 'my', 'our', 'want', 'wanna', 'need', 'would', 'like', 'plan', 'planning', 'trip',
+    'travel', 'travelling', 'traveling', 'going', 'go', 'fly', 'flying', 'flight', 'flights', 'book', 'booking',
+    'find', 'please', 'a', 'an', 'the', 'holiday', 'vacation', 'hotel', 'hotels', 'ticket', 'tickets',
+    'cheap', 'return', 'round', 'one', 'way', 'get', 'show', 'search', 'for', 'looking', 'am', 'are', 'to',
+}
+
+
+def _alternation(words):
+    return '|'.join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_TO = r'\s*(?:to|till|until|through|thru|-|–|—|and)\s*'
+_NUMBER = rf'(?:\d+|{_alternation(NUMBERS)})'
+_ISO = r'(?P<{0}>\d{{4}})-(?P<{0}m>\d{{1,2}})-(?P<{0}d>\d{{1,2}})'
+
+
+def _day(name):
+    return rf'(?P<{name}>\d{{1,2}}|{_alternation(ORDINALS)})(?:st|nd|rd|th)?'
+
+
+def _month(name):
+    return rf'(?P<{name}>{_alternation(MONTHS)})\.?'
+
+
+def _amount(name):
+    return rf'(?P<{name}>\d[\d,]*(?:\.\d+)?)\s*(?P<{name}k>k\b)?'
+
+
+def _year(name):
+    return rf'(?:,?\s*(?P<{name}>\d{{4}}))?'
+
+
+_GROUP = re.compile(r'\(\?P<(\w+)>')
+
+
+def _compile_table(table, first_words):
+    """
+    One regex over (name, pattern) rows, so the text is scanned once: the leftmost match
+    wins and rows are tried in order at each position. A word boundary followed by one
+    of `first_words` gates the alternation, which keeps the scan cheap at every other
+    position. Groups are renamed <name>__<group> so rows can reuse names; returns
+    (regex, {name: [(group, renamed)]}).
+    """
+    parts, groups = [], {}
+    for name, pattern in table:
+        groups[name] = [(group, f'{name}__{group}') for group in _GROUP.findall(pattern)]
+        parts.append(f'(?P<{name}>' + _GROUP.sub(lambda m: f'(?P<{name}__{m.group(1)}>', pattern) + ')')
+    return re.compile(rf"\b(?={_alternation(first_words)})(?:{'|'.join(parts)})(?!\w)"), groups
+
+
+def _groups(match, table_groups):
+    return {group: match.group(renamed) for group, renamed in table_groups[match.lastgroup]}
+
+
+# Ranges before single dates
+_DATES, _DATE_GROUPS = _compile_table([
+    ('iso_range', _ISO.format('y1') + _TO + _ISO.format('y2')),
+    ('day_month_range', rf"{_day('d1')}\s+(?:of\s+)?{_month('m1')}{_year('y1')}{_TO}{_day('d2')}\s+(?:of\s+)?{_month('m2')}{_year('y2')}"),
+    ('month_day_range', rf"{_month('m1')}\s+{_day('d1')}{_year('y1')}{_TO}(?:{_month('m2')}\s+)?{_day('d2')}{_year('y2')}"),
+    ('days_month_range', rf"{_day('d1')}{_TO}{_day('d2')}\s+(?:of\s+)?{_month('m1')}{_year('y1')}"),
+    ('iso', _ISO.format('y1')),
+    ('day_month', rf"{_day('d1')}\s+(?:of\s+)?{_month('m1')}{_year('y1')}"),
+    ('month_day', rf"{_month('m1')}\s+{_day('d1')}{_year('y1')}"),
+], first_words={word[:3] for word in [*MONTHS, *ORDINALS]} | set('0123456789'))
+_RELATIVE, _RELATIVE_GROUPS = _compile_table([
+    ('day_after_tomorrow', r'day after tomorrow'),
+    ('today', r'today|tonight'),
+    ('tomorrow', r'tomorrow'),
+    ('weekend', r'(?P<which>this|next|coming)\s+weekend'),
+    ('weekday', rf'(?P<which>this|next|coming|on)\s+(?P<weekday>{_alternation(WEEKDAYS)})'),
+    ('next_week', r'next week'),
+    ('next_month', r'next month'),
+    ('offset', rf'in\s+(?P<count>{_NUMBER})\s+(?P<unit>days?|weeks?)'),
+], first_words={'day', 'to', 'this', 'next', 'coming', 'on', 'in'})
+_MONTH_WINDOW = re.compile(rf'\b(?:in|during|for|throughout)\s+(?:the\s+month\s+of\s+)?{_month("month")}{_year("year")}(?!\s*\d)')
+_CURRENCY = r'(?:usd|dollars?|bucks|eur|euros?|gbp|pounds?)\b'
+_FLEXIBLE_WORDS = ('cheapest', 'flexible', 'any time', 'anytime', 'sometime', 'whenever')
+_BUDGET_WORDS = ('under', 'below', 'less than', 'at most', 'maximum', 'max', 'up to', 'within')
+_HOTEL_STARS = rf'[1-5]|{_alternation(HOTEL_CLASS_WORDS)}'
+# Everything but the dates and cities, found in one scan once the dates are blanked out.
+# At the same position rows are tried in order: "cheapest week" is a flexible request first.
+_PHRASES, _PHRASE_GROUPS = _compile_table([
+    # "under $2,000", "below 1500 euros", "budget of 2k": a bare number needs a currency or "budget"
+    ('budget', rf'(?:{_alternation(_BUDGET_WORDS)})\s+'
+               rf'(?:[$€£]\s*{_amount("a1")}(?:\s*{_CURRENCY})?|{_amount("a2")}\s*{_CURRENCY})'
+               rf'|budget\s+(?:of\s+|is\s+)?(?:[$€£]\s*)?{_amount("a3")}'),
+    ('flexible', rf'(?:{_alternation(_FLEXIBLE_WORDS)})(?:\s+(?:dates?|days?|(?P<stay>{_alternation(STAY_NIGHTS)})))?'),
+    ('priority', _alternation(PRIORITY_WORDS)),
+    ('duration', rf'(?:for\s+)?(?P<count>{_NUMBER})[\s-]+(?P<unit>nights?|days?|weeks?)'),
+    ('stay', rf'for\s+(?:a\s+)?(?P<unit>{_alternation(STAY_NIGHTS)})'),
+    ('hotel_class', rf'(?P<first>{_HOTEL_STARS})(?:\s*(?:or|and|to|-|/|,)\s*(?P<second>{_HOTEL_STARS}))?[\s-]*(?:star|\*)s?'),
+    ('travellers', rf'(?P<count>{_NUMBER})\s+(?P<kind>{_alternation(TRAVELLER_WORDS)})'),
+    ('family', rf'family of (?P<count>{_NUMBER})'),
+    ('couple', r'a couple|my (?:wife|husband|partner|girlfriend|boyfriend)|the two of us'),
+], first_words={word[:3] for word in [*_BUDGET_WORDS, 'budget', *_FLEXIBLE_WORDS, *PRIORITY_WORDS, *NUMBERS,
+                                      *HOTEL_CLASS_WORDS, 'for', 'family', 'my', 'the']} | set('0123456789'))
+
+# One or more words other than "to"/"from"
+_WORD = r"(?!(?:to|from)\b)[a-z.'-]+"
+_PLACE = rf"\b{_WORD}(?:\s+{_WORD})*?"
+# End of the sentence, a blanked-out date/traveller phrase, or "from <date>"
+_PLACE_END = r"(?=\s*[|,.!?;]|\s*$|\s+from\b)"
+_FROM_TO = re.compile(rf"\bfrom\s+(?P<departure>{_PLACE})\s+to\s+(?P<arrival>{_PLACE}){_PLACE_END}")
+# "... to Y from X"
+_TO_FROM = re.compile(rf"\bto\s+(?P<arrival>{_PLACE})\s+from\s+(?P<departure>{_PLACE}){_PLACE_END}")
+_X_TO_Y = re.compile(rf"(?P<departure>{_PLACE})\s+to\s+(?P<arrival>{_PLACE}){_PLACE_END}")
+# Words that end a city name: the rest of the sentence follows
+_CITY_END = re.compile(r'\s+(?:for|with|and|on|in|next|this|coming|from|under|staying|during|between|by|at|around|starting|leaving|departing|returning|find|show|search|book|looking|please)\b.*$')
+_NON_WORD = re.compile(r"[^a-z .'-]+")
+
+
+@dataclass(slots=True)
+class TravelQuery:
+    departure_city: str = ''
+    arrival_city: str = ''
+    check_in: str = ''  # YYYY-MM-DD
+    check_out: str = ''
+    hotel_class: Optional[str] = None  # SerpApi format, e.g. '4' or '4,5'
+    adults: int = 1
+    children: int = 0
+    infants: int = 0
+    # False when the dates are the defaults (tomorrow, for 3 nights)
+    dates_found: bool = False
+    # Flexible dates: departures anywhere in [window_start, window_end], check_in/out is the first candidate
+    flexible: bool = False
+    window_start: str = ''
+    window_end: str = ''
+    # Upper bound for the trip in the search currency, and ranking priorities in the order stated
+    budget: Optional[float] = None
+    priorities: List[str] = field(default_factory=list)
+    # 'parser', or 'llm' when the tool-calling LLM's arguments were used
+    source: str = 'parser'
+
+    @property
+    def is_complete(self):
+        """Everything needed for the searches was stated explicitly."""
+        return bool(self.departure_city and self.arrival_city and self.dates_found)
+
+    @property
+    def nights(self):
+        return (date.fromisoformat(self.check_out) - date.fromisoformat(self.check_in)).days
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def _number(text):
+    return int(text) if text.isdigit() else NUMBERS[text]
+
+
+def _day_number(text):
+    return int(text) if text.isdigit() else ORDINALS[text]
+
+
+def _make_date(year, month, day, today):
+    """Date for day/month; without a year the next occurrence on or after today."""
+    if year:
+        return date(int(year), month, day)
+    candidate = date(today.year, month, day)
+    return candidate if candidate >= today else date(today.year + 1, month, day)
+
+
+def _explicit_dates(name, groups, today):
+    if name == 'iso_range':
+        return (date(int(groups['y1']), int(groups['y1m']), int(groups['y1d'])),
+                date(int(groups['y2']), int(groups['y2m']), int(groups['y2d'])))
+    if name == 'iso':
+        return date(int(groups['y1']), int(groups['y1m']), int(groups['y1d'])), None
+
+    d1 = _day_number(groups['d1'])
+    m1 = MONTHS[groups['m1']]
+    year1 = groups.get('y1')
+    if name in ('day_month', 'month_day'):
+        return _make_date(year1, m1, d1, today), None
+    d2 = _day_number(groups['d2'])
+    m2 = MONTHS[groups['m2']] if groups.get('m2') else m1
+    year2 = groups.get('y2') or year1
+    year1 = year1 or groups.get('y2')
+    start = _make_date(year1, m1, d1, today)
+    end = date(start.year, m2, d2) if not year2 else date(int(year2), m2, d2)
+    if end < start and not groups.get('y2'):
+        end = date(start.year + 1, m2, d2)  # "28 dec to 3 jan"
+    return start, end
+
+
+def _relative_dates(name, groups, today):
+    if name == 'today':
+        return today, None
+    if name == 'tomorrow':
+        return today + timedelta(days=1), None
+    if name == 'day_after_tomorrow':
+        return today + timedelta(days=2), None
+    if name == 'weekend':
+        # Friday to Sunday of the current/coming weekend; "next weekend" is the one after it
+        friday = today + timedelta(days=4 - today.weekday())
+        if today.weekday() == 6:
+            friday += timedelta(days=7)
+        if groups['which'] == 'next':
+            friday += timedelta(days=7)
+        return max(friday, today), friday + timedelta(days=2)
+    if name == 'weekday':
+        # The next such day after today ("next friday" and "this friday" alike)
+        return today + timedelta(days=(WEEKDAYS[groups['weekday']] - today.weekday()) % 7 or 7), None
+    if name == 'next_week':
+        return today + timedelta(days=7 - today.weekday()), None
+    if name == 'next_month':
+        return date(today.year + today.month // 12, today.month % 12 + 1, 1), None
+    count = _number(groups['count'])
+    return today + timedelta(days=count * UNITS[groups['unit']]), None
+
+
+def _blank(text, match):
+    return text[:match.start()] + '|' + ' ' * (match.end() - match.start() - 1) + text[match.end():]
+
+
+def _find_dates(text, today):
+    """(check_in, check_out, text with the date phrases blanked out)."""
+    start = end = None
+    for match in _DATES.finditer(text):
+        try:
+            first, second = _explicit_dates(match.lastgroup, _groups(match, _DATE_GROUPS), today)
+        except (ValueError, KeyError):
+            continue
+        text = _blank(text, match)
+        if start is None:
+            start, end = first, second
+        else:
+            end = first
+        if end is not None:
+            break
+    if start is None:
+        match = _RELATIVE.search(text)
+        if match:
+            start, end = _relative_dates(match.lastgroup, _groups(match, _RELATIVE_GROUPS), today)
+            text = _blank(text, match)
+    return start, end, text
+
+
+def _find_window(text, start, end, today):
+    """(first, last) departure date of a flexible request, and the text without its month phrase."""
+    if start is not None and end is not None:
+        return start, end, text
+    match = _MONTH_WINDOW.search(text)
+    if match:
+        # The named month, this year unless it is already over
+        first = _make_date(match.group('year'), MONTHS[match.group('month')], 1, today.replace(day=1))
+        last = (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        return max(first, today + timedelta(days=1)), last, _blank(text, match)
+    first = start or today + timedelta(days=1)
+    return first, first + timedelta(days=DEFAULT_FLEXIBLE_DAYS - 1), text
+
+
+def _add_priority(query, priority):
+    if priority not in query.priorities:
+        query.priorities.append(priority)
+
+
+def _find_phrases(text, query):
+    """
+    Budget, priorities, hotel class and travellers go straight into `query`; returns
+    (nights of a stated duration, the first flexible-date phrase as (text, stay) or
+    None, text with every phrase found blanked out).
+    """
+    nights = flexible = family = None
+    counts, couple = {}, False
+    for match in _PHRASES.finditer(text):
+        kind = match.lastgroup
+        groups = _groups(match, _PHRASE_GROUPS)
+        if kind == 'flexible':
+            phrase = match.group(kind)
+            flexible = flexible or (phrase, groups['stay'])
+            if phrase.startswith('cheapest'):
+                _add_priority(query, 'price')
+        elif kind == 'priority':
+            _add_priority(query, PRIORITY_WORDS[match.group(kind)])
+        elif kind == 'budget' and query.budget is None:
+            name = next(name for name in ('a1', 'a2', 'a3') if groups[name])
+            amount = float(groups[name].replace(',', ''))
+            query.budget = amount * 1000 if groups[name + 'k'] else amount
+        elif kind == 'duration' and nights is None:
+            unit = groups['unit']
+            nights = _number(groups['count']) * UNITS[unit]
+            if unit.startswith('day'):
+                nights = max(1, nights - 1)  # "5 days" is 4 nights
+        elif kind == 'stay' and nights is None:
+            nights = STAY_NIGHTS[groups['unit']]
+        elif kind == 'hotel_class' and query.hotel_class is None:
+            low = HOTEL_CLASS_WORDS.get(groups['first'], groups['first'])
+            high = HOTEL_CLASS_WORDS.get(groups['second'] or '', groups['second'])
+            if high and high > low:
+                query.hotel_class = ','.join(str(n) for n in range(int(low), int(high) + 1))
+            else:
+                query.hotel_class = low
+        elif kind == 'travellers':
+            kind = TRAVELLER_WORDS[groups['kind']]
+            counts[kind] = counts.get(kind, 0) + _number(groups['count'])
+        elif kind == 'family' and family is None:
+            family = _number(groups['count'])
+        elif kind == 'couple':
+            couple = True
+        text = _blank(text, match)
+
+    if family is not None and not counts:
+        counts = {'adults': min(2, family), 'children': max(0, family - 2)}
+    elif couple and 'adults' not in counts:
+        counts['adults'] = 2
+    query.adults = max(1, counts.get('adults', 1))
+    query.children = counts.get('children', 0)
+    query.infants = counts.get('infants', 0)
+    return nights, flexible, text
+
+
+def _clean_city(city):
+    city = _CITY_END.sub('', city)
+    words = _NON_WORD.sub(' ', city).split()
+    # Drop leading/trailing filler ("i want to fly madrid" -> "madrid"); keep inner words ("rio de janeiro")
+    while words and words[0] in FILLER_WORDS:
+        words.pop(0)
+    while words and words[-1] in FILLER_WORDS:
+        words.pop()
+    return ' '.join(words)
+
+
+def _find_cities(text):
+    for pattern in (_FROM_TO, _TO_FROM, _X_TO_Y):
+        for match in pattern.finditer(text):
+            departure = _clean_city(match.group('departure'))
+            arrival = _clean_city(match.group('arrival'))
+            if departure and arrival:
+                return departure, arrival
+    return '', ''
+
+
+def parse_query(text, today=None):
+    """TravelQuery for a free-text request; missing dates default to tomorrow + 3 nights."""
+    text = ' '.join(text.lower().split())
+    today = today.date() if isinstance(today, datetime) else today or date.today()
+    query = TravelQuery()
+
+    start, end, text = _find_dates(text, today)
+    nights, flexible, text = _find_phrases(text, query)
+    if flexible and flexible[0] == 'cheapest' and start is not None and end is not None:
+        flexible = None  # "the cheapest trip from 3 to 9 nov": fixed dates, ranked by price
+    if flexible:
+        first, last, text = _find_window(text, start, end, today)
+        query.flexible = True
+        query.window_start, query.window_end = first.isoformat(), last.isoformat()
+        nights = nights or STAY_NIGHTS.get(flexible[1], DEFAULT_NIGHTS)
+        start, end = first, first + timedelta(days=nights)
+    elif start is not None and end is None and nights:
+        end = start + timedelta(days=nights)
+    query.departure_city, query.arrival_city = _find_cities(text)
+
+    query.dates_found = start is not None and end is not None and end > start
+    if start is None:
+        start = today + timedelta(days=1)
+    if not query.dates_found:
+        end = start + timedelta(days=DEFAULT_NIGHTS)
+    query.check_in = start.isoformat()
+    query.check_out = end.isoformat()
+    return query
@@ -0,0 +1,209 @@
+"""
+Local ranking of flight options and hotel properties.
+
+A result set is loaded into columnar NumPy arrays, one float per option and criterion,
+NaN where SerpApi left the field out, and ranked with whole-array operations:
+
+1. Options outside the constraints (budget, direct flights only) are masked out.
+2. Every criterion is scaled to 0..1 over the remaining options. 1 is the best value
+   in the set and an unknown value counts as the worst.
+3. The weighted sum of the scaled criteria is each option's score.
+4. Options on the Pareto front come first, ordered by score, then the rest by score.
+   An option is on the front when no other option is at least as good on every
+   criterion and better on one.
+
+Thousands of candidates rank in milliseconds without another search. Weights start
+from FLIGHT_WEIGHTS and HOTEL_WEIGHTS. A priority stated in the query ("cheapest",
+"best rated", ...) counts PRIORITY_BOOST times its default weight.
+"""
+import math
+import os
+
+import numpy as np
+
+# Ranked options shown in the itinerary
+FLIGHTS_SHOWN = int(os.getenv('FLIGHTS_SHOWN', '5'))
+HOTELS_SHOWN = int(os.getenv('HOTELS_SHOWN', '5'))
+
+# Criterion -> 1 when higher values are better, -1 when lower values are
+FLIGHT_CRITERIA = {'price': -1, 'duration': -1, 'stops': -1}
+HOTEL_CRITERIA = {'price': -1, 'rating': 1, 'reviews': 1, 'class': 1, 'distance': -1}
+FLIGHT_WEIGHTS = {'price': 0.5, 'duration': 0.3, 'stops': 0.2}
+HOTEL_WEIGHTS = {'price': 0.3, 'rating': 0.35, 'reviews': 0.1, 'class': 0.1, 'distance': 0.15}
+PRIORITY_BOOST = 4.0
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class OptionTable:
+    """One result set: the options and {criterion: float array}, NaN where a value is unknown."""
+
+    def __init__(self, items, columns):
+        self.items = items
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _column(values, count):
+    return np.fromiter((value if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+                        for value in values), dtype=float, count=count)
+
+
+def _rate(value):
+    return value.get('extracted_lowest') if isinstance(value, dict) else value
+
+
+def _stops(option):
+    if 'layovers' in option:
+        return len(option['layovers'])
+    legs = option.get('flights')
+    return len(legs) - 1 if legs else None
+
+
+def flight_table(options):
+    """OptionTable of flights_finder options: price, duration (minutes) and stops."""
+    options = [option for option in options if isinstance(option, dict)]
+    n = len(options)
+    return OptionTable(options, {
+        'price': _column((option.get('price') for option in options), n),
+        'duration': _column((option.get('total_duration') for option in options), n),
+        'stops': _column((_stops(option) for option in options), n),
+    })
+
+
+def distances_km(latitude, longitude, center):
+    """Great-circle distance of each (latitude, longitude) from `center`."""
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    center_lat, center_lon = np.radians(center[0]), np.radians(center[1])
+    a = np.sin((lat - center_lat) / 2) ** 2 + np.cos(lat) * np.cos(center_lat) * np.sin((lon - center_lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def hotel_table(hotels, center=None, nights=None):
+    """
+    OptionTable of hotels_finder properties: total price, rating, reviews, class and
+    distance (km) from `center`, a (latitude, longitude). Without a center the median
+    of the properties' coordinates stands in for the city center. A property with no
+    total rate is priced at its nightly rate times `nights`, when given.
+    """
+    hotels = [hotel for hotel in hotels if isinstance(hotel, dict)]
+    n = len(hotels)
+    price = _column((_rate(hotel.get('total_rate')) for hotel in hotels), n)
+    if nights:
+        nightly = _column((_rate(hotel.get('rate_per_night')) for hotel in hotels), n)
+        price = np.where(np.isnan(price), nightly * nights, price)
+    coordinates = [hotel.get('gps_coordinates') or {} for hotel in hotels]
+    latitude = _column((c.get('latitude') for c in coordinates), n)
+    longitude = _column((c.get('longitude') for c in coordinates), n)
+    if center is None and np.isfinite(latitude).any():
+        center = (np.nanmedian(latitude), np.nanmedian(longitude))
+    return OptionTable(hotels, {
+        'price': price,
+        'rating': _column((hotel.get('overall_rating') for hotel in hotels), n),
+        # Log-scaled, so 5,000 reviews do not make 500 look like none
+        'reviews': np.log1p(_column((hotel.get('reviews') for hotel in hotels), n)),
+        'class': _column((hotel.get('extracted_hotel_class') for hotel in hotels), n),
+        'distance': distances_km(latitude, longitude, center) if center is not None else np.full(n, np.nan),
+    })
+
+
+def scaled(table, criteria, index=None):
+    """(options, criteria) matrix of the criteria scaled to 0..1: 1 is the best value, 0 the worst or unknown."""
+    matrix = np.column_stack([table.columns[name] * direction for name, direction in criteria.items()])
+    if index is not None:
+        matrix = matrix[index]
+    known = np.isfinite(matrix)
+    low = np.where(known, matrix, np.inf).min(axis=0, initial=np.inf)
+    high = np.where(known, matrix, -np.inf).max(axis=0, initial=-np.inf)
+    span = high - low
+    # A criterion every option shares (or nobody reports) tells the options apart by nothing
+    spread = np.isfinite(span) & (span > 0)
+    with np.errstate(invalid='ignore'):
+        values = np.where(spread, (matrix - low) / np.where(spread, span, 1.0), 1.0)
+    return np.where(known, values, 0.0)
+
+
+def pareto_front(matrix):
+    """Boolean mask of the rows no other row dominates (higher is better in every column)."""
+    front = np.zeros(len(matrix), dtype=bool)
+    # A dominating row has the larger sum, so the best remaining row by sum is never dominated:
+    # it joins the front and drops every row it dominates, one vectorized comparison per front row
+    remaining = np.argsort(-matrix.sum(axis=1), kind='stable')
+    while len(remaining):
+        best, remaining = remaining[0], remaining[1:]
+        front[best] = True
+        rows = matrix[remaining]
+        dominated = (rows <= matrix[best]).all(axis=1) & (rows < matrix[best]).any(axis=1)
+        remaining = remaining[~dominated]
+    return front
+
+
+def weights_for(defaults, priorities=()):
+    """`defaults` with each stated priority boosted, normalised to sum to 1."""
+    weights = {name: weight * (PRIORITY_BOOST if name in priorities else 1.0) for name, weight in defaults.items()}
+    total = sum(weights.values())
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def _weight_vector(criteria, weights):
+    return np.array([weights.get(name, 0.0) for name in criteria])
+
+
+def score(table, criteria, weights, index=None):
+    """Weighted score of each option (of `index`, if given), from 0 to 1."""
+    return scaled(table, criteria, index) @ _weight_vector(criteria, weights)
+
+
+def rank(table, criteria, weights, constraints=None, pareto=True):
+    """
+    Indices of the options that meet `constraints`, best first.
+
+    `constraints` maps a column to (low, high), either bound None. An option whose
+    value is unknown does not meet a bound on that column.
+    """
+    keep = np.ones(len(table), dtype=bool)
+    for name, (low, high) in (constraints or {}).items():
+        column = table.columns[name]
+        if low is not None:
+            keep &= column >= low
+        if high is not None:
+            keep &= column <= high
+    index = np.flatnonzero(keep)
+    if not len(index):
+        return index
+    matrix = scaled(table, criteria, index)
+    scores = matrix @ _weight_vector(criteria, weights)
+    if pareto:
+        order = np.lexsort((-scores, ~pareto_front(matrix)))
+    else:
+        order = np.argsort(-scores, kind='stable')
+    return index[order]
+
+
+def _ranked(table, criteria, weights, constraints, limit, label):
+    order = rank(table, criteria, weights, constraints)
+    if not len(order) and constraints:
+        # Better to show the closest options than none at all
+        print(f'[Ranking] No {label} meet {constraints}; ranking them all')
+        order = rank(table, criteria, weights)
+    return [table.items[i] for i in order[:limit]]
+
+
+def rank_flights(options, priorities=(), budget=None, limit=FLIGHTS_SHOWN):
+    """The best `limit` flights_finder options for the query's priorities and budget."""
+    constraints = {}
+    if budget:
+        constraints['price'] = (None, budget)
+    if 'direct' in priorities:
+        constraints['stops'] = (None, 0)
+    return _ranked(flight_table(options), FLIGHT_CRITERIA, weights_for(FLIGHT_WEIGHTS, priorities),
+                   constraints, limit, 'flights')
+
+
+def rank_hotels(hotels, priorities=(), budget=None, center=None, nights=None, limit=HOTELS_SHOWN):
+    """The best `limit` hotels_finder properties for the query's priorities and budget (total stay)."""
+    constraints = {'price': (None, budget)} if budget else {}
+    return _ranked(hotel_table(hotels, center, nights), HOTEL_CRITERIA, weights_for(HOTEL_WEIGHTS, priorities),
+                   constraints, limit, 'hotels')
@@ -0,0 +1,12 @@
+"""
+Custom callback events sent by `Agent.invoke_tools` while it runs, so a UI can render
+each part of the itinerary as soon as it is ready. Consume them with a callback
+handler's `on_custom_event` or with `graph.astream_events(..., version='v2')`.
+"""
+
+# data: {'message': str}
+ITINERARY_PROGRESS_EVENT = 'itinerary_progress'
+# data: {'section': one of ITINERARY_SECTIONS, 'content': markdown str}
+ITINERARY_SECTION_EVENT = 'itinerary_section'
+# Sections in the order they are sent and displayed.
+ITINERARY_SECTIONS = ('flights', 'hotels', 'daily_plan')
@@ -0,0 +1,305 @@
+"""
+Trigram index for fuzzy city / airport name matching.
+
+Candidates sharing enough trigrams with the query are re-ranked by edit distance
+(optimal string alignment, so transpositions like "mardid" count once) and then by
+airport size. A query that matches one word of a longer name ("york" -> "new york")
+scores one edit worse than an equally close full-name match. A query with extra
+words ("new york city") matches the city names among its words, scored as if the
+other words were deleted.
+
+Postings are sorted by name length, so a lookup only counts names of about the
+query's length, and names one edit away are searched first: for a typo that is
+usually enough, and the wider (and slower) search never runs.
+"""
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import NamedTuple
+
+from agents.tools.airport_index import Airport, get_airport_index
+
+# Words that carry no information when matching airport names.
+_GENERIC_WORDS = {'airport', 'international', 'intl', 'regional', 'municipal', 'airfield', 'field', 'air', 'base'}
+_NON_ALNUM = re.compile(r'[^a-z0-9 ]+')
+# Only the names with the most shared trigrams are scored with the edit distance.
+_CANDIDATES = 16
+# Longest word span of a multi-word name matched on its own ("york" in "new york")
+_MAX_SPAN_WORDS = 3
+# Shortest city name found inside a longer query ("paris" in "paris france")
+_MIN_CONTAINED = 3
+
+
+class FuzzyMatch(NamedTuple):
+    term: str
+    airport: Airport
+    distance: int
+    confidence: float
+
+
+def fold(text):
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(_NON_ALNUM.sub(' ', text).split())
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance, or `limit + 1` when it is above `limit`.
+    Bit-parallel (Hyyrö's variant of Myers' algorithm with transpositions): one column
+    of the DP matrix is a pair of bit vectors, so the cost is a few integer operations
+    per character of `b`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    if not a:
+        return len(b)
+    # Bit i of positions[c] is set where a[i] == c
+    positions = {}
+    for i, c in enumerate(a):
+        positions[c] = positions.get(c, 0) | 1 << i
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    plus, minus, diagonal, previous_match = mask, 0, 0, 0
+    distance = len(a)
+    for c in b:
+        match = positions.get(c, 0)
+        transposed = ((~diagonal & match) << 1) & previous_match
+        diagonal = ((((match & plus) + plus) ^ plus) | match | minus | transposed) & mask
+        horizontal_plus = minus | (~(diagonal | plus) & mask)
+        horizontal_minus = diagonal & plus
+        if horizontal_plus & last:
+            distance += 1
+        elif horizontal_minus & last:
+            distance -= 1
+        shifted = (horizontal_plus << 1) | 1
+        minus = shifted & diagonal
+        plus = ((horizontal_minus << 1) | ~(shifted | diagonal)) & mask
+        previous_match = match
+    return distance if distance <= limit else limit + 1
+
+
+# The busiest passenger airports (ACI traffic rankings), roughly busiest first. airports.dat
+# carries no traffic figures, so this is what picks "the" airport of a city with several.
+MAJOR_AIRPORTS = (
+    'ATL', 'DXB', 'DFW', 'LHR', 'HND', 'DEN', 'IST', 'LAX', 'ORD', 'DEL', 'CDG', 'JFK', 'LAS', 'AMS', 'MIA',
+    'MAD', 'CAN', 'PVG', 'PEK', 'SIN', 'ICN', 'BKK', 'CGK', 'FRA', 'MCO', 'CLT', 'SEA', 'SFO', 'PHX', 'EWR',
+    'IAH', 'BOM', 'KUL', 'HKG', 'DOH', 'JED', 'RUH', 'SZX', 'CTU', 'CKG', 'KMG', 'XIY', 'HGH', 'PKX', 'SHA',
+    'BCN', 'FCO', 'LGW', 'MUC', 'YYZ', 'MEX', 'GRU', 'BOS', 'MSP', 'DTW', 'PHL', 'FLL', 'LGA', 'BWI', 'SLC',
+    'SAN', 'DCA', 'IAD', 'TPA', 'BNA', 'AUS', 'SYD', 'MEL', 'BLR', 'HYD', 'MAA', 'CCU', 'MNL', 'SGN', 'HAN',
+    'TPE', 'NRT', 'KIX', 'FUK', 'CTS', 'OKA', 'PUS', 'CJU', 'SVO', 'DME', 'VKO', 'LED', 'AUH', 'MXP', 'ZRH',
+    'VIE', 'CPH', 'OSL', 'ARN', 'HEL', 'DUB', 'BRU', 'LIS', 'ATH', 'WAW', 'PRG', 'BUD', 'MAN', 'STN', 'ORY',
+    'DUS', 'HAM', 'BER', 'SXF', 'PMI', 'AGP', 'ALC', 'AYT', 'SAW', 'TLV', 'CAI', 'JNB', 'CPT', 'ADD', 'NBO',
+    'LOS', 'CMN', 'BOG', 'LIM', 'SCL', 'EZE', 'AEP', 'GIG', 'CGH', 'SDU', 'BSB', 'CUN', 'GDL', 'MTY', 'YVR',
+    'YUL', 'YYC', 'HNL', 'MDW', 'DAL', 'HOU', 'OAK', 'SJC', 'SMF', 'PDX', 'STL', 'MCI', 'MSY', 'RDU', 'CLE',
+    'PIT', 'IND', 'CMH', 'CVG', 'SAT', 'SNA', 'BUR', 'ONT', 'LTN', 'LCY', 'BHX', 'EDI', 'GLA', 'NCE', 'LYS',
+    'MRS', 'TLS', 'GVA', 'BSL', 'STR', 'CGN', 'NAP', 'VCE', 'BLQ', 'LIN', 'BGY', 'CIA', 'OPO', 'FAO', 'LPA',
+    'TFS', 'IBZ', 'VLC', 'SVQ', 'BIO', 'KEF', 'GOT', 'AKL', 'BNE', 'PER', 'DPS', 'HKT', 'CNX', 'DMK', 'SZB',
+    'HLP', 'TSA', 'GMP', 'ITM', 'DWC', 'SHJ', 'KWI', 'BAH', 'MCT', 'DMM', 'AMM', 'BEY', 'ISB', 'KHI', 'LHE',
+    'CMB', 'DAC', 'KTM',
+)
+_MAJOR_RANK = {code: len(MAJOR_AIRPORTS) - position for position, code in enumerate(MAJOR_AIRPORTS)}
+
+# Airports with an IATA code that never sell commercial tickets
+NON_COMMERCIAL_WORDS = ('air base', 'air force', 'airbase', 'heliport', 'raf ', 'naval', 'army')
+# ... and fields airports.dat lists under a big city that are closed, military or business aviation only
+NON_COMMERCIAL_IATA = frozenset({'THF', 'TXL', 'ISL', 'NAY', 'BKA', 'TOJ', 'ECV', 'LBG', 'CGX', 'YMX', 'YZD',
+                                 'YKZ', 'FBU'})
+
+
+def is_commercial(airport):
+    """False for airports that sell no tickets: air bases, heliports and closed or private fields."""
+    name = airport.name.lower()
+    return airport.iata not in NON_COMMERCIAL_IATA and not any(word in name for word in NON_COMMERCIAL_WORDS)
+
+
+def airport_size(airport, airports_in_city):
+    """
+    Size proxy, as airports.dat carries no traffic figures: the airport's place in
+    MAJOR_AIRPORTS, then whether it sells tickets at all, then (for everything else)
+    how many airports its city has and whether it is an "International" one.
+    """
+    return (_MAJOR_RANK.get(airport.iata, 0), is_commercial(airport), airports_in_city,
+            'international' in airport.name.lower())
+
+
+def rank_city_airports(airports):
+    """Sort the airports of one city name, biggest first (airports.dat order breaks ties)."""
+    per_country = defaultdict(int)
+    for airport in airports:
+        per_country[airport.country] += 1
+    order = {airport.id: position for position, airport in enumerate(airports)}
+    return sorted(airports, key=lambda a: (airport_size(a, per_country[a.country]), -order[a.id]), reverse=True)
+
+
+class FuzzyAirportIndex:
+
+    def __init__(self, index):
+        self._terms = []     # folded name
+        self._airports = []  # best airport per term
+        self._sizes = []
+        self._city_ids = {}  # folded city name: term id
+        term_ids = {}
+
+        cities = defaultdict(list)
+        for airport in index:
+            if airport.iata:
+                cities[fold(airport.city)].append(airport)
+        for city, airports in cities.items():
+            if city:
+                ranked = rank_city_airports(airports)
+                term_ids[city] = self._city_ids[city] = self._add(
+                    city, ranked[0], (1,) + airport_size(ranked[0], len(airports)))
+        for airports in cities.values():
+            for airport in airports:
+                name = ' '.join(w for w in fold(airport.name).split() if w not in _GENERIC_WORDS)
+                if name and name not in term_ids:
+                    term_ids[name] = self._add(name, airport, (0,) + airport_size(airport, 1))
+
+        # Entries are the terms plus the word spans of longer ones ("york" in "new york").
+        # Each gram's postings are sorted by entry length, so a query only counts the
+        # entries whose length is within max_distance of its own.
+        entries = {(term, term_id, 0) for term_id, term in enumerate(self._terms)}
+        for term_id, term in enumerate(self._terms):
+            words = term.split()
+            for size in range(1, min(len(words) - 1, _MAX_SPAN_WORDS) + 1):
+                entries.update((' '.join(words[start:start + size]), term_id, size)
+                               for start in range(len(words) - size + 1))
+        self._entries = sorted(entries, key=lambda entry: (len(entry[0]), entry))
+        self._gram_counts = []
+        postings = defaultdict(lambda: ([], []))
+        for entry_id, (text, _, _) in enumerate(self._entries):
+            grams = trigrams(text)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                lengths, ids = postings[gram]
+                lengths.append(len(text))
+                ids.append(entry_id)
+        self._postings = dict(postings)
+
+    def _add(self, term, airport, size):
+        self._terms.append(term)
+        self._airports.append(airport)
+        self._sizes.append(size)
+        return len(self._terms) - 1
+
+    def __len__(self):
+        return len(self._terms)
+
+    def _count(self, query_grams, shared, shortest, longest):
+        # Shared trigrams of every entry from `shortest` to `longest` characters long
+        # (in gram order, so that ties in the counts always break the same way)
+        for gram in sorted(query_grams):
+            if gram in self._postings:
+                lengths, ids = self._postings[gram]
+                shared.update(ids[bisect_left(lengths, shortest):bisect_right(lengths, longest)])
+
+    def _score(self, query, query_grams, shared, max_distance, limit, distances):
+        # Edit distances of the entries that can be within max_distance, most promising first
+        words = query.count(' ') + 1
+        # q-gram lemma: each edit (or transposition) destroys at most 4 shared trigrams.
+        floor = len(query_grams) - 4 * max_distance
+        # The floor hardly prunes a wide search: only the entries sharing the most grams are kept
+        items = shared.items() if max_distance == 1 else shared.most_common(4 * _CANDIDATES)
+        candidates = []
+        for entry_id, count in [item for item in items if item[1] >= floor]:
+            text, _, span_words = self._entries[entry_id]
+            if span_words and (span_words != words or text[0] != query[0]):
+                continue
+            bound = max(abs(len(text) - len(query)),
+                        -((count - max(len(query_grams), self._gram_counts[entry_id])) // 4)) + (1 if span_words else 0)
+            if bound <= max_distance:
+                candidates.append((bound, -count, entry_id))
+        candidates.sort()
+
+        cutoff = max_distance
+        # Names one edit away are cheap to check, so only the wider search is capped
+        for bound, _, entry_id in candidates if max_distance == 1 else candidates[:_CANDIDATES]:
+            if bound > cutoff:
+                break
+            text, term_id, span_words = self._entries[entry_id]
+            # A word of a longer name scores one edit worse than the same full-name match
+            penalty = 1 if span_words else 0
+            distance = edit_distance(query, text, cutoff - penalty) + penalty
+            if distance <= cutoff and distance < distances.get(term_id, cutoff + 1):
+                distances[term_id] = distance
+                if len(distances) >= limit:
+                    cutoff = sorted(distances.values())[limit - 1]
+
+    def _contained(self, query, distances):
+        # Cities named by a run of the query's words ("new york city", "paris france"), the
+        # other words counting as deleted characters. Returns how many were found.
+        words = query.split()
+        found = 0
+        for size in range(len(words) - 1, 0, -1):
+            for start in range(len(words) - size + 1):
+                span = ' '.join(words[start:start + size])
+                term_id = self._city_ids.get(span) if len(span) >= _MIN_CONTAINED else None
+                if term_id is not None and term_id not in distances:
+                    distances[term_id] = len(query) - len(span)
+                    found += 1
+        return found
+
+    def search(self, query, limit=5, max_distance=None):
+        """Ranked matches for `query`, closest and biggest first."""
+        query = fold(query)
+        if not query:
+            return []
+        if max_distance is None:
+            max_distance = max(1, len(query) // 3)
+
+        # Names one edit away first: the length window and the trigram bound are tight,
+        # so common grams cost little. When that finds too few, a city named among the
+        # query's words beats a wide search, which would only find worse typo matches.
+        query_grams = trigrams(query)
+        shared = Counter()
+        distances = {}
+        self._count(query_grams, shared, len(query) - 1, len(query) + 1)
+        self._score(query, query_grams, shared, min(1, max_distance), limit, distances)
+        if distances:
+            # Runners-up for a close match need not be far-fetched
+            max_distance = min(max_distance, 2)
+        contained = len(distances) < limit and ' ' in query and self._contained(query, distances)
+        if len(distances) < limit and not contained and max_distance > 1:
+            self._count(query_grams, shared, len(query) - max_distance, len(query) - 2)
+            self._count(query_grams, shared, len(query) + 2, len(query) + max_distance)
+            self._score(query, query_grams, shared, max_distance, limit, distances)
+
+        matches = sorted(distances.items(), key=lambda m: (m[1], [-s for s in self._sizes[m[0]]], m[0]))
+        results = []
+        for term_id, distance in matches[:limit]:
+            term = self._terms[term_id]
+            confidence = round(1 - distance / max(len(query), len(term)), 3)
+            results.append(FuzzyMatch(term, self._airports[term_id], distance, confidence))
+        return results
+
+
+_fuzzy_index = None
+_fuzzy_index_lock = threading.Lock()
+
+
+def get_fuzzy_index():
+    global _fuzzy_index
+    if _fuzzy_index is None:
+        with _fuzzy_index_lock:
+            if _fuzzy_index is None:
+                _fuzzy_index = FuzzyAirportIndex(get_airport_index())
+    return _fuzzy_index
+
+
+@lru_cache(maxsize=4096)
+def best_match(query):
+    """Best fuzzy match for `query` (memoized, since popular city names repeat), or None."""
+    matches = get_fuzzy_index().search(query, limit=1)
+    return matches[0] if matches else None
@@ -0,0 +1,69 @@
+"""
+Grid-bucket geo index over the airports that have an IATA code.
+
+Airports are bucketed into 1 x 1 degree cells; a radius query only visits the cells
+overlapping the query's bounding box and ranks the hits by great-circle distance.
+"""
+import math
+import threading
+from collections import defaultdict
+
+from agents.tools.airport_index import get_airport_index
+
+EARTH_RADIUS_KM = 6371.0
+CELL_DEGREES = 1.0
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _cell(lat, lon):
+    return math.floor(lat / CELL_DEGREES), math.floor(lon / CELL_DEGREES)
+
+
+class GeoIndex:
+
+    def __init__(self, airports):
+        self._cells = defaultdict(list)
+        for airport in airports:
+            if airport.iata:
+                self._cells[_cell(airport.latitude, airport.longitude)].append(airport)
+        self._lon_cells = round(360 / CELL_DEGREES)
+
+    def near(self, lat, lon, radius_km, limit=None):
+        """[(distance_km, Airport)] within `radius_km` of (lat, lon), nearest first."""
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(min(89.0, abs(lat) + lat_span))), 1e-6)
+        lon_span = min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+        row_lo, col_lo = _cell(lat - lat_span, lon - lon_span)
+        row_hi, col_hi = _cell(lat + lat_span, lon + lon_span)
+        # Column indexes wrap around the antimeridian.
+        half = self._lon_cells // 2
+        columns = {(col + half) % self._lon_cells - half for col in range(col_lo, col_hi + 1)}
+
+        hits = []
+        for row in range(row_lo, row_hi + 1):
+            for col in columns:
+                for airport in self._cells.get((row, col), ()):
+                    distance = haversine_km(lat, lon, airport.latitude, airport.longitude)
+                    if distance <= radius_km:
+                        hits.append((distance, airport))
+        hits.sort(key=lambda hit: hit[0])
+        return hits[:limit] if limit else hits
+
+
+_geo_index = None
+_geo_index_lock = threading.Lock()
+
+
+def get_geo_index():
+    global _geo_index
+    if _geo_index is None:
+        with _geo_index_lock:
+            if _geo_index is None:
+                _geo_index = GeoIndex(get_airport_index())
+    return _geo_index
@@ -0,0 +1,293 @@
+"""
+Compact binary index over data/airports.dat (OpenFlights format).
+
+The CSV is compiled once into data/airports.idx, which is memory-mapped on first use,
+so importing the airport tools costs a header check instead of a full CSV parse.
+Rebuild explicitly with:
+
+    python -m agents.tools.airport_index
+
+Layout (little-endian):
+    header | records (fixed width) | city index | IATA index | string pool
+Records keep every useful airports.dat column; the city index is sorted by
+normalized city name (airports with no city are left out) and the IATA index by
+code, both searched with bisection.
+"""
+import csv
+import mmap
+import os
+import struct
+import threading
+from typing import NamedTuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SOURCE_PATH = os.path.join(PROJECT_ROOT, 'data', 'airports.dat')
+INDEX_PATH = os.path.join(PROJECT_ROOT, 'data', 'airports.idx')
+
+MAGIC = b'APTIDX\x00\x01'
+VERSION = 2
+# magic, version, records, city entries, iata entries, string pool size, source size, source mtime
+HEADER = struct.Struct('<8sIIIIIQQ')
+# id, name, city, country, timezone (offset, length into the pool), iata, icao,
+# latitude, longitude, altitude, utc offset, dst
+RECORD = struct.Struct('<iIHIHIHIH3s4sddifc')
+# normalized city (offset, length into the pool), record number
+CITY_ENTRY = struct.Struct('<IHI')
+# iata code, record number
+IATA_ENTRY = struct.Struct('<3sI')
+
+
+class Airport(NamedTuple):
+    id: int
+    name: str
+    city: str
+    country: str
+    iata: str
+    icao: str
+    latitude: float
+    longitude: float
+    altitude: int
+    utc_offset: float
+    dst: str
+    timezone: str
+
+
+def normalize_city(name):
+    return ' '.join(name.strip().lower().split())
+
+
+def _valid_iata(code):
+    return len(code) == 3 and code.isalnum()
+
+
+def _float(value, default=0.0):
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _read_rows(source_path):
+    with open(source_path, encoding='utf-8') as csvfile:
+        for row in csv.reader(csvfile):
+            if len(row) < 12:
+                continue
+            yield row
+
+
+def build_index(source_path=SOURCE_PATH):
+    """Compile airports.dat into the binary index format and return the bytes."""
+    pool = bytearray()
+    pool_offsets = {}
+
+    def intern(text):
+        data = text.encode('utf-8')[:0xFFFF]
+        if data not in pool_offsets:
+            pool_offsets[data] = len(pool)
+            pool.extend(data)
+        return pool_offsets[data], len(data)
+
+    records = bytearray()
+    city_entries = []
+    iata_entries = []
+    for row in _read_rows(source_path):
+        number = len(records) // RECORD.size
+        iata = row[4].strip().upper()
+        iata = iata if _valid_iata(iata) else ''
+        icao = row[5].strip().upper()
+        icao = icao if len(icao) == 4 else ''
+        tz = row[11].strip() if row[11] != '\\N' else ''
+        records.extend(RECORD.pack(
+            int(_float(row[0])),
+            *intern(row[1].strip()),
+            *intern(row[2].strip()),
+            *intern(row[3].strip()),
+            *intern(tz),
+            iata.encode('ascii'),
+            icao.encode('ascii', 'ignore'),
+            _float(row[6]),
+            _float(row[7]),
+            int(_float(row[8])),
+            _float(row[9]),
+            (row[10][:1] if row[10] != '\\N' else 'N').encode('ascii', 'replace')[:1] or b'N',
+        ))
+        if iata:
+            iata_entries.append((iata, number))
+            if normalize_city(row[2]):
+                city_entries.append((normalize_city(row[2]), number))
+
+    # Stable sort keeps file order within a city, so the first airport listed wins.
+    city_entries.sort(key=lambda entry: entry[0].encode('utf-8'))
+    iata_entries.sort()
+    city_blob = b''.join(CITY_ENTRY.pack(*intern(city), number) for city, number in city_entries)
+    iata_blob = b''.join(IATA_ENTRY.pack(code.encode('ascii'), number) for code, number in iata_entries)
+
+    stat = os.stat(source_path)
+    header = HEADER.pack(MAGIC, VERSION, len(records) // RECORD.size, len(city_entries), len(iata_entries),
+                         len(pool), stat.st_size, stat.st_mtime_ns)
+    return header + bytes(records) + city_blob + iata_blob + bytes(pool)
+
+
+def write_index(source_path=SOURCE_PATH, index_path=INDEX_PATH):
+    data = build_index(source_path)
+    tmp_path = f'{index_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, index_path)
+    return len(data)
+
+
+class AirportIndex:
+
+    def __init__(self, buffer, source_path=SOURCE_PATH):
+        self._buffer = buffer
+        if len(buffer) < HEADER.size:
+            raise ValueError('Airport index is truncated')
+        (magic, version, self._record_count, self._city_count, self._iata_count,
+         pool_size, self.source_size, self.source_mtime_ns) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not an airport index (or an outdated version)')
+        self._records_at = HEADER.size
+        self._cities_at = self._records_at + self._record_count * RECORD.size
+        self._iatas_at = self._cities_at + self._city_count * CITY_ENTRY.size
+        self._pool_at = self._iatas_at + self._iata_count * IATA_ENTRY.size
+        if len(buffer) != self._pool_at + pool_size:
+            raise ValueError('Airport index size does not match its header')
+        self._city_to_iata = None
+
+    @classmethod
+    def open(cls, index_path=INDEX_PATH):
+        with open(index_path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def is_stale(self, source_path=SOURCE_PATH):
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) != (self.source_size, self.source_mtime_ns)
+
+    def __len__(self):
+        return self._record_count
+
+    def _text(self, offset, length):
+        start = self._pool_at + offset
+        return bytes(self._buffer[start:start + length]).decode('utf-8')
+
+    def airport(self, number):
+        (airport_id, name_off, name_len, city_off, city_len, country_off, country_len, tz_off, tz_len,
+         iata, icao, lat, lon, altitude, utc_offset, dst) = RECORD.unpack_from(
+            self._buffer, self._records_at + number * RECORD.size)
+        return Airport(
+            airport_id,
+            self._text(name_off, name_len),
+            self._text(city_off, city_len),
+            self._text(country_off, country_len),
+            iata.rstrip(b'\x00').decode('ascii'),
+            icao.rstrip(b'\x00').decode('ascii'),
+            lat,
+            lon,
+            altitude,
+            utc_offset,
+            dst.decode('ascii'),
+            self._text(tz_off, tz_len),
+        )
+
+    def __iter__(self):
+        return (self.airport(number) for number in range(self._record_count))
+
+    def _city_entry(self, position):
+        offset, length, number = CITY_ENTRY.unpack_from(self._buffer, self._cities_at + position * CITY_ENTRY.size)
+        start = self._pool_at + offset
+        return bytes(self._buffer[start:start + length]), number
+
+    def _city_range(self, key):
+        key = key.encode('utf-8')
+        lo, hi = 0, self._city_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._city_entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        end = lo
+        while end < self._city_count and self._city_entry(end)[0] == key:
+            end += 1
+        return lo, end
+
+    def find_city(self, city):
+        """All airports with an IATA code in `city`, in airports.dat order."""
+        start, end = self._city_range(normalize_city(city))
+        return [self.airport(self._city_entry(position)[1]) for position in range(start, end)]
+
+    def city_iata(self, city):
+        """IATA code of the first airport listed for `city`, or None."""
+        start, end = self._city_range(normalize_city(city))
+        if start == end:
+            return None
+        return self.airport(self._city_entry(start)[1]).iata
+
+    def find_iata(self, code):
+        code = code.strip().upper().encode('ascii', 'ignore')
+        lo, hi = 0, self._iata_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry, number = IATA_ENTRY.unpack_from(self._buffer, self._iatas_at + mid * IATA_ENTRY.size)
+            if entry < code:
+                lo = mid + 1
+            elif entry > code:
+                hi = mid
+            else:
+                return self.airport(number)
+        return None
+
+    def city_to_iata(self):
+        """{normalized city: first IATA code} in airports.dat order, built on first call."""
+        if self._city_to_iata is None:
+            first = {}
+            for position in range(self._city_count):
+                city, number = self._city_entry(position)
+                first.setdefault(city.decode('utf-8'), number)
+            self._city_to_iata = {city: self.airport(number).iata
+                                  for city, number in sorted(first.items(), key=lambda item: item[1])}
+        return self._city_to_iata
+
+
+_airport_index = None
+_airport_index_lock = threading.Lock()
+
+
+def get_airport_index():
+    """
+    Open the process-wide airport index, (re)building data/airports.idx first when it
+    is missing or older than airports.dat. Falls back to an in-memory index if the
+    data directory is read-only.
+    """
+    global _airport_index
+    if _airport_index is not None:
+        return _airport_index
+    with _airport_index_lock:
+        if _airport_index is None:
+            index = None
+            try:
+                index = AirportIndex.open(INDEX_PATH)
+                if index.is_stale():
+                    index = None
+            except (OSError, ValueError):
+                index = None
+            if index is None:
+                try:
+                    write_index()
+                    index = AirportIndex.open(INDEX_PATH)
+                except OSError as e:
+                    print(f'[AirportIndex] Could not write {INDEX_PATH} ({e}); using an in-memory index')
+                    index = AirportIndex(build_index())
+            _airport_index = index
+    return _airport_index
+
+
+if __name__ == '__main__':
+    size = write_index()
+    index = AirportIndex.open(INDEX_PATH)
+    print(f'[AirportIndex] Wrote {INDEX_PATH}: {len(index)} airports, {size} bytes')
@@ -1,103 +1,174 @@
 import os
-import csv
+from typing import List
+
 from langchain.pydantic_v1 import BaseModel, Field
 from langchain_core.tools import tool
 
-CITY_TO_IATA = {}
+from agents.tools.airport_fuzzy import fold, get_fuzzy_index, is_commercial, rank_city_airports
+from agents.tools.airport_geo import get_geo_index
+from agents.tools.airport_index import get_airport_index
+
+
+def __getattr__(name):
+    # CITY_TO_IATA is kept for callers of the old module-level dict; it is built
+    # from the airport index on first access instead of at import time.
+    if name == 'CITY_TO_IATA':
+        return get_airport_index().city_to_iata()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+# Common city name variations and aliases, mapped to the city names used in airports.dat
+CITY_ALIASES = {
+    'new delhi': 'delhi',
+    'bombay': 'mumbai',
+    'bengaluru': 'bangalore',
+    'calcutta': 'kolkata',
+    'chennai': 'madras',
+    'cochin': 'kochi',
+    'thane': 'mumbai',  # Thane is near Mumbai
+    'gurgaon': 'delhi',  # Gurgaon is near Delhi
+    'noida': 'delhi',  # Noida is near Delhi
+}
+
+# Number of alternative airports returned with each resolution.
+MAX_CANDIDATES = 3
+
+# Metro areas: airports within this radius of the main airport are searched together.
+METRO_RADIUS_KM = float(os.getenv('METRO_RADIUS_KM', '80'))
+MAX_METRO_AIRPORTS = int(os.getenv('MAX_METRO_AIRPORTS', '5'))
+
+
+def _airport_dict(airport, confidence):
+    return {
+        'iata': airport.iata,
+        'airport': airport.name,
+        'city': airport.city,
+        'country': airport.country,
+        'confidence': confidence,
+    }
+
+
+def _resolution(query, match, airports, confidence):
+    """Structured lookup result: the best airport first, the runners-up as candidates."""
+    # A fuzzy search returns one hit per matched name, so an airport can come up twice
+    unique = {}
+    for airport, airport_confidence in airports:
+        if airport.iata not in unique or airport_confidence > unique[airport.iata][1]:
+            unique[airport.iata] = (airport, airport_confidence)  # keeps its place in the order
+    candidates = [_airport_dict(a, c) for a, c in list(unique.values())[:MAX_CANDIDATES + 1]]
+    best = candidates[0] if candidates else {'iata': None, 'airport': None, 'city': None, 'country': None}
+    return {
+        'query': query,
+        'match': match if candidates else None,
+        'iata': best['iata'],
+        'airport': best['airport'],
+        'city': best['city'],
+        'country': best['country'],
+        'confidence': confidence if candidates else 0.0,
+        'candidates': candidates[1:],
+    }
+
+
+def _resolve(index, query):
+    city = query.strip().lower()
+    if not city:
+        # airports.dat has airports with no city, which an empty name would match exactly
+        return _resolution(query, None, [], 0.0)
 
-# Construct path to airports.dat relative to project root
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-csv_path = os.path.join(project_root, "data", "airports.dat")
+    # Direct lookup, then aliases, then common prefixes
+    lookups = [('exact', city, 1.0), ('alias', CITY_ALIASES.get(city, city), 1.0)]
+    lookups += [('variation', variation, 0.9)
+                for variation in (city.replace('new ', ''), city.replace('old ', ''), 'new ' + city)]
+    for match, name, confidence in lookups:
+        airports = index.find_city(name)
+        if airports:
+            ranked = rank_city_airports(airports)
+            return _resolution(query, match, [(a, confidence) for a in ranked], confidence)
 
-with open(csv_path, encoding='utf-8') as csvfile:
-    reader = csv.reader(csvfile)
-    for row in reader:
-        if len(row) < 5:
+    # Fuzzy matching: closest city or airport names, bigger airports first
+    matches = get_fuzzy_index().search(city, limit=MAX_CANDIDATES + 1)
+    if matches:
+        return _resolution(query, 'fuzzy', [(m.airport, m.confidence) for m in matches], matches[0].confidence)
+    return _resolution(query, None, [], 0.0)
+
+
+def resolve_airports(queries):
+    """
+    Resolve many city names in one pass. Duplicates (after normalization) are looked
+    up once; results come back in input order, one dict per query with `iata`,
+    `airport`, `city`, `country`, `confidence`, `match` and `candidates`.
+    """
+    index = get_airport_index()
+    resolved = {}
+    results = []
+    for query in queries:
+        key = fold(query)
+        if key not in resolved:
+            resolved[key] = _resolve(index, query)
+        results.append(dict(resolved[key], query=query))
+    print(f"[AirportLookup] Resolved {len(resolved)} unique of {len(results)} queries")
+    return results
+
+
+def metro_airports(resolution, radius_km=METRO_RADIUS_KM, limit=MAX_METRO_AIRPORTS):
+    """
+    Commercial airports serving the same metro area as a `resolve_airports` result:
+    [{'iata', 'airport', 'city', 'distance_km'}], main airport first, then by distance
+    from it. Neighbours within `radius_km` of the main airport qualify when they are
+    commercial and share its city or are international airports, so London gives
+    LHR/LCY/LTN/STN/LGW rather than every nearby airfield.
+    """
+    if not resolution.get('iata'):
+        return []
+    main = get_airport_index().find_iata(resolution['iata'])
+    if main is None:
+        return []
+
+    metro = [{'iata': main.iata, 'airport': main.name, 'city': main.city, 'distance_km': 0.0}]
+    # Centred on the main airport: averaging every same-named airport in the country would
+    # pull the centre towards namesakes hundreds of km away (Washington, NC for Washington)
+    for distance, airport in get_geo_index().near(main.latitude, main.longitude, radius_km):
+        if len(metro) >= limit:
+            break
+        if airport.iata == main.iata or not is_commercial(airport):
             continue
-        city = row[2].strip().lower()
-        iata = row[4].strip().upper()
-        # Only add valid IATA codes (3 letters, not \N or empty)
-        if iata and len(iata) == 3 and iata != '\\N' and iata != 'N/A':
-            # If city already exists, prefer the one with a valid IATA code
-            if city not in CITY_TO_IATA or CITY_TO_IATA[city] == '\\N' or CITY_TO_IATA[city] == 'N/A':
-                CITY_TO_IATA[city] = iata
+        same_city = airport.city == main.city and airport.country == main.country
+        if same_city or 'international' in airport.name.lower():
+            metro.append({'iata': airport.iata, 'airport': airport.name, 'city': airport.city,
+                          'distance_km': round(distance, 1)})
+    return metro
 
-print(f"[AirportLookup] Loaded {len(CITY_TO_IATA)} city-to-IATA mappings")
 
 class AirportLookupInput(BaseModel):
     q: str = Field(description='City or country name to find airport code for.')
 
+
+class AirportsLookupInput(BaseModel):
+    cities: List[str] = Field(description='City names to find airport codes for, e.g. ["Madrid", "New York"].')
+
+
 @tool(args_schema=AirportLookupInput)
 def airport_code_lookup(q: str):
     '''
     Find the IATA airport code for a given city using the local OpenFlights CSV.
     Supports fuzzy matching for common city name variations.
     '''
-    city = q.strip().lower()
-    print(f"[AirportLookup] Looking up IATA for: {city}")
-    
-    # Direct lookup
-    if city in CITY_TO_IATA:
-        result = CITY_TO_IATA[city]
-        print(f"[AirportLookup] Found direct match: {city} -> {result}")
-        return result
-    
-    # Common city name variations and aliases
-    city_aliases = {
-        'delhi': 'new delhi',
-        'new delhi': 'new delhi',
-        'mumbai': 'mumbai',
-        'bombay': 'mumbai',
-        'bangalore': 'bangalore',
-        'bengaluru': 'bangalore',
-        'calcutta': 'kolkata',
-        'kolkata': 'kolkata',
-        'madras': 'chennai',
-        'chennai': 'chennai',
-        'hyderabad': 'hyderabad',
-        'pune': 'pune',
-        'ahmedabad': 'ahmedabad',
-        'jaipur': 'jaipur',
-        'lucknow': 'lucknow',
-        'kolkata': 'kolkata',
-        'goa': 'goa',
-        'kochi': 'kochi',
-        'cochin': 'kochi',
-        'surat': 'surat',
-        'kanpur': 'kanpur',
-        'nagpur': 'nagpur',
-        'indore': 'indore',
-        'thane': 'mumbai',  # Thane is near Mumbai
-        'gurgaon': 'new delhi',  # Gurgaon is near Delhi
-        'noida': 'new delhi',  # Noida is near Delhi
-    }
-    
-    # Check aliases
-    normalized_city = city_aliases.get(city, city)
-    if normalized_city in CITY_TO_IATA:
-        result = CITY_TO_IATA[normalized_city]
-        print(f"[AirportLookup] Found via alias: {city} -> {normalized_city} -> {result}")
-        return result
-    
-    # Fuzzy matching: check if city name is contained in any CSV city name
-    for csv_city, iata_code in CITY_TO_IATA.items():
-        if city in csv_city or csv_city in city:
-            print(f"[AirportLookup] Found fuzzy match: {city} -> {csv_city} -> {iata_code}")
-            return iata_code
-    
-    # If still not found, try removing common prefixes/suffixes
-    city_variations = [
-        city,
-        city.replace('new ', ''),
-        city.replace('old ', ''),
-        'new ' + city,
-    ]
-    
-    for variation in city_variations:
-        if variation in CITY_TO_IATA:
-            result = CITY_TO_IATA[variation]
-            print(f"[AirportLookup] Found via variation: {city} -> {variation} -> {result}")
-            return result
-    
-    print(f"[AirportLookup] No match found for: {city}")
-    return "N/A"
\ No newline at end of file
+    print(f"[AirportLookup] Looking up IATA for: {q}")
+    result = _resolve(get_airport_index(), q)
+    if result['iata'] is None:
+        print(f"[AirportLookup] No match found for: {q}")
+        return "N/A"
+    print(f"[AirportLookup] Found {result['match']} match: {q} -> {result['city']} -> {result['iata']}")
+    return result['iata']
+
+
+@tool(args_schema=AirportsLookupInput)
+def airport_codes_lookup(cities: List[str]):
+    '''
+    Find IATA airport codes for several cities at once (multi-city trips).
+
+    Returns:
+        list: One result per city with the IATA code, airport name, confidence (0-1)
+        and alternative candidate airports. `iata` is null when nothing matched.
+    '''
+    return resolve_airports(cities)
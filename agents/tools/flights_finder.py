@@ -2,14 +2,17 @@ import os
 from typing import Optional
 
 # from pydantic import BaseModel, Field
-import serpapi
 from langchain.pydantic_v1 import BaseModel, Field
 from langchain_core.tools import tool
 
+from agents.tools.search_cache import cached_search
+
 
 class FlightsInput(BaseModel):
-    departure_airport: Optional[str] = Field(description='Departure airport code (IATA)')
-    arrival_airport: Optional[str] = Field(description='Arrival airport code (IATA)')
+    departure_airport: Optional[str] = Field(
+        description='Departure airport code (IATA), or several comma-separated codes for a metro area, e.g. LHR,LGW,STN')
+    arrival_airport: Optional[str] = Field(
+        description='Arrival airport code (IATA), or several comma-separated codes for a metro area, e.g. JFK,LGA,EWR')
     outbound_date: Optional[str] = Field(description='Parameter defines the outbound date. The format is YYYY-MM-DD. e.g. 2024-06-22')
     return_date: Optional[str] = Field(description='Parameter defines the return date. The format is YYYY-MM-DD. e.g. 2024-06-28')
     adults: Optional[int] = Field(1, description='Parameter defines the number of adults. Default to 1.')
@@ -22,6 +25,26 @@ class FlightsInputSchema(BaseModel):
     params: FlightsInput
 
 
+def search_flights(args):
+    """Google Flights response (projected, cached) for a dict of FlightsInput fields."""
+    params = {
+        'api_key': os.environ.get('SERPAPI_API_KEY'),
+        'engine': 'google_flights',
+        'hl': 'en',
+        'gl': 'us',
+        'departure_id': args.get('departure_airport'),
+        'arrival_id': args.get('arrival_airport'),
+        'outbound_date': args.get('outbound_date'),
+        'return_date': args.get('return_date'),
+        'currency': 'USD',
+        'adults': args.get('adults', 1),
+        'infants_in_seat': args.get('infants_in_seat', 0),
+        'infants_on_lap': args.get('infants_on_lap', 0),
+        'children': args.get('children', 0)
+    }
+    return cached_search(params)
+
+
 @tool(args_schema=FlightsInputSchema)
 def flights_finder(params: FlightsInput):
     '''
@@ -31,26 +54,10 @@ def flights_finder(params: FlightsInput):
         dict: Flight search results.
     '''
 
-    params = {
-        'api_key': os.environ.get('SERPAPI_API_KEY'),
-        'engine': 'google_flights',
-        'hl': 'en',
-        'gl': 'us',
-        'departure_id': params.departure_airport,
-        'arrival_id': params.arrival_airport,
-        'outbound_date': params.outbound_date,
-        'return_date': params.return_date,
-        'currency': 'USD',
-        'adults': params.adults,
-        'infants_in_seat': params.infants_in_seat,
-        'infants_on_lap': params.infants_on_lap,
-        'children': params.children
-    }
-
-    search = serpapi.search(params)
-    print(f'SerpApi flights raw data: {search.data}')
-    try:
-        results = search.data['best_flights']
-    except KeyError:
+    data = search_flights(params.dict())
+    print(f"SerpApi flights: {len(data.get('best_flights', []))} best, {len(data.get('other_flights', []))} other")
+    # Best and other flights together: the agent ranks them locally (agents.ranking)
+    results = data.get('best_flights', []) + data.get('other_flights', [])
+    if not results:
         results = "No flights found for this query."  # Graceful handling for missing 'best_flights'
     return results
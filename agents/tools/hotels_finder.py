@@ -1,10 +1,12 @@
 import os
 from typing import Optional
 
-import serpapi
 from langchain.pydantic_v1 import BaseModel, Field
 from langchain_core.tools import tool
 
+from agents.tools.projection import HOTELS_TOP_N
+from agents.tools.search_cache import cached_search
+
 # from pydantic import BaseModel, Field
 
 
@@ -49,6 +51,5 @@ def hotels_finder(params: HotelsInput):
         'hotel_class': params.hotel_class
     }
 
-    search = serpapi.search(params)
-    results = search.data
-    return results['properties'][:5]
+    results = cached_search(params)
+    return results['properties'][:HOTELS_TOP_N]
@@ -0,0 +1,99 @@
+"""
+Projection of SerpApi responses down to the fields the itinerary actually uses.
+
+A Google Flights or Google Hotels response is mostly data nothing reads: booking
+tokens, carbon estimates, layover details, dozens of photos and prices per property.
+Whatever a search returns is kept in the search cache, in LangGraph state and in the
+checkpointer, so responses are projected right after json.loads, keeping the first
+FLIGHTS_TOP_N flight options (best and other) and HOTELS_TOP_N properties.
+
+The body is decoded in one go once it has downloaded. Decoding it incrementally
+(ijson) held about a third less memory at its peak on a 200 KB response, but took four
+to five times as long, so it is not worth the dependency.
+"""
+import os
+
+FLIGHTS_TOP_N = int(os.getenv('FLIGHTS_TOP_N', '10'))
+HOTELS_TOP_N = int(os.getenv('HOTELS_TOP_N', '20'))
+
+
+class Items:
+    """Spec for a list: keep the first `limit` items (all if None), each projected with `spec`."""
+
+    def __init__(self, limit, spec=True):
+        self.limit = limit
+        self.spec = spec
+
+
+_AIRPORT = {'name': True, 'id': True, 'time': True}
+FLIGHT_OPTION = {
+    'flights': Items(None, {
+        'departure_airport': _AIRPORT,
+        'arrival_airport': _AIRPORT,
+        'duration': True,
+        'airplane': True,
+        'airline': True,
+        'airline_logo': True,
+        'travel_class': True,
+        'flight_number': True,
+    }),
+    'layovers': Items(None, {'duration': True, 'id': True, 'overnight': True}),
+    'total_duration': True,
+    'price': True,
+    'type': True,
+    'currency': True,
+    'google_flights_url': True,
+    'link': True,
+}
+_RATE = {'lowest': True, 'extracted_lowest': True}
+HOTEL = {
+    'name': True,
+    'description': True,
+    'link': True,
+    'gps_coordinates': True,
+    'check_in_time': True,
+    'check_out_time': True,
+    'rate_per_night': _RATE,
+    'total_rate': _RATE,
+    'hotel_class': True,
+    'extracted_hotel_class': True,
+    'overall_rating': True,
+    'reviews': True,
+    'amenities': True,
+    'nearby_places': Items(None, {'name': True, 'transportations': Items(None, {'type': True, 'duration': True})}),
+    'images': Items(1, {'thumbnail': True}),
+}
+
+# Top-level keys kept per engine; SerpApi reports failures in 'error'
+PROJECTIONS = {
+    'google_flights': {
+        'best_flights': Items(FLIGHTS_TOP_N, FLIGHT_OPTION),
+        'other_flights': Items(FLIGHTS_TOP_N, FLIGHT_OPTION),
+        'error': True,
+    },
+    'google_hotels': {
+        'properties': Items(HOTELS_TOP_N, HOTEL),
+        'error': True,
+    },
+}
+
+
+def _pick(value, spec):
+    if spec is True:
+        return value
+    if isinstance(spec, Items):
+        if not isinstance(value, list):
+            return value
+        return [_pick(item, spec.spec) for item in value[:spec.limit]]
+    if not isinstance(value, dict):
+        return value
+    return {key: _pick(value[key], sub) for key, sub in spec.items() if key in value}
+
+
+def project(engine, data):
+    """`data` with only the projected fields for `engine`; other engines are returned as is."""
+    spec = PROJECTIONS.get(engine)
+    if spec is None or not isinstance(data, dict):
+        return data
+    return _pick(data, spec)
+
@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from agents.tools.airport_index import PROJECT_ROOT
+
+# How long (seconds) a response stays fresh, per SerpApi engine.
+DEFAULT_TTLS = {
+    'google_flights': 15 * 60,
+    'google_hotels': 60 * 60,
+}
+DEFAULT_TTL = 15 * 60
+# After expiring, a response may still be served for this long while a background refresh runs.
+DEFAULT_STALE_SECONDS = 10 * 60
+
+
+def cache_key(params):
+    """Normalized key for a SerpApi request: `api_key` and unset params are ignored."""
+    normalized = {
+        k: str(v).strip().lower()
+        for k, v in params.items()
+        if k != 'api_key' and v is not None and v != ''
+    }
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _serpapi_fetch(params):
+    from agents.tools import serpapi_client  # httpx is set up on the first search, not at startup
+    return serpapi_client.search(params)
+
+
+class CacheStats:
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.deduped = 0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f'CacheStats({self.as_dict()})'
+
+
+class _DiskTier:
+    """SQLite-backed tier so cached responses survive Streamlit restarts."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, fetched_at REAL, data TEXT)')
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT fetched_at, data FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put(self, key, fetched_at, data):
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?)', (key, fetched_at, json.dumps(data)))
+            self._conn.commit()
+
+    def delete_older_than(self, cutoff):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE fetched_at < ?', (cutoff,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+
+class SearchCache:
+    """
+    Two-tier cache for SerpApi responses.
+
+    The memory tier is a bounded LRU; the optional disk tier (SQLite at `disk_path`)
+    is consulted on memory misses. Expired entries younger than `stale_seconds` past
+    their TTL are returned immediately while a background thread refreshes them.
+    Concurrent misses for the same request share one fetch; the others wait for it
+    for up to `wait_timeout` seconds (None waits as long as the fetch takes).
+    """
+
+    def __init__(self, fetch=_serpapi_fetch, max_entries=256, ttls=None, stale_seconds=DEFAULT_STALE_SECONDS,
+                 disk_path=None, wait_timeout=None):
+        self._fetch = fetch
+        self._wait_timeout = wait_timeout
+        self._max_entries = max_entries
+        self._ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._stale_seconds = stale_seconds
+        self._disk = _DiskTier(disk_path) if disk_path else None
+        if self._disk is not None:
+            self._disk.delete_older_than(time.time() - max(self._ttls.values()) - stale_seconds)
+        self._entries = OrderedDict()  # key -> (fetched_at, data)
+        self._refreshing = set()
+        self._inflight = {}  # key -> Future of the fetch in progress
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def ttl_for(self, params):
+        return self._ttls.get(params.get('engine'), DEFAULT_TTL)
+
+    def get(self, params):
+        key = cache_key(params)
+        ttl = self.ttl_for(params)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self._disk is not None:
+            entry = self._disk.get(key)
+            if entry is not None and now - entry[0] < ttl + self._stale_seconds:
+                self._count('disk_hits')
+                self._remember(key, *entry)
+            else:
+                entry = None
+
+        if entry is not None:
+            fetched_at, data = entry
+            age = now - fetched_at
+            if age < ttl:
+                self._count('hits')
+                return data
+            if age < ttl + self._stale_seconds:
+                self._count('stale_hits')
+                self._refresh_in_background(key, params)
+                return data
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+                self.stats.misses += 1
+            else:
+                self.stats.deduped += 1
+        if not owner:
+            try:
+                return pending.result(timeout=self._wait_timeout)
+            except TimeoutError:
+                raise TimeoutError(f'Identical search still running after {self._wait_timeout:g}s') from None
+
+        try:
+            data = self._load(key, params)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        pending.set_result(data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self, key, params):
+        data = self._fetch(params)
+        # SerpApi reports failures in the payload; those are never cached.
+        if isinstance(data, dict) and 'error' not in data:
+            fetched_at = time.time()
+            self._remember(key, fetched_at, data)
+            if self._disk is not None:
+                self._disk.put(key, fetched_at, data)
+        return data
+
+    def _count(self, stat):
+        with self._lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+
+    def _remember(self, key, fetched_at, data):
+        with self._lock:
+            self._entries[key] = (fetched_at, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def _refresh_in_background(self, key, params):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._load(key, params)
+                self._count('refreshes')
+            except Exception as e:
+                print(f'[SearchCache] Background refresh failed: {e!r}')
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='search-cache-refresh', daemon=True).start()
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """
+    Process-wide cache, configured from the environment on first use:
+    SEARCH_CACHE_ENABLED (default 1), SEARCH_CACHE_SIZE (default 256) and
+    SEARCH_CACHE_PATH (SQLite file for the disk tier, relative to the project root; unset
+    keeps it in memory only).
+    Waiting on an identical search in flight is bounded by the SerpApi client's search timeout.
+    """
+    global _search_cache
+    if os.getenv('SEARCH_CACHE_ENABLED', '1') == '0':
+        return None
+    with _search_cache_lock:
+        if _search_cache is None:
+            from agents.tools.serpapi_client import get_serpapi_client  # no httpx until the first search
+
+            disk_path = os.getenv('SEARCH_CACHE_PATH')
+            _search_cache = SearchCache(
+                max_entries=int(os.getenv('SEARCH_CACHE_SIZE', '256')),
+                disk_path=os.path.join(PROJECT_ROOT, disk_path) if disk_path else None,
+                wait_timeout=get_serpapi_client().search_timeout,
+            )
+        return _search_cache
+
+
+def set_search_cache(cache):
+    """Replace the process-wide cache (e.g. with a custom fetch or TTLs); None resets it."""
+    global _search_cache
+    with _search_cache_lock:
+        _search_cache = cache
+
+
+def cached_search(params):
+    """Run a SerpApi search through the process-wide cache and return the response data."""
+    cache = get_search_cache()
+    if cache is None:
+        return _serpapi_fetch(params)
+    return cache.get(params)
@@ -0,0 +1,181 @@
+"""
+Async SerpApi client shared by the flight and hotel tools.
+
+One httpx.AsyncClient runs on a background event loop thread, so every search in the
+process reuses the same pool of keep-alive connections, and a semaphore caps how many
+are in flight at once. Each attempt is bounded by connect/read timeouts. 429 and 5xx
+responses, connection failures and read timeouts are retried with jittered exponential
+backoff (honouring Retry-After). Synchronous callers use `search`, which blocks only the
+calling thread and gives up after `search_timeout`, however long the search is queued.
+Responses are projected to the fields the app uses as soon as they are decoded (see projection).
+
+Configured from the environment: SERPAPI_BASE_URL (point it at a local stub server for
+testing), SERPAPI_CONNECT_TIMEOUT, SERPAPI_READ_TIMEOUT, SERPAPI_MAX_RETRIES,
+SERPAPI_BACKOFF_SECONDS and SERPAPI_MAX_CONCURRENCY.
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import random
+import threading
+
+from agents.tools.projection import project
+
+SERPAPI_BASE_URL = os.getenv('SERPAPI_BASE_URL', 'https://serpapi.com')
+SERPAPI_CONNECT_TIMEOUT = float(os.getenv('SERPAPI_CONNECT_TIMEOUT', '5'))
+SERPAPI_READ_TIMEOUT = float(os.getenv('SERPAPI_READ_TIMEOUT', '25'))
+SERPAPI_MAX_RETRIES = int(os.getenv('SERPAPI_MAX_RETRIES', '2'))
+SERPAPI_BACKOFF_SECONDS = float(os.getenv('SERPAPI_BACKOFF_SECONDS', '0.5'))
+SERPAPI_MAX_CONCURRENCY = int(os.getenv('SERPAPI_MAX_CONCURRENCY', '8'))
+# Upper bound for one backoff sleep, including a server-provided Retry-After
+MAX_BACKOFF_SECONDS = 8.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SerpApiError(Exception):
+    """A search that failed for good: a non-retryable status, or retries ran out."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class ClientStats:
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f'ClientStats({self.as_dict()})'
+
+
+class SerpApiClient:
+
+    def __init__(self, base_url=SERPAPI_BASE_URL, connect_timeout=SERPAPI_CONNECT_TIMEOUT,
+                 read_timeout=SERPAPI_READ_TIMEOUT, max_retries=SERPAPI_MAX_RETRIES,
+                 backoff_seconds=SERPAPI_BACKOFF_SECONDS, max_concurrency=SERPAPI_MAX_CONCURRENCY):
+        self.base_url = base_url.rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_concurrency = max_concurrency
+        self.stats = ClientStats()
+        self._loop = None
+        self._http = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def search_timeout(self):
+        """Longest a search may take: every attempt timing out, with the longest backoff between them."""
+        return ((self.connect_timeout + self.read_timeout) * (self.max_retries + 1)
+                + MAX_BACKOFF_SECONDS * self.max_retries)
+
+    def search(self, params, timeout=None):
+        """Run one search from synchronous code and return the response JSON."""
+        timeout = self.search_timeout if timeout is None else timeout
+        future = self.submit(params)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            # Cancels the coroutine too, so it gives its semaphore slot back
+            future.cancel()
+            self.stats.failures += 1
+            raise SerpApiError(f'SerpApi search did not finish within {timeout:g}s') from None
+
+    def submit(self, params):
+        """Schedule a search on the client's loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(self.search_async(params), self._ensure_loop())
+
+    async def search_async(self, params):
+        """Run one search on the client's loop (see `submit` for use from other threads)."""
+        import httpx
+
+        query = {k: v for k, v in params.items() if v is not None}
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                self.stats.requests += 1
+                retry_after = None
+                try:
+                    response = await self._http.get(f'{self.base_url}/search.json', params=query)
+                    if response.status_code == 200:
+                        return project(params.get('engine'), json.loads(response.content))
+                except httpx.ReadTimeout:
+                    error = SerpApiError(f'SerpApi did not respond within {self.read_timeout:g}s')
+                except httpx.TransportError as e:
+                    error = SerpApiError(f'SerpApi request failed: {e!r}')
+                else:
+                    error = SerpApiError(_error_message(response), status=response.status_code)
+                    if response.status_code not in RETRY_STATUSES:
+                        self.stats.failures += 1
+                        raise error
+                    retry_after = response.headers.get('Retry-After')
+
+                if attempt == self.max_retries:
+                    self.stats.failures += 1
+                    raise error
+                self.stats.retries += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    def close(self):
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        # "Full jitter": anywhere up to the exponential step, so retries from many sessions spread out
+        return random.uniform(0, min(self.backoff_seconds * 2 ** attempt, MAX_BACKOFF_SECONDS))
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                import httpx
+
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='serpapi-client', daemon=True).start()
+                self._http = httpx.AsyncClient(
+                    timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                    limits=httpx.Limits(max_connections=self.max_concurrency,
+                                        max_keepalive_connections=self.max_concurrency),
+                )
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._loop = loop
+            return self._loop
+
+
+def _error_message(response):
+    try:
+        message = response.json().get('error')
+    except ValueError:
+        message = None
+    return f'SerpApi returned HTTP {response.status_code}' + (f': {message}' if message else '')
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_serpapi_client():
+    """Process-wide client, configured from the environment on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SerpApiClient()
+        return _client
+
+
+def search(params):
+    """Run a SerpApi search with the process-wide client and return the response JSON."""
+    return get_serpapi_client().search(params)
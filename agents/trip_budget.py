@@ -0,0 +1,102 @@
+"""
+Flight + hotel combinations for a trip budget ("the best trip under $2,000").
+
+A trip costs the flight price plus the hotel's total rate. Rather than pricing every
+flight x hotel pair, both sides are sorted once and the top k pairs come off a heap:
+
+- `cheapest_trips`: the k smallest totals. Both sides are sorted by price, so the
+  next cheapest pair is always next to one already taken, i.e. (i + 1, j) or (i, j + 1).
+- `best_trips`: the k highest combined ranking scores within the budget. Hotels are
+  sorted by price, so each flight can afford a prefix of them (found with one
+  searchsorted for all flights). A sparse table gives the best-scoring hotel in any
+  price range in O(1); the heap holds each flight's best hotel in a range, and taking
+  one splits its range in two.
+
+Both take about k heap operations after the sorts (plus one entry per flight for
+best_trips), instead of len(flights) * len(hotels), however tight the budget.
+"""
+import heapq
+import os
+
+import numpy as np
+
+from agents.ranking import (FLIGHT_CRITERIA, FLIGHT_WEIGHTS, HOTEL_CRITERIA, HOTEL_WEIGHTS, flight_table,
+                            hotel_table, score, weights_for)
+
+# Combinations shown for a query with a budget
+TRIPS_SHOWN = int(os.getenv('TRIPS_SHOWN', '3'))
+
+
+def _priced(table):
+    """Indices of the options with a known price."""
+    return np.flatnonzero(np.isfinite(table.columns['price']))
+
+
+def cheapest_trips(flights, hotels, budget=None, k=TRIPS_SHOWN, nights=None):
+    """Up to k (flight, hotel, total) with the lowest totals, cheapest first, within `budget` if given."""
+    flight_options, hotel_options = flight_table(flights), hotel_table(hotels, nights=nights)
+    f, h = _priced(flight_options), _priced(hotel_options)
+    f = f[np.argsort(flight_options.columns['price'][f], kind='stable')]
+    h = h[np.argsort(hotel_options.columns['price'][h], kind='stable')]
+    flight_price, hotel_price = flight_options.columns['price'][f], hotel_options.columns['price'][h]
+    trips = []
+    if not len(f) or not len(h):
+        return trips
+    heap, seen = [(flight_price[0] + hotel_price[0], 0, 0)], {(0, 0)}
+    while heap and len(trips) < k:
+        total, i, j = heapq.heappop(heap)
+        if budget is not None and total > budget:
+            break  # every pair left costs at least this much
+        trips.append((flight_options.items[f[i]], hotel_options.items[h[j]], float(total)))
+        for a, b in ((i + 1, j), (i, j + 1)):
+            if a < len(f) and b < len(h) and (a, b) not in seen:
+                seen.add((a, b))
+                heapq.heappush(heap, (flight_price[a] + hotel_price[b], a, b))
+    return trips
+
+
+def best_trips(flights, hotels, budget, k=TRIPS_SHOWN, priorities=(), nights=None):
+    """
+    Up to k (flight, hotel, total) with the highest combined ranking score (see
+    agents.ranking) whose total is within `budget`, best first.
+    """
+    flight_options, hotel_options = flight_table(flights), hotel_table(hotels, nights=nights)
+    f, h = _priced(flight_options), _priced(hotel_options)
+    if not len(f) or not len(h):
+        return []
+    flight_score = score(flight_options, FLIGHT_CRITERIA, weights_for(FLIGHT_WEIGHTS, priorities), f)
+    hotel_score = score(hotel_options, HOTEL_CRITERIA, weights_for(HOTEL_WEIGHTS, priorities), h)
+    flight_price, hotel_price = flight_options.columns['price'][f], hotel_options.columns['price'][h]
+
+    # Hotels by price: flight i can afford hotels[:affordable[i]] of them
+    by_price = np.argsort(hotel_price, kind='stable')
+    affordable = np.searchsorted(hotel_price[by_price], budget - flight_price, side='right').tolist()
+    price_score = hotel_score[by_price]
+    # best[level][p]: position of the best-scoring hotel in by_price[p:p + 2 ** level]
+    best = [np.arange(len(h))]
+    while 2 ** len(best) <= len(h):
+        prev, half = best[-1], 2 ** (len(best) - 1)
+        left, right = prev[:-half], prev[half:]
+        best.append(np.where(price_score[left] >= price_score[right], left, right))
+    best = [level.tolist() for level in best]
+    price_score = price_score.tolist()
+
+    def candidate(i, lo, hi):
+        # Heap entry for flight i and its best hotel among by_price[lo:hi]
+        level = (hi - lo).bit_length() - 1
+        a, b = best[level][lo], best[level][hi - 2 ** level]
+        p = a if price_score[a] >= price_score[b] else b
+        return -(flight_score[i] + price_score[p]), i, p, lo, hi
+
+    heap = [candidate(i, 0, limit) for i, limit in enumerate(affordable) if limit]
+    heapq.heapify(heap)
+    trips = []
+    while heap and len(trips) < k:
+        _, i, p, lo, hi = heapq.heappop(heap)
+        j = by_price[p]
+        trips.append((flight_options.items[f[i]], hotel_options.items[h[j]], float(flight_price[i] + hotel_price[j])))
+        # The flight's next best hotel is the best on either side of the one just taken
+        for a, b in ((lo, p), (p + 1, hi)):
+            if a < b:
+                heapq.heappush(heap, candidate(i, a, b))
+    return trips
@@ -0,0 +1,80 @@
+"""
+Startup time and per-session memory: one Agent per Streamlit session vs the shared agent.
+
+"per-session" reproduces the old `initialize_agent`: every session built its own ChatGroq
+client, bound the tools, compiled the graph with its own MemorySaver and printed the
+mermaid diagram. "shared" is `app.get_agent()`: the first session builds the agent and
+every later one only takes a reference to it.
+
+    python benchmarks/bench_agent_sessions.py [--sessions 100]
+"""
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+
+from langchain_groq import ChatGroq  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+
+from agents.agent import TOOLS, Agent  # noqa: E402
+
+
+def per_session_agent():
+    agent = Agent(checkpointer=MemorySaver())
+    agent._tools_llm = ChatGroq(model='llama-3.3-70b-versatile', groq_api_key=os.environ['GROQ_API_KEY'],
+                                temperature=0.3).bind_tools(TOOLS)
+    print(agent.draw_mermaid())
+    return agent
+
+
+_shared_agent = None
+
+
+def shared_agent():
+    global _shared_agent
+    if _shared_agent is None:
+        _shared_agent = Agent()
+    return _shared_agent
+
+
+def measure(label, make, sessions):
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    timings = []
+    session_states = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(sessions):
+            start = time.perf_counter()
+            session_states.append({'agent': make()})
+            timings.append(time.perf_counter() - start)
+    gc.collect()
+    total = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    print(f'{label:<12}{timings[0] * 1000:>12.1f}{sum(timings[1:]) / max(1, sessions - 1) * 1000:>14.3f}'
+          f'{total / sessions / 1024:>16.1f}{total / 1e6:>12.1f}')
+    return session_states
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=100)
+    args = parser.parse_args()
+
+    # Warm the imports and the airport index so both modes start from the same state
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        per_session_agent()
+
+    print(f"{'mode':<12}{'first (ms)':>12}{'next (ms/ea)':>14}{'KB / session':>16}{'total MB':>12}")
+    measure('per-session', per_session_agent, args.sessions)
+    measure('shared', shared_agent, args.sessions)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Accuracy and latency of fuzzy airport matching on noisy city names.
+
+City names with at least one IATA airport are corrupted with one random edit
+(deletion, insertion, substitution or transposition), or padded with extra words the
+way people type them ("new york city", "paris france"). A lookup counts as correct
+when it returns an airport of the original city. The trigram index is compared with
+the linear substring scan that airport_code_lookup used before.
+
+    python benchmarks/bench_airport_fuzzy.py [--samples 3000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.tools.airport_fuzzy import best_match, fold, get_fuzzy_index  # noqa: E402
+from agents.tools.airport_index import get_airport_index  # noqa: E402
+
+
+def corrupt(name, rng):
+    position = rng.randrange(len(name))
+    edit = rng.choice(('delete', 'insert', 'substitute', 'transpose'))
+    if edit == 'delete':
+        return name[:position] + name[position + 1:]
+    if edit == 'insert':
+        return name[:position] + rng.choice(string.ascii_lowercase) + name[position:]
+    if edit == 'substitute':
+        return name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1:]
+    position = min(position, len(name) - 2)
+    return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+
+
+def linear_scan(city_to_iata, city):
+    for csv_city, iata_code in city_to_iata.items():
+        if city in csv_city or csv_city in city:
+            return iata_code
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = get_airport_index()
+    city_codes = {}
+    countries = {}
+    for airport in index:
+        if airport.iata:
+            city_codes.setdefault(fold(airport.city), set()).add(airport.iata)
+            countries.setdefault(fold(airport.city), fold(airport.country))
+    cities = sorted(city for city in city_codes if len(city) >= 5)
+    samples = [(city, corrupt(city, rng)) for city in rng.sample(cities, min(args.samples, len(cities)))]
+    worded = [(city, rng.choice((f'{city} city', f'{city} {countries[city]}', f'{city} airport')))
+              for city in rng.sample(cities, min(args.samples, len(cities)))]
+
+    start = time.perf_counter()
+    fuzzy = get_fuzzy_index()
+    build = time.perf_counter() - start
+    city_to_iata = {fold(city): code for city, code in index.city_to_iata().items()}
+
+    for label, lookup in (
+        ('linear substring scan', lambda q: linear_scan(city_to_iata, q)),
+        ('trigram index', lambda q: next((m.airport.iata for m in fuzzy.search(q, limit=1)), None)),
+    ):
+        for noise, queries in (('one edit', samples), ('extra words', worded)):
+            correct = 0
+            start = time.perf_counter()
+            for city, noisy in queries:
+                if lookup(noisy) in city_codes[city]:
+                    correct += 1
+            elapsed = time.perf_counter() - start
+            print(f'{label:22s} {noise:12s} accuracy {correct / len(queries):6.1%}   '
+                  f'{elapsed / len(queries) * 1e6:8.1f} us/lookup')
+
+    start = time.perf_counter()
+    for _ in range(10):
+        for _, noisy in samples:
+            best_match(noisy)
+    elapsed = time.perf_counter() - start
+    print(f'{"memoized (repeat)":35s} {elapsed / (10 * len(samples)) * 1e6:24.1f} us/lookup (first pass included)')
+    print(f'trigram index build: {build * 1000:.0f} ms for {len(fuzzy)} names, {len(samples) + len(worded)} noisy queries')
+
+
+if __name__ == '__main__':
+    main()
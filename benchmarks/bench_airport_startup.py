@@ -0,0 +1,63 @@
+"""
+Startup cost of the airport data: parsing airports.dat with csv.reader (what the
+airport tool used to do at import) versus opening the prebuilt, memory-mapped index.
+
+    python benchmarks/bench_airport_startup.py [--runs 50]
+"""
+import argparse
+import csv
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.tools.airport_index import INDEX_PATH, SOURCE_PATH, AirportIndex, write_index  # noqa: E402
+
+
+def legacy_csv_load():
+    city_to_iata = {}
+    with open(SOURCE_PATH, encoding='utf-8') as csvfile:
+        for row in csv.reader(csvfile):
+            if len(row) < 5:
+                continue
+            city = row[2].strip().lower()
+            iata = row[4].strip().upper()
+            if iata and len(iata) == 3 and iata != '\\N' and city not in city_to_iata:
+                city_to_iata[city] = iata
+    return city_to_iata['madrid']
+
+
+def index_open():
+    return AirportIndex.open(INDEX_PATH).city_iata('madrid')
+
+
+def measure(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    size = write_index()
+    build = time.perf_counter() - start
+
+    csv_time = measure(legacy_csv_load, args.runs)
+    index_time = measure(index_open, args.runs)
+    print(f'index build (one-off):        {build * 1000:8.2f} ms  ({size / 1024:.0f} KiB)')
+    print(f'csv parse + first lookup:     {csv_time * 1000:8.2f} ms')
+    print(f'mmap open + first lookup:     {index_time * 1000:8.2f} ms')
+    print(f'speedup:                      {csv_time / index_time:8.0f}x')
+
+
+if __name__ == '__main__':
+    main()
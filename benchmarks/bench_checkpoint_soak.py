@@ -0,0 +1,102 @@
+"""
+Heap growth of the graph checkpointers under a soak of back-to-back searches.
+
+Runs many complete queries (fast path, stubbed SerpApi returning realistically large
+payloads), each on a fresh thread_id like the Streamlit app does, and samples the
+traced Python heap with tracemalloc. The plain MemorySaver grows with every search;
+the bounded savers level off once `--max-threads` threads are stored.
+
+    python benchmarks/bench_checkpoint_soak.py [--searches 400] [--every 50] [--max-threads 64]
+"""
+import argparse
+import contextlib
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+os.environ['SEARCH_CACHE_ENABLED'] = '0'
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+
+from agents.agent import Agent  # noqa: E402
+from agents.checkpoints import BoundedMemorySaver, SqliteCheckpointSaver  # noqa: E402
+from agents.tools import serpapi_client  # noqa: E402
+
+QUERIES = [
+    'from madrid to london from 1st oct to 7th oct 2026, 4 star hotel',
+    'delhi to mumbai 2026-12-12 to 2026-12-15 for 2 adults',
+    'from new york to paris nov 3-10 2026',
+    'berlin to rome from 5 to 9 september 2026',
+]
+
+
+def _flight(i):
+    leg = {'departure_airport': {'name': 'Departure International Airport', 'id': 'MAD', 'time': '2026-10-01 08:00'},
+           'arrival_airport': {'name': 'Arrival International Airport', 'id': 'LHR', 'time': '2026-10-01 10:00'},
+           'duration': 120, 'airplane': 'Airbus A320', 'airline': f'Airline {i}', 'travel_class': 'Economy',
+           'flight_number': f'XX {1000 + i}', 'airline_logo': f'https://www.gstatic.com/flights/airline_logos/70px/X{i}.png',
+           'extensions': ['Average legroom (30 in)', 'In-seat USB outlet', 'Carbon emissions estimate: 120 kg'] * 3}
+    return {'flights': [leg, dict(leg)], 'total_duration': 240, 'price': 300 + i, 'type': 'Round trip',
+            'booking_token': 'x' * 400}
+
+
+def _hotel(i):
+    return {'name': f'Hotel {i}', 'description': 'A comfortable hotel in the city centre. ' * 4, 'hotel_class': '4-star hotel',
+            'overall_rating': 4.3, 'reviews': 1200 + i, 'rate_per_night': {'lowest': '$120', 'extracted_lowest': 120},
+            'amenities': ['Free Wi-Fi', 'Pool', 'Spa', 'Fitness centre', 'Restaurant', 'Bar', 'Room service'] * 2,
+            'images': [{'thumbnail': f'https://lh5.googleusercontent.com/p/{i}-{n}', 'original_image': 'x' * 120}
+                       for n in range(10)],
+            'nearby_places': [{'name': f'Place {n}', 'transportations': [{'type': 'Taxi', 'duration': '5 min'}]}
+                              for n in range(5)]}
+
+
+def _search(params):
+    if params['engine'] == 'google_flights':
+        return {'best_flights': [_flight(i) for i in range(3)], 'other_flights': [_flight(i) for i in range(3, 20)]}
+    return {'properties': [_hotel(i) for i in range(20)]}
+
+
+def soak(label, checkpointer, searches, every):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        agent = Agent(checkpointer=checkpointer)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    samples = []
+    for n in range(1, searches + 1):
+        config = {'configurable': {'thread_id': str(uuid.uuid4())}}
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            agent.graph.invoke({'messages': [HumanMessage(content=QUERIES[n % len(QUERIES)])]}, config=config)
+        if n % every == 0:
+            gc.collect()
+            samples.append((tracemalloc.get_traced_memory()[0] - baseline) / 1e6)
+    tracemalloc.stop()
+    stats = checkpointer.stats() if hasattr(checkpointer, 'stats') else {'threads': len(checkpointer.storage)}
+    print(f"{label:<10}" + ''.join(f'{mb:>9.1f}' for mb in samples) + f'   {stats}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--searches', type=int, default=400)
+    parser.add_argument('--every', type=int, default=50, help='Sample the heap every N searches')
+    parser.add_argument('--max-threads', type=int, default=64)
+    args = parser.parse_args()
+    serpapi_client.search = _search
+
+    print('Heap growth (MB) after N searches\n')
+    print(f"{'saver':<10}" + ''.join(f'{n:>9}' for n in range(args.every, args.searches + 1, args.every)))
+    soak('memory', MemorySaver(), args.searches, args.every)
+    soak('bounded', BoundedMemorySaver(max_threads=args.max_threads), args.searches, args.every)
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite = SqliteCheckpointSaver(os.path.join(directory, 'checkpoints.sqlite'), max_threads=args.max_threads)
+        soak('sqlite', sqlite, args.searches, args.every)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Daily itinerary generation: per-day f-string rebuilding vs pre-rendered destination schedules.
+
+The previous generator (kept below as the baseline) rebuilt every day's schedule from
+f-strings, and the activities table with it, and grew the plan by string concatenation.
+Agent.create_daily_itinerary now looks up the destination once and joins its
+pre-rendered day schedules. Reports microseconds per trip and per day for trips of
+growing length, for a city with a content pack and one without.
+
+    python benchmarks/bench_daily_itinerary.py [--lengths 3,7,21,60] [--runs 200]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+
+from agents.agent import Agent  # noqa: E402
+
+
+def _arrival(city):
+    return f"""**🌅 MORNING (8:00 AM - 12:00 PM)**
+- 8:00 AM: Arrive at airport
+- 9:00 AM: Immigration & baggage claim
+- 10:00 AM: Airport transfer to hotel
+- 11:00 AM: Hotel check-in and freshen up
+
+**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
+- 12:00 PM: Lunch at local restaurant
+- 2:00 PM: Explore {city} city center
+- 4:00 PM: Visit local market or shopping area
+- 5:00 PM: Coffee break at café
+
+**🌙 EVENING (6:00 PM - 10:00 PM)**
+- 6:00 PM: Return to hotel
+- 7:00 PM: Dinner at hotel or nearby restaurant
+- 9:00 PM: Relax and prepare for next day
+- 10:00 PM: Early rest for tomorrow's adventures"""
+
+
+def _departure(departure_city):
+    return f"""**🌅 MORNING (8:00 AM - 12:00 PM)**
+- 8:00 AM: Hotel check-out
+- 9:00 AM: Final shopping or last-minute sightseeing
+- 10:00 AM: Return to hotel for luggage
+- 11:00 AM: Airport transfer
+
+**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
+- 12:00 PM: Arrive at airport
+- 1:00 PM: Check-in and security
+- 2:00 PM: Duty-free shopping or airport lounge
+- 3:00 PM: Boarding for flight to {departure_city}
+
+**🌙 EVENING (6:00 PM - 10:00 PM)**
+- 6:00 PM: In-flight meal and entertainment
+- 8:00 PM: Rest on flight
+- 10:00 PM: Arrival at {departure_city}"""
+
+
+def _full_day(day_number):
+    activities = {
+        1: ["Visit main historical sites", "Explore local museums", "City walking tour"],
+        2: ["Day trip to nearby attractions", "Local food tour", "Cultural experiences"],
+        3: ["Nature and outdoor activities", "Shopping districts", "Local entertainment"],
+        4: ["Hidden gems and local spots", "Relaxation activities", "Evening entertainment"],
+        5: ["Adventure activities", "Photography spots", "Local festivals or events"]
+    }
+    day_activities = activities.get(day_number, ["Explore local attractions", "Visit recommended spots", "Enjoy local culture"])
+    return f"""**🌅 MORNING (8:00 AM - 12:00 PM)**
+- 8:00 AM: Hotel breakfast
+- 9:00 AM: {day_activities[0]}
+- 11:00 AM: Coffee break and rest
+
+**🌞 AFTERNOON (12:00 PM - 6:00 PM)**
+- 12:00 PM: Local lunch
+- 2:00 PM: {day_activities[1]}
+- 4:00 PM: {day_activities[2]}
+- 5:30 PM: Return to hotel for rest
+
+**🌙 EVENING (6:00 PM - 10:00 PM)**
+- 6:00 PM: Hotel rest and freshen up
+- 7:30 PM: Dinner at recommended restaurant
+- 9:00 PM: Evening stroll or local entertainment
+- 10:00 PM: Return to hotel"""
+
+
+def previous_daily_itinerary(departure_city, arrival_city, check_in_date, check_out_date):
+    check_in = datetime.strptime(check_in_date, "%Y-%m-%d")
+    check_out = datetime.strptime(check_out_date, "%Y-%m-%d")
+    num_days = (check_out - check_in).days
+    itinerary = f"\n🗓️ **DAILY ITINERARY FOR {arrival_city.upper()}**\n"
+    itinerary += f"📅 Trip Duration: {num_days} days ({check_in.strftime('%B %d, %Y')} - {check_out.strftime('%B %d, %Y')})\n\n"
+    for day in range(num_days):
+        current_date = check_in + timedelta(days=day)
+        itinerary += f"## 📅 **DAY {day + 1} - {current_date.strftime('%A, %B %d, %Y')}**\n\n"
+        if day == 0:
+            itinerary += _arrival(arrival_city)
+        elif day == num_days - 1:
+            itinerary += _departure(departure_city)
+        else:
+            itinerary += _full_day(day + 1)
+        itinerary += "\n---\n\n"
+    return itinerary
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lengths', default='3,7,21,60', help='Comma-separated trip lengths (nights)')
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    agent = Agent()
+    hotels = [{'name': 'The Savoy'}]
+    check_in = date(2026, 11, 1)
+    print(f"{'city':<12}{'nights':>7}{'previous us':>13}{'per day':>9}{'packs us':>10}{'per day':>9}")
+    for city in ('london', 'reykjavik'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.create_daily_itinerary('madrid', city, '2026-11-01', '2026-11-04', hotels)  # loads the store
+        for nights in [int(n) for n in args.lengths.split(',')]:
+            check_out = (check_in + timedelta(days=nights)).isoformat()
+            previous = timed(lambda: previous_daily_itinerary('madrid', city, check_in.isoformat(), check_out), args.runs)
+            packs = timed(lambda: agent.create_daily_itinerary('madrid', city, check_in.isoformat(), check_out, hotels),
+                          args.runs)
+            print(f'{city:<12}{nights:>7}{previous:>13.1f}{previous / nights:>9.2f}{packs:>10.1f}{packs / nights:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
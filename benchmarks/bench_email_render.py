@@ -0,0 +1,90 @@
+"""
+Email HTML rendering: deterministic template versus the GPT-4o conversion.
+
+Renders the recorded itineraries in benchmarks/fixtures/itineraries.json and checks
+fidelity as the share of key facts (airlines, flight numbers, prices, hotel names,
+booking links, logos) present in the HTML. The LLM path only runs with --llm and an
+OPENAI_API_KEY, and costs one GPT-4o call per itinerary.
+
+    python benchmarks/bench_email_render.py [--repeat 200] [--llm]
+"""
+import argparse
+import html
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.email_template import render_email_html  # noqa: E402
+from agents.itinerary import Itinerary, render_markdown  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'itineraries.json')
+
+
+def load_itineraries():
+    with open(FIXTURES, encoding='utf-8') as f:
+        records = json.load(f)
+    itineraries = []
+    for record in records:
+        itinerary = Itinerary(departure_city=record['departure_city'], arrival_city=record['arrival_city'],
+                              check_in=record['check_in'], check_out=record['check_out'],
+                              daily_plan=record['daily_plan'])
+        itinerary.set_flights(record['flights'])
+        itinerary.set_hotels(record['hotels'])
+        itineraries.append((record['name'], itinerary))
+    return itineraries
+
+
+def facts(itinerary):
+    expected = []
+    for option in itinerary.flights:
+        expected.append(f'{option.price:,}')
+        if option.booking:
+            expected.append(option.booking[1])
+        for leg in option.legs:
+            expected += [leg.airline, leg.flight_number, leg.departure_id, leg.arrival_id, leg.airline_logo]
+    for hotel in itinerary.hotels:
+        expected += [hotel.name, hotel.link, f'{hotel.rate_per_night:,}']
+    return [str(fact) for fact in expected if fact]
+
+
+def fidelity(itinerary, email_html):
+    text = html.unescape(email_html)
+    expected = facts(itinerary)
+    return sum(fact in text for fact in expected) / len(expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='Template renders per itinerary')
+    parser.add_argument('--llm', action='store_true', help='Also time the GPT-4o conversion')
+    args = parser.parse_args()
+
+    itineraries = load_itineraries()
+    renderers = [('template', args.repeat, render_email_html)]
+    if args.llm:
+        from langchain_core.messages import HumanMessage, SystemMessage
+        from langchain_openai import ChatOpenAI
+
+        from agents.agent import EMAILS_SYSTEM_PROMPT
+        llm = ChatOpenAI(model='gpt-4o', temperature=0.1)
+
+        def llm_render(itinerary):
+            messages = [SystemMessage(content=EMAILS_SYSTEM_PROMPT), HumanMessage(content=render_markdown(itinerary))]
+            return llm.invoke(messages).content
+        renderers.append(('gpt-4o', 1, llm_render))
+
+    for label, repeat, render in renderers:
+        for name, itinerary in itineraries:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                email_html = render(itinerary)
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f'{label:9s} {name:18s} {elapsed * 1000:10.2f} ms/email   fidelity {fidelity(itinerary, email_html):6.1%}   '
+                  f'{len(email_html.encode("utf-8")) / 1024:6.1f} KB')
+
+
+if __name__ == '__main__':
+    main()
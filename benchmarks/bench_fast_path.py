@@ -0,0 +1,70 @@
+"""
+End-to-end graph latency with and without the fast-path router.
+
+Runs a mix of complete and vague queries through the compiled graph with a stubbed
+tool-calling LLM (that returns proper flights/hotels tool calls) and a stubbed
+SerpApi, and reports the median latency and how often each route was taken.
+
+    python benchmarks/bench_fast_path.py [--llm 1.2] [--search 0.3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+os.environ['SEARCH_CACHE_ENABLED'] = '0'
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+
+from agents.agent import Agent  # noqa: E402
+from agents.tools import serpapi_client  # noqa: E402
+
+QUERIES = [
+    'I want to travel from madrid to london from 1st oct to 7th oct 2026. Find me flights and 4 star hotels',
+    'from new york to paris from 3rd nov to 10th nov 2026',
+    'delhi to mumbai from 12th dec to 15th dec 2026 find 5 star hotel',
+    'from berlin to rome from 5th sep to 9th sep 2026',
+    'plan a trip to tokyo next month',
+    'I need a beach holiday somewhere warm in winter',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--llm', type=float, default=1.2, help='Stubbed tool-calling LLM latency (seconds)')
+    parser.add_argument('--search', type=float, default=0.3, help='Stubbed SerpApi latency (seconds)')
+    args = parser.parse_args()
+
+    def search(params):
+        time.sleep(args.search)
+        if params['engine'] == 'google_flights':
+            return {'best_flights': [{'flights': [], 'price': 700}]}
+        return {'properties': [{'name': 'Stub Hotel'}]}
+    serpapi_client.search = search
+
+    def tools_llm(messages):
+        time.sleep(args.llm)
+        params = {'departure_airport': 'MAD', 'arrival_airport': 'NRT', 'outbound_date': '2026-10-01', 'return_date': '2026-10-05'}
+        hotels = {'q': 'Tokyo', 'check_in_date': '2026-10-01', 'check_out_date': '2026-10-05'}
+        return AIMessage(content='', tool_calls=[{'name': 'flights_finder', 'args': {'params': params}, 'id': 'f'},
+                                                 {'name': 'hotels_finder', 'args': {'params': hotels}, 'id': 'h'}])
+
+    for label, fast_path in (('always LLM', False), ('fast-path router', True)):
+        agent = Agent(fast_path=fast_path)
+        agent._tools_llm = RunnableLambda(tools_llm)
+        timings = []
+        for query in QUERIES:
+            config = {'configurable': {'thread_id': str(uuid.uuid4())}}
+            start = time.perf_counter()
+            agent.graph.invoke({'messages': [HumanMessage(content=query)]}, config=config)
+            timings.append(time.perf_counter() - start)
+        print(f'{label:18s} median {statistics.median(timings):6.2f}s   total {sum(timings):6.2f}s   routes {agent.route_stats()}')
+
+
+if __name__ == '__main__':
+    main()
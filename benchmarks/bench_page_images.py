@@ -0,0 +1,80 @@
+"""
+Image bytes per page load and image processing time per rerun: original files vs ui.images variants.
+
+Reproduces what st.image (Streamlit 1.38) does with its input on every rerun: decode
+it, downscale anything wider than 1460px and re-encode anything that is not already
+in the output format (JPEG here, PNG only for images with alpha). The browser fetches
+each distinct media URL once per page load, and Streamlit's URLs hash the bytes, so
+identical images in the gallery and the sidebar are only counted once.
+
+    python benchmarks/bench_page_images.py [--reruns 5]
+"""
+import argparse
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('UI_IMAGE_CACHE', tempfile.mkdtemp())
+
+from PIL import Image  # noqa: E402
+
+from ui import images  # noqa: E402
+
+MAXIMUM_CONTENT_WIDTH = 2 * 730
+
+
+def streamlit_image_bytes(data):
+    """The bytes st.image(data, use_container_width=True) serves for opaque images."""
+    image = Image.open(io.BytesIO(data))
+    if image.width > MAXIMUM_CONTENT_WIDTH:
+        image = image.resize((MAXIMUM_CONTENT_WIDTH, int(image.height * MAXIMUM_CONTENT_WIDTH / image.width)),
+                             resample=Image.BILINEAR)
+    elif image.format == 'JPEG':
+        return data
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def original_page():
+    sources = []
+    for names in images.PAGE_IMAGES.values():
+        for name in names:
+            path = os.path.join(images.IMAGES_DIR, name)
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    sources.append(f.read())
+    return sources
+
+
+def variant_page():
+    return [data for slot in images.PAGE_IMAGES for data in images.page_images(slot)]
+
+
+def measure(label, page, reruns):
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        served = [streamlit_image_bytes(data) for data in page()]
+        timings.append(time.perf_counter() - start)
+    unique = {hashlib.sha224(data).hexdigest(): len(data) for data in served}
+    print(f'{label:<12}{len(served):>8}{len(unique):>8}{sum(unique.values()) / 1024:>14.0f}'
+          f'{timings[0] * 1000:>14.1f}{min(timings[1:] or timings) * 1000:>14.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'images':<12}{'shown':>8}{'fetched':>8}{'KB / load':>14}{'first (ms)':>14}{'rerun (ms)':>14}")
+    measure('original', original_page, args.reruns)
+    measure('variants', variant_page, args.reruns)
+
+
+if __name__ == '__main__':
+    main()
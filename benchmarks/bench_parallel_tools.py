@@ -0,0 +1,63 @@
+"""
+Compare sequential and parallel tool execution in `Agent.invoke_tools`.
+
+SerpApi is replaced by a stub that sleeps for a fixed latency per request, so the
+numbers show the fan-out effect only (no network, no API key needed).
+
+    python benchmarks/bench_parallel_tools.py [--latency 0.8] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+# Every run must hit the (stubbed) API, not the search cache.
+os.environ['SEARCH_CACHE_ENABLED'] = '0'
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from agents.agent import Agent  # noqa: E402
+from agents.tools import serpapi_client  # noqa: E402
+
+QUERY = 'I want to travel from madrid to new york from 1st oct to 7th oct 2026. Find me flights and 4 star hotels'
+
+
+def stub_serpapi(latency):
+    def search(params):
+        time.sleep(latency)
+        if params['engine'] == 'google_flights':
+            return {'best_flights': [{'flights': [], 'price': 700}]}
+        return {'properties': [{'name': 'Stub Hotel'}]}
+    serpapi_client.search = search
+
+
+def measure(agent, runs):
+    state = {'messages': [HumanMessage(content=QUERY)]}
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        agent.invoke_tools(state)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.8, help='Stubbed SerpApi latency per call (seconds)')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    stub_serpapi(args.latency)
+    sequential = measure(Agent(parallel_tools=False), args.runs)
+    parallel = measure(Agent(parallel_tools=True), args.runs)
+    print(f'stub latency per SerpApi call: {args.latency:.2f}s')
+    print(f'sequential invoke_tools p50:   {sequential:.3f}s')
+    print(f'parallel invoke_tools p50:     {parallel:.3f}s')
+    print(f'speedup:                       {sequential / parallel:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Latency and peak memory of the PDF backends on a typical itinerary.
+
+Each backend runs in a fresh interpreter so peak RSS is not shared; Playwright's
+Chromium processes are counted as children once the browser pool is closed.
+Logos are fetched on the first render and served from the local asset cache after.
+
+    python benchmarks/bench_pdf_backends.py [--renders 10] [--backends native playwright]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LOGO = 'https://www.gstatic.com/flights/airline_logos/70px/{}.png'
+
+
+def sample_itinerary():
+    lines = ['\n✈️ FLIGHTS\n']
+    for option, airline in enumerate(('IB', 'BA', 'UX', 'VY', 'FR'), start=1):
+        lines.append(f'<div style="font-weight:700;font-size:1.15em;">Option {option}:</div>')
+        lines.append(f'  - {airline} 31{option}0 from Adolfo Suárez Madrid–Barajas Airport (MAD) at 07:05 '
+                     f'to Heathrow Airport (LHR) at 08:35 on 2026-10-01')
+        lines.append(f'    <img src="{LOGO.format(airline)}" alt="{airline}" width="70" height="70"><br>')
+        lines.append('  [Book on Google Flights](https://www.google.com/travel/flights)')
+    lines.append('\n🏨 HOTELS\n')
+    for option in range(1, 6):
+        lines.append(f'\n<div style="font-weight:700;font-size:1.15em;">Option {option}:</div>')
+        lines.append(f'Hotel: Stub Hotel {option}\nClass: 4-star hotel\nRating: 4.{option}/5 (1200 reviews)')
+        lines.append(f'Rate per night: {150 + option * 10}\nAmenities: Free Wi-Fi, Breakfast, Gym, Spa')
+        lines.append(f'Website: <a href="https://example.com/{option}">https://example.com/{option}</a>')
+    lines.append('\n🗓️ **DAILY ITINERARY FOR LONDON**\n')
+    for day in range(1, 7):
+        lines.append(f'## 📅 **DAY {day}**\n\n**🌅 MORNING (8:00 AM - 12:00 PM)**\n- 8:00 AM: Hotel breakfast\n'
+                     f'- 9:00 AM: Visit main historical sites\n\n---\n')
+    return '\n'.join(lines)
+
+
+def max_rss_mb(who):
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def child(backend, renders):
+    from agents.pdf.backends import PDF_BACKENDS
+    from agents.pdf.browser_pool import get_browser_pool
+
+    content = sample_itinerary()
+    baseline = max_rss_mb(resource.RUSAGE_SELF)
+    timings, size = [], 0
+    for _ in range(renders):
+        start = time.perf_counter()
+        size = len(PDF_BACKENDS[backend].render(content))
+        timings.append((time.perf_counter() - start) * 1000)
+    get_browser_pool().close()
+    print(json.dumps({
+        'first_ms': timings[0],
+        'median_ms': statistics.median(timings[1:] or timings),
+        'self_mb': max_rss_mb(resource.RUSAGE_SELF) - baseline,
+        'children_mb': max_rss_mb(resource.RUSAGE_CHILDREN),
+        'pdf_kb': size / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--renders', type=int, default=10)
+    parser.add_argument('--backends', nargs='+', default=['native', 'playwright'])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.renders)
+        return
+
+    for backend in args.backends:
+        run = subprocess.run([sys.executable, __file__, '--child', backend, '--renders', str(args.renders)],
+                             capture_output=True, text=True)
+        if run.returncode != 0:
+            print(f'{backend:12s} failed: {run.stderr.strip().splitlines()[-1] if run.stderr else run.returncode}')
+            continue
+        result = json.loads(run.stdout.strip().splitlines()[-1])
+        print(f'{backend:12s} first {result["first_ms"]:8.1f} ms   warm median {result["median_ms"]:8.1f} ms   '
+              f'peak RSS +{result["self_mb"]:6.1f} MB (children {result["children_mb"]:6.1f} MB)   '
+              f'{result["pdf_kb"]:6.1f} KB PDF')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+PDF render latency: a Chromium launch per request versus the warm browser pool.
+
+Simulates `--users` concurrent sessions each rendering `--renders` distinct itineraries.
+Requires Playwright with Chromium installed (playwright install chromium).
+
+    python benchmarks/bench_pdf_pool.py [--users 4] [--renders 5] [--workers 2]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.pdf.browser_pool import PDF_OPTIONS, VIEWPORT, BrowserPool  # noqa: E402
+
+
+def itinerary_html(n):
+    rows = ''.join(f'<li>Flight {i}: IB{3160 + i} Madrid -> London, <b>€{120 + i + n}</b></li>' for i in range(10))
+    return f'<html><body><h1>Itinerary #{n}</h1><ul>{rows}</ul></body></html>'
+
+
+def cold_render(html):
+    """What _generate_pdf_from_html did before: launch, render, close."""
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_viewport_size(VIEWPORT)
+        page.set_content(html, wait_until='load')
+        page.emulate_media(media='print')
+        pdf_bytes = page.pdf(**PDF_OPTIONS)
+        browser.close()
+        return pdf_bytes
+
+
+def run(render, users, renders):
+    latencies = []
+
+    def session(user):
+        for n in range(renders):
+            start = time.perf_counter()
+            render(itinerary_html(user * renders + n))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        list(executor.map(session, range(users)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=4, help='Concurrent sessions')
+    parser.add_argument('--renders', type=int, default=5, help='Distinct itineraries rendered per session')
+    parser.add_argument('--workers', type=int, default=2, help='Warm browsers in the pool')
+    args = parser.parse_args()
+
+    pool = BrowserPool(workers=args.workers)
+    pool.render(itinerary_html(-1))  # warm-up, as a long-running app would be
+    for label, render in (('launch per request', cold_render), (f'pool of {args.workers}', pool.render)):
+        elapsed, latencies = run(render, args.users, args.renders)
+        total = args.users * args.renders
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(f'{label:20s} {total / elapsed:6.2f} PDFs/s   '
+              f'median {statistics.median(latencies) * 1000:7.0f} ms   p95 {p95 * 1000:7.0f} ms')
+    print(f'pool stats: {pool.stats()}')
+    pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Streamlit reruns per second with an itinerary in session state.
+
+Before: every rerun rendered the itinerary PDF (a fresh Chromium launch at the
+time), and sending the email rendered it once more. After: the PDF is
+rendered once per distinct itinerary on request and reused by later reruns and the
+email attachment. The renderer is stubbed with a fixed latency unless --real is given.
+
+    python benchmarks/bench_pdf_reruns.py [--reruns 20] [--render 1.5] [--real]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+
+import app  # noqa: E402
+
+TRAVEL_INFO = '\n'.join(
+    ['# Madrid -> London', '## Flights'] +
+    [f'- Flight {n}: Iberia IB{3160 + n}, 07:{n:02d} -> 08:{n + 30:02d}, **€{120 + n}**' for n in range(10)] +
+    ['## Hotels'] +
+    [f'- Hotel {n}: ⭐⭐⭐⭐, €{90 + n}/night, [book](https://example.com/{n})' for n in range(5)]
+)
+
+
+def old_rerun(travel_info):
+    return app._generate_itinerary_pdf(travel_info)
+
+
+def new_rerun(travel_info):
+    return app.cached_itinerary_pdf(travel_info) or app.get_itinerary_pdf(travel_info)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=20, help='Reruns per session (radio clicks, form edits, ...)')
+    parser.add_argument('--render', type=float, default=1.5, help='Stubbed render latency (seconds)')
+    parser.add_argument('--real', action='store_true', help='Render with the configured PDF backend instead of the stub')
+    args = parser.parse_args()
+
+    renders = []
+    if not args.real:
+        def render(travel_info, itinerary=None):
+            renders.append(travel_info)
+            time.sleep(args.render)
+            return b'%PDF-1.4 stub'
+        app._generate_itinerary_pdf = render
+
+    for label, rerun in (('render every rerun', old_rerun), ('cached by content', new_rerun)):
+        renders.clear()
+        start = time.perf_counter()
+        for _ in range(args.reruns):
+            rerun(TRAVEL_INFO)
+        rerun(TRAVEL_INFO)  # email attachment
+        elapsed = time.perf_counter() - start
+        rendered = f'{len(renders):3d} renders' if not args.real else ''
+        print(f'{label:20s} {args.reruns / elapsed:10.1f} reruns/s   {elapsed:7.2f}s total   {rendered}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Flexible-dates search: one flights search per date pair in turn vs the price calendar.
+
+"cheapest week in October" is priced over every departure in the window with a stubbed
+SerpApi (fixed latency per search). The sequential baseline searches each pair in turn,
+as repeated flights_finder calls did. The calendar runs the same pairs from a bounded
+worker pool through the search cache; running it for several sessions at once shows
+overlapping searches being shared. Also times min/argmin over the price matrix against
+a Python scan of the same cells.
+
+    python benchmarks/bench_price_calendar.py [--latency 0.3] [--sessions 4]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SEARCH_CACHE_ENABLED'] = '1'
+
+import numpy as np  # noqa: E402
+
+from agents.price_calendar import calendar_pairs, search_calendar  # noqa: E402
+from agents.tools import serpapi_client  # noqa: E402
+from agents.tools.flights_finder import search_flights  # noqa: E402
+from agents.tools.search_cache import get_search_cache  # noqa: E402
+
+ARGS = {'departure_airport': 'MAD', 'arrival_airport': 'LHR', 'adults': 1, 'children': 0,
+        'infants_in_seat': 0, 'infants_on_lap': 0}
+WINDOW = (date(2026, 10, 1), date(2026, 10, 31))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.3, help='Stubbed SerpApi latency (seconds)')
+    parser.add_argument('--sessions', type=int, default=4, help='Sessions asking for the same window at once')
+    parser.add_argument('--nights', type=int, default=7)
+    args = parser.parse_args()
+
+    calls = []
+    lock = threading.Lock()
+
+    def search(params):
+        with lock:
+            calls.append(params)
+        time.sleep(args.latency)
+        day = date.fromisoformat(params['outbound_date']).toordinal()
+        return {'best_flights': [{'flights': [], 'price': 180 + (day * 37) % 140}]}
+    serpapi_client.search = search
+
+    outbound, returns, cells = calendar_pairs(*WINDOW, args.nights)
+    print(f'window {WINDOW[0]} .. {WINDOW[1]}: {len(cells)} searches, {len(outbound)} x {len(returns)} matrix\n')
+    print(f"{'mode':<28}{'wall s':>9}{'SerpApi calls':>15}")
+
+    get_search_cache().clear()
+    calls.clear()
+    start = time.perf_counter()
+    for i, j in cells:
+        search_flights(dict(ARGS, outbound_date=outbound[i].isoformat(), return_date=returns[j].isoformat()))
+    print(f"{'sequential':<28}{time.perf_counter() - start:>9.2f}{len(calls):>15}")
+
+    get_search_cache().clear()
+    calls.clear()
+    start = time.perf_counter()
+    calendar = search_calendar(search_flights, ARGS, *WINDOW, args.nights)
+    print(f"{'calendar':<28}{time.perf_counter() - start:>9.2f}{len(calls):>15}")
+
+    get_search_cache().clear()
+    calls.clear()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool, contextlib.redirect_stdout(io.StringIO()):
+        list(pool.map(lambda _: search_calendar(search_flights, ARGS, *WINDOW, args.nights), range(args.sessions)))
+    print(f"{f'calendar x {args.sessions} sessions':<28}{time.perf_counter() - start:>9.2f}{len(calls):>15}")
+    print(f'\ncheapest: {calendar.cheapest(3)}')
+
+    prices = np.random.default_rng(7).uniform(150, 900, (120, 120))
+    prices[prices > 800] = np.nan
+    rows, cols = [date.fromordinal(739000 + d) for d in range(120)], [date.fromordinal(739000 + d) for d in range(120)]
+    calendar.outbound, calendar.returns, calendar.prices = rows, cols, prices
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        calendar.cheapest(3)
+    numpy_ms = (time.perf_counter() - start) / runs * 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        sorted((prices[i, j], i, j) for i in range(120) for j in range(120) if not np.isnan(prices[i, j]))[:3]
+    python_ms = (time.perf_counter() - start) / runs * 1000
+    print(f'cheapest 3 of a 120 x 120 matrix: numpy {numpy_ms:.3f} ms, python scan {python_ms:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Throughput and accuracy of the table-driven query parser against the old inline regexes.
+
+Generates a seeded corpus of travel queries in the phrasings users actually type
+(explicit and ISO dates, ranges, relative dates, durations, traveller counts, hotel
+classes), each with its expected fields, and runs it through both parsers.
+
+    python benchmarks/bench_query_parser.py [--queries 5000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.query_parser import parse_query  # noqa: E402
+
+TODAY = date(2026, 3, 2)  # a Monday
+CITIES = ['madrid', 'new york', 'london', 'paris', 'delhi', 'mumbai', 'tokyo', 'san francisco', 'berlin', 'rome',
+          'rio de janeiro', 'los angeles', 'dubai', 'singapore', 'goa', 'lisbon', 'buenos aires', 'cape town']
+MONTH_NAMES = ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
+               'october', 'november', 'december']
+SUFFIXES = {1: 'st', 2: 'nd', 3: 'rd', 21: 'st', 22: 'nd', 23: 'rd', 31: 'st'}
+
+
+def _ordinal(day):
+    return f'{day}{SUFFIXES.get(day, "th")}'
+
+
+def _month(month, rng):
+    name = MONTH_NAMES[month - 1]
+    return rng.choice([name, name[:3], name.title()])
+
+
+def _dates(rng):
+    """(phrase, check_in, check_out) in one of the supported phrasings."""
+    start = TODAY + timedelta(days=rng.randint(10, 250))
+    nights = rng.randint(2, 10)
+    end = start + timedelta(days=nights)
+    style = rng.randrange(8)
+    if style == 0 and start.month == end.month:
+        return f'from {_ordinal(start.day)} {_month(start.month, rng)} to {_ordinal(end.day)} {_month(end.month, rng)} {end.year}', start, end
+    if style == 1:
+        return f'{start.isoformat()} to {end.isoformat()}', start, end
+    if style == 2 and start.month == end.month:
+        return f'{_month(start.month, rng)} {start.day}-{end.day}', start, end
+    if style == 3 and start.month == end.month:
+        return f'from {start.day} to {end.day} {_month(start.month, rng)}', start, end
+    if style == 4:
+        return f'on {_month(start.month, rng)} {_ordinal(start.day)} for {nights} nights', start, end
+    if style == 5:
+        friday = TODAY + timedelta(days=4 + 7)
+        return 'next weekend', friday, friday + timedelta(days=2)
+    if style == 6:
+        start = TODAY + timedelta(days=14)
+        return 'in 2 weeks for a week', start, start + timedelta(days=7)
+    return (f'from {_ordinal(start.day)} {_month(start.month, rng)} to {_ordinal(end.day)} {_month(end.month, rng)} {end.year}',
+            start, end)
+
+
+def generate_corpus(count, seed):
+    """[(query, expected)] where expected holds the fields a correct parse must produce."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        departure, arrival = rng.sample(CITIES, 2)
+        phrase, check_in, check_out = _dates(rng)
+        adults = rng.choice([1, 1, 2, 2, 3, 4])
+        hotel_class = rng.choice([None, '3', '4', '5'])
+        route = rng.choice([f'from {departure} to {arrival}', f'{departure} to {arrival}',
+                            f'I want to travel from {departure} to {arrival}', f'plan a trip from {departure} to {arrival}'])
+        parts = [route, phrase]
+        if adults > 1:
+            parts.append(rng.choice([f'for {adults} adults', f'{adults} people', f'with {adults} travellers']))
+        if hotel_class:
+            parts.append(rng.choice([f'find {hotel_class} star hotel', f'{hotel_class}-star hotels please']))
+        query = ' '.join(parts)
+        if rng.random() < 0.3:
+            query = query.title()
+        corpus.append((query, {'departure_city': departure, 'arrival_city': arrival, 'check_in': check_in.isoformat(),
+                               'check_out': check_out.isoformat(), 'adults': adults, 'hotel_class': hotel_class}))
+    return corpus
+
+
+def legacy_parse(user_message):
+    """The regexes `invoke_tools` used inline before the parser module existed (adults were always 1)."""
+    today = datetime.combine(TODAY, datetime.min.time())
+    departure_city = arrival_city = ''
+    from_to_match = re.search(r'from\s+([a-zA-Z\s]+?)\s+to\s+([a-zA-Z\s]+?)(?:\s+from\s+\d|\s+on\s+\d|\s+find|\s*$)', user_message)
+    if not from_to_match:
+        from_to_match = re.search(r'([a-zA-Z\s]{2,}?)\s+to\s+([a-zA-Z\s]{2,}?)(?:\s+from\s+\d|\s+on\s+\d|\s+find|\s*$)', user_message)
+    if from_to_match:
+        departure_city = re.sub(r'\s+', ' ', from_to_match.group(1)).strip()
+        arrival_city = re.sub(r'\s+', ' ', from_to_match.group(2)).strip()
+        departure_city = re.sub(r'\b(plan|trip|want|need|going|travel)\b', '', departure_city, flags=re.IGNORECASE).strip()
+        arrival_city = re.sub(r'\b(plan|trip|want|need|going|travel)\b', '', arrival_city, flags=re.IGNORECASE).strip()
+
+    outbound_date = today + timedelta(days=1)
+    return_date = outbound_date + timedelta(days=3)
+    dates_match = re.search(r'from\s*(\d{1,2}(?:st|nd|rd|th)?)\s*([a-zA-Z]+)\s*to\s*(\d{1,2}(?:st|nd|rd|th)?)\s*([a-zA-Z]+)\s*(\d{4})', user_message)
+    if dates_match:
+        day1, month1, day2, month2, year = dates_match.groups()
+        try:
+            outbound_date = datetime.strptime(f"{day1} {month1.title()[:3]} {year}".replace("st", "").replace("nd", "").replace("rd", "").replace("th", ""), '%d %b %Y')
+            return_date = datetime.strptime(f"{day2} {month2.title()[:3]} {year}".replace("st", "").replace("nd", "").replace("rd", "").replace("th", ""), '%d %b %Y')
+        except ValueError:
+            pass
+    hotel_class_match = re.search(r'(\d+)\s*star hotel', user_message)
+    return {'departure_city': departure_city.lower(), 'arrival_city': arrival_city.lower(),
+            'check_in': outbound_date.strftime('%Y-%m-%d'), 'check_out': return_date.strftime('%Y-%m-%d'),
+            'adults': 1, 'hotel_class': hotel_class_match.group(1) if hotel_class_match else None}
+
+
+def table_parse(user_message):
+    query = parse_query(user_message, today=TODAY)
+    return {'departure_city': query.departure_city, 'arrival_city': query.arrival_city, 'check_in': query.check_in,
+            'check_out': query.check_out, 'adults': query.adults, 'hotel_class': query.hotel_class}
+
+
+def run(parse, corpus, repeat):
+    correct = {field: 0 for field in corpus[0][1]}
+    exact = 0
+    for query, expected in corpus:
+        parsed = parse(query)
+        fields = [field for field in expected if parsed[field] == expected[field]]
+        for field in fields:
+            correct[field] += 1
+        exact += len(fields) == len(expected)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query, _expected in corpus:
+            parse(query)
+    elapsed = time.perf_counter() - start
+    return len(corpus) * repeat / elapsed, exact / len(corpus), {f: n / len(corpus) for f, n in correct.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--queries', type=int, default=5000, help='Size of the generated corpus')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the corpus for the timing')
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.queries, args.seed)
+    print(f'{len(corpus)} queries, e.g. {corpus[0][0]!r}\n')
+    print(f"{'parser':<12}{'queries/s':>12}{'all fields':>12}  per field")
+    for name, parse in (('inline regex', legacy_parse), ('table', table_parse)):
+        throughput, exact, fields = run(parse, corpus, args.repeat)
+        per_field = ', '.join(f'{field} {share:.0%}' for field, share in fields.items())
+        print(f'{name:<12}{throughput:>12,.0f}{exact:>12.1%}  {per_field}')
+
+
+if __name__ == '__main__':
+    main()
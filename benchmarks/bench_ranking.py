@@ -0,0 +1,91 @@
+"""
+Ranking flight options and hotel properties: per-option Python loops vs agents.ranking.
+
+Synthetic result sets of growing size are ranked with the same weights, constraints
+and Pareto ordering twice: by a straightforward Python implementation (dicts walked
+per option, the Pareto front found by comparing every pair) and by the vectorized
+NumPy pass. Both must return the same order; the report shows milliseconds per ranking.
+
+    python benchmarks/bench_ranking.py [--sizes 20,200,2000] [--runs 5]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.ranking import (FLIGHT_CRITERIA, FLIGHT_WEIGHTS, HOTEL_CRITERIA, HOTEL_WEIGHTS,  # noqa: E402
+                            flight_table, hotel_table, rank, weights_for)
+
+
+def flights(n, rng):
+    return [{'price': rng.randint(90, 1200), 'total_duration': rng.randint(80, 1500),
+             'layovers': [{'id': 'CDG'}] * rng.choice((0, 0, 1, 1, 2))} for _ in range(n)]
+
+
+def hotels(n, rng):
+    return [{'total_rate': {'extracted_lowest': rng.randint(150, 3000)}, 'overall_rating': round(rng.uniform(3, 5), 1),
+             'reviews': rng.randint(0, 8000), 'extracted_hotel_class': rng.randint(2, 5),
+             'gps_coordinates': {'latitude': 51.5 + rng.gauss(0, 0.05), 'longitude': -0.12 + rng.gauss(0, 0.08)}}
+            for _ in range(n)]
+
+
+def python_rank(table, criteria, weights, constraints):
+    """The same ranking, one option at a time (reads the table's columns as plain lists)."""
+    columns = {name: table.columns[name].tolist() for name in criteria}
+    keep = [i for i in range(len(table))
+            if all((low is None or columns[name][i] >= low) and (high is None or columns[name][i] <= high)
+                   for name, (low, high) in constraints.items())]
+    rows = []
+    for i in keep:
+        rows.append([columns[name][i] * direction for name, direction in criteria.items()])
+    scaled = [[0.0] * len(criteria) for _ in rows]
+    for c in range(len(criteria)):
+        known = [row[c] for row in rows if not math.isnan(row[c])]
+        low, high = (min(known), max(known)) if known else (0.0, 0.0)
+        for r, row in enumerate(rows):
+            if math.isnan(row[c]):
+                scaled[r][c] = 0.0
+            else:
+                scaled[r][c] = (row[c] - low) / (high - low) if high > low else 1.0
+    score = [sum(value * weights.get(name, 0.0) for value, name in zip(row, criteria)) for row in scaled]
+    front = [not any(all(a >= b for a, b in zip(other, row)) and any(a > b for a, b in zip(other, row))
+                     for other in scaled) for row in scaled]
+    order = sorted(range(len(keep)), key=lambda r: (not front[r], -score[r]))
+    return [keep[r] for r in order]
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    return result, (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='20,200,2000', help='Comma-separated options per result set')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print(f"{'kind':<9}{'options':>9}{'python ms':>12}{'numpy ms':>11}{'speedup':>9}")
+    for size in [int(n) for n in args.sizes.split(',')]:
+        cases = (
+            ('flights', flight_table(flights(size, rng)), FLIGHT_CRITERIA, weights_for(FLIGHT_WEIGHTS, ['price']),
+             {'price': (None, 900)}),
+            ('hotels', hotel_table(hotels(size, rng)), HOTEL_CRITERIA, weights_for(HOTEL_WEIGHTS, ['rating']),
+             {'price': (None, 2000)}),
+        )
+        for kind, table, criteria, weights, constraints in cases:
+            expected, python_ms = timed(lambda: python_rank(table, criteria, weights, constraints), 1 if size > 500 else args.runs)
+            result, numpy_ms = timed(lambda: rank(table, criteria, weights, constraints), args.runs)
+            assert result.tolist() == expected, f'{kind}: rankings differ'
+            print(f'{kind:<9}{size:>9}{python_ms:>12.2f}{numpy_ms:>11.2f}{python_ms / numpy_ms:>8.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Websocket bytes Streamlit sends per rerun of app.py: inline <style> theme vs linked stylesheet.
+
+Runs the app with Streamlit's AppTest harness and adds up the serialized size of every
+ForwardMsg a run produces (the same protobufs the server writes to the websocket). The
+"inline" mode puts static/theme.css back into a <style> element the way render_custom_css
+used to; "linked" is the current <link> to the fingerprinted stylesheet. The stylesheet
+itself is fetched over HTTP once per browser, not per rerun, and is listed separately.
+
+    python benchmarks/bench_rerun_payload.py [--reruns 5]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner  # noqa: E402
+
+from ui import theme  # noqa: E402
+
+_run_bytes = []
+_forward_msgs = LocalScriptRunner.forward_msgs
+
+
+def _recording_forward_msgs(self):
+    messages = _forward_msgs(self)
+    _run_bytes.append(sum(message.ByteSize() for message in messages))
+    return messages
+
+
+def inline_stylesheet():
+    return f'<style>\n{theme.theme_css().decode()}</style>'
+
+
+def measure(label, stylesheet, reruns):
+    theme.stylesheet_link = stylesheet
+    _run_bytes.clear()
+    app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120)
+    for _ in range(reruns + 1):
+        app.run()
+    first, rest = _run_bytes[0], _run_bytes[1:]
+    print(f'{label:<10}{first / 1024:>14.1f}{sum(rest) / len(rest) / 1024:>14.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=5)
+    args = parser.parse_args()
+    LocalScriptRunner.forward_msgs = _recording_forward_msgs
+
+    linked = theme.stylesheet_link
+    print(f"{'theme':<10}{'first (KB)':>14}{'rerun (KB)':>14}")
+    measure('inline', inline_stylesheet, args.reruns)
+    measure('linked', linked, args.reruns)
+    print(f'\nstylesheet fetched once per browser: {len(theme.theme_css()) / 1024:.1f} KB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Bytes held per search for full vs projected SerpApi responses, and the cost of decoding them.
+
+Synthetic Google Flights and Google Hotels responses, shaped and sized like real
+ones (booking tokens, carbon estimates, price sources, photo galleries, reviews), are
+decoded two ways: the full json.loads the app used before, and json.loads followed by
+the projection, as the SerpApi client does now. "held" is the JSON size of what is
+kept (and then cached, checkpointed and rendered); "peak" is the traced heap peak
+while decoding.
+
+    python benchmarks/bench_response_projection.py [--runs 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.tools.projection import project  # noqa: E402
+
+
+def _airport(code, time):
+    return {'name': f'{code} International Airport', 'id': code, 'time': time}
+
+
+def _flight_option(i):
+    legs = [{'departure_airport': _airport('MAD', '2026-10-01 08:00'), 'arrival_airport': _airport('CDG', '2026-10-01 10:05'),
+             'duration': 125, 'airplane': 'Airbus A320neo', 'airline': f'Airline {i}', 'airline_logo':
+             f'https://www.gstatic.com/flights/airline_logos/70px/A{i}.png', 'travel_class': 'Economy',
+             'flight_number': f'AF {1000 + i}', 'legroom': '29 in', 'overnight': False, 'often_delayed_by_over_30_min': False,
+             'extensions': ['Below average legroom (29 in)', 'Wi-Fi for a fee', 'In-seat USB outlet',
+                            'Stream media to your device', 'Carbon emissions estimate: 98 kg'], 'plane_and_crew_by': 'HOP'}
+            for _ in range(2)]
+    return {'flights': legs, 'layovers': [{'duration': 95, 'name': 'Paris Charles de Gaulle Airport', 'id': 'CDG'}],
+            'total_duration': 315, 'carbon_emissions': {'this_flight': 196000, 'typical_for_this_route': 180000,
+                                                        'difference_percent': 9},
+            'price': 240 + i * 7, 'type': 'Round trip', 'airline_logo': 'https://www.gstatic.com/flights/airline_logos/70px/multi.png',
+            'extensions': ['Checked baggage for a fee', 'Bag and fare conditions depend on the return flight'],
+            'departure_token': 'W1siTUFEIiwiMjAyNi0xMC0wMSIsIkNERyIsbnVsbCwiQUYiLCIxMDAwIl1d' * 6,
+            'booking_token': 'WyJDalJJUW1aeFExVmZaVXhTY0VWQlNVSkJZbEZDUnkwdExTMHRMUzB0TFMwdGRtaGhNa0ZCUVVGQlIyTkxhVFpqVFRVdGJVRkJFZ1ZCUmpFd01Ea2FDd2lRZ2hNUUFob0RWVk5FT0JwdzRuQT0iXQ==' * 4}
+
+
+def flights_response(options=80):
+    return {'search_metadata': {'id': 'x' * 24, 'status': 'Success', 'json_endpoint': 'https://serpapi.com/searches/x.json',
+                                'google_flights_url': 'https://www.google.com/travel/flights?' + 'q' * 300},
+            'search_parameters': {'engine': 'google_flights', 'departure_id': 'MAD', 'arrival_id': 'LHR'},
+            'best_flights': [_flight_option(i) for i in range(4)],
+            'other_flights': [_flight_option(i) for i in range(4, options)],
+            'price_insights': {'lowest_price': 240, 'price_level': 'typical', 'typical_price_range': [230, 420],
+                               'price_history': [[1_700_000_000 + d * 86400, 250 + d % 40] for d in range(60)]},
+            'airports': [{'departure': [{'airport': _airport('MAD', ''), 'city': 'Madrid', 'country': 'Spain',
+                                         'image': 'https://lh3.googleusercontent.com/' + 'i' * 80}]}]}
+
+
+def _hotel(i):
+    return {'type': 'hotel', 'name': f'Hotel {i}', 'description': 'Relaxed rooms in a refined hotel near the river. ' * 3,
+            'link': f'https://hotel{i}.example.com', 'property_token': 'ChcI' + 't' * 60, 'serpapi_property_details_link':
+            'https://serpapi.com/search.json?' + 'p' * 200, 'gps_coordinates': {'latitude': 51.5 + i / 1000, 'longitude': -0.12},
+            'check_in_time': '3:00 PM', 'check_out_time': '11:00 AM',
+            'rate_per_night': {'lowest': '$180', 'extracted_lowest': 180, 'before_taxes_fees': '$150',
+                               'extracted_before_taxes_fees': 150},
+            'total_rate': {'lowest': '$540', 'extracted_lowest': 540, 'before_taxes_fees': '$450',
+                           'extracted_before_taxes_fees': 450},
+            'prices': [{'source': f'Source {n}', 'logo': 'https://www.gstatic.com/travel-hotels/branding/' + 'l' * 40,
+                        'rate_per_night': {'lowest': '$180', 'extracted_lowest': 180}} for n in range(8)],
+            'nearby_places': [{'name': f'Place {n}', 'transportations': [{'type': 'Taxi', 'duration': '8 min'},
+                                                                         {'type': 'Public transport', 'duration': '20 min'}]}
+                              for n in range(4)],
+            'hotel_class': '4-star hotel', 'extracted_hotel_class': 4,
+            'images': [{'thumbnail': f'https://lh5.googleusercontent.com/p/{i}-{n}=w300', 'original_image':
+                        f'https://lh5.googleusercontent.com/p/{i}-{n}=s10000' + 'o' * 60} for n in range(25)],
+            'overall_rating': 4.4, 'reviews': 2310 + i, 'location_rating': 4.8,
+            'reviews_breakdown': [{'name': name, 'description': f'{name} description', 'total_mentioned': 300,
+                                   'positive': 250, 'negative': 30, 'neutral': 20}
+                                  for name in ('Property', 'Service', 'Location', 'Bathroom', 'Breakfast', 'Nature')],
+            'amenities': ['Free Wi-Fi', 'Air conditioning', 'Pool', 'Spa', 'Fitness centre', 'Restaurant', 'Bar',
+                          'Room service', 'Airport shuttle', 'Accessible'],
+            'excluded_amenities': ['Pet-friendly', 'Kitchen']}
+
+
+def hotels_response(properties=20):
+    return {'search_metadata': {'id': 'x' * 24, 'status': 'Success'},
+            'search_parameters': {'engine': 'google_hotels', 'q': 'London'},
+            'brands': [{'id': n, 'name': f'Brand {n}', 'children': [{'id': n * 10 + c, 'name': f'Sub {c}'} for c in range(5)]}
+                       for n in range(30)],
+            'properties': [_hotel(i) for i in range(properties)],
+            'serpapi_pagination': {'current_from': 1, 'current_to': properties, 'next_page_token': 'n' * 40}}
+
+
+def full(engine, body):
+    return json.loads(body)
+
+
+def projected(engine, body):
+    return project(engine, json.loads(body))
+
+
+def measure(label, decode, engine, body, runs):
+    tracemalloc.start()
+    result = decode(engine, body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(runs):
+        decode(engine, body)
+    elapsed = (time.perf_counter() - start) / runs
+    held = len(json.dumps(result))
+    print(f'  {label:<18}{held / 1024:>10.1f}{peak / 1024:>12.0f}{elapsed * 1000:>12.2f}')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    for engine, data in (('google_flights', flights_response()), ('google_hotels', hotels_response())):
+        body = json.dumps(data).encode()
+        print(f'\n{engine}: {len(body) / 1024:.0f} KB response')
+        print(f"  {'decode':<18}{'held KB':>10}{'peak KB':>12}{'ms':>12}")
+        measure('full json', full, engine, body, args.runs)
+        measure('json + project', projected, engine, body, args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+SerpApi client against a local stub server: the serpapi package vs agents.tools.serpapi_client.
+
+The stub answers /search and /search.json after a fixed latency. A share of requests
+get 429/503 and a few stall far past the read timeout, as a rate-limited or struggling
+upstream would. Searches are issued from a thread pool, the way concurrent Streamlit
+sessions call the tools. The report shows completed searches, latency percentiles,
+the slowest call and how many TCP connections the server had to accept.
+
+The serpapi package is not a project dependency; `pip install serpapi` to include it as
+the baseline, otherwise only the pooled client runs.
+
+    python benchmarks/bench_serpapi_client.py [--searches 200] [--threads 8] [--latency 0.05] [--error-rate 0.1]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import serpapi
+    from serpapi.http import HTTPClient
+except ImportError:
+    serpapi = None
+
+from agents.tools.serpapi_client import SerpApiClient  # noqa: E402
+
+BODY = b'{"best_flights": [{"price": 700, "flights": []}], "search_metadata": {"status": "Success"}}'
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, error_rate, stall_rate, stall_seconds, seed=7):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like serpapi.com
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            roll = server.random.random()
+        if roll < server.stall_rate:
+            time.sleep(server.stall_seconds)
+        time.sleep(server.latency)
+        status, body = 200, BODY
+        if roll > 1 - server.error_rate:
+            status, body = (429, b'{"error": "Rate limited"}') if roll > 1 - server.error_rate / 2 \
+                else (503, b'{"error": "Service unavailable"}')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label, search, searches, threads, server):
+    server.connections = 0
+    params = {'engine': 'google_flights', 'api_key': 'benchmark', 'departure_id': 'MAD', 'arrival_id': 'LHR'}
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            search(dict(params))
+            ok = True
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(searches)))
+    wall = time.perf_counter() - start
+    timings = sorted(t for _, t in results)
+    ok = sum(1 for ok, _ in results if ok)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f'{label:<10}{ok:>6}/{searches:<6}{statistics.median(timings) * 1000:>10.0f}{p95 * 1000:>10.0f}'
+          f'{timings[-1] * 1000:>10.0f}{wall:>9.2f}{server.connections:>8}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--searches', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub response time (seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='Share of responses that are 429/503')
+    parser.add_argument('--stall-rate', type=float, default=0.02, help='Share of requests that stall')
+    parser.add_argument('--stall', type=float, default=5.0, help='How long a stalled request hangs (seconds)')
+    parser.add_argument('--read-timeout', type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = StubServer(args.latency, args.error_rate, args.stall_rate, args.stall)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = SerpApiClient(base_url=server.url, read_timeout=args.read_timeout, backoff_seconds=0.05)
+
+    print(f"{'client':<10}{'completed':>13}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'wall s':>9}{'conns':>8}")
+    if serpapi is not None:
+        HTTPClient.BASE_DOMAIN = server.url
+        run('serpapi', lambda params: serpapi.search(params).data, args.searches, args.threads, server)
+    run('pooled', client.search, args.searches, args.threads, server)
+    print(f'\npooled client: {client.stats}')
+    client.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
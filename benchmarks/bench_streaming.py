@@ -0,0 +1,79 @@
+"""
+Time-to-first-content versus total latency of a streamed itinerary.
+
+Runs the compiled graph with a stubbed tool-calling LLM and a stubbed SerpApi
+(flights answer faster than hotels, as in production) and records when each
+itinerary section event arrives.
+
+    python benchmarks/bench_streaming.py [--llm 1.0] [--flights 1.0] [--hotels 2.0]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+os.environ['SEARCH_CACHE_ENABLED'] = '0'
+
+from langchain_core.callbacks import BaseCallbackHandler  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+
+from agents.agent import Agent  # noqa: E402
+from agents.streaming import ITINERARY_SECTION_EVENT  # noqa: E402
+from agents.tools import serpapi_client  # noqa: E402
+
+QUERY = 'I want to travel from madrid to london from 1st oct to 7th oct 2026. Find me flights and 4 star hotels'
+
+
+class SectionTimer(BaseCallbackHandler):
+
+    def __init__(self, start):
+        self.start = start
+        self.sections = []
+
+    def on_custom_event(self, name, data, **kwargs):
+        if name == ITINERARY_SECTION_EVENT:
+            self.sections.append((data['section'], time.perf_counter() - self.start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--llm', type=float, default=1.0, help='Stubbed tool-calling LLM latency (seconds)')
+    parser.add_argument('--flights', type=float, default=1.0, help='Stubbed flights search latency (seconds)')
+    parser.add_argument('--hotels', type=float, default=2.0, help='Stubbed hotels search latency (seconds)')
+    args = parser.parse_args()
+
+    def search(params):
+        if params['engine'] == 'google_flights':
+            time.sleep(args.flights)
+            return {'best_flights': [{'flights': [], 'price': 700}]}
+        time.sleep(args.hotels)
+        return {'properties': [{'name': 'Stub Hotel'}]}
+    serpapi_client.search = search
+
+    def tools_llm(messages):
+        time.sleep(args.llm)
+        return AIMessage(content='', tool_calls=[{'name': 'flights_finder', 'args': {}, 'id': 'bench'}])
+
+    agent = Agent()
+    agent._tools_llm = RunnableLambda(tools_llm)
+
+    start = time.perf_counter()
+    timer = SectionTimer(start)
+    config = {'configurable': {'thread_id': str(uuid.uuid4())}, 'callbacks': [timer]}
+    for _ in agent.graph.stream({'messages': [HumanMessage(content=QUERY)]}, config=config, stream_mode='updates'):
+        pass
+    total = time.perf_counter() - start
+
+    for section, elapsed in timer.sections:
+        print(f'{section:12s} rendered after {elapsed:6.2f}s')
+    first = timer.sections[0][1] if timer.sections else total
+    print(f'total graph run:          {total:6.2f}s')
+    print(f'time to first content:    {first:6.2f}s ({first / total:.0%} of total; blocking invoke showed nothing until the end)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Top-k flight + hotel combinations within a budget: full cross product vs the heap.
+
+For each size (options per side) the k cheapest trips and the k best-scoring trips
+under each budget are found three ways: every pair priced in Python and sorted, every
+pair priced with NumPy broadcasting (an n x m matrix, then argpartition), and
+agents.trip_budget, which sorts each side once and takes pairs off a heap. All three
+must agree; the report shows milliseconds per query, table building included. The
+tight budget leaves most flights only a few expensive-to-find affordable hotels.
+
+    python benchmarks/bench_trip_budget.py [--sizes 10,100,1000] [--k 5] [--budgets 1500,400]
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from agents.ranking import (FLIGHT_CRITERIA, FLIGHT_WEIGHTS, HOTEL_CRITERIA, HOTEL_WEIGHTS,  # noqa: E402
+                            flight_table, hotel_table, score, weights_for)
+from agents.trip_budget import best_trips, cheapest_trips  # noqa: E402
+
+
+def flights(n, rng):
+    return [{'price': rng.randint(90, 1200), 'total_duration': rng.randint(80, 1500),
+             'layovers': [{'id': 'CDG'}] * rng.choice((0, 0, 1, 1, 2))} for _ in range(n)]
+
+
+def hotels(n, rng):
+    return [{'name': f'Hotel {i}', 'total_rate': {'extracted_lowest': rng.randint(150, 3000)},
+             'overall_rating': round(rng.uniform(3, 5), 1), 'reviews': rng.randint(0, 8000),
+             'extracted_hotel_class': rng.randint(2, 5)} for i in range(n)]
+
+
+def _scores(flight_options, hotel_options):
+    flight_score = score(flight_table(flight_options), FLIGHT_CRITERIA, weights_for(FLIGHT_WEIGHTS))
+    hotel_score = score(hotel_table(hotel_options), HOTEL_CRITERIA, weights_for(HOTEL_WEIGHTS))
+    return flight_score.tolist(), hotel_score.tolist()
+
+
+def python_cheapest(flight_options, hotel_options, budget, k):
+    pairs = [(f['price'] + h['total_rate']['extracted_lowest'], i, j)
+             for i, f in enumerate(flight_options) for j, h in enumerate(hotel_options)]
+    return [total for total, _, _ in heapq.nsmallest(k, (p for p in pairs if p[0] <= budget))]
+
+
+def python_best(flight_options, hotel_options, budget, k):
+    flight_score, hotel_score = _scores(flight_options, hotel_options)
+    pairs = [(-(flight_score[i] + hotel_score[j]), f['price'] + h['total_rate']['extracted_lowest'])
+             for i, f in enumerate(flight_options) for j, h in enumerate(hotel_options)]
+    return sorted(-s for s, total in pairs if total <= budget)[::-1][:k]
+
+
+def numpy_cheapest(flight_options, hotel_options, budget, k):
+    totals = flight_table(flight_options).columns['price'][:, None] + hotel_table(hotel_options).columns['price'][None]
+    totals = totals[totals <= budget]
+    return np.sort(np.partition(totals, min(k, len(totals)) - 1)[:k]).tolist() if len(totals) else []
+
+
+def numpy_best(flight_options, hotel_options, budget, k):
+    flight, hotel = flight_table(flight_options), hotel_table(hotel_options)
+    totals = flight.columns['price'][:, None] + hotel.columns['price'][None]
+    scores = (score(flight, FLIGHT_CRITERIA, weights_for(FLIGHT_WEIGHTS))[:, None]
+              + score(hotel, HOTEL_CRITERIA, weights_for(HOTEL_WEIGHTS))[None])
+    scores = scores[totals <= budget]
+    return (-np.sort(-scores)[:k]).tolist()
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    return result, (time.perf_counter() - start) / runs * 1000
+
+
+def report(flight_options, hotel_options, budget, k, runs, heap_runs):
+    size = len(flight_options)
+    for label, python, vectorized, heap in (
+        ('cheapest', python_cheapest, numpy_cheapest,
+         lambda: [t for _, _, t in cheapest_trips(flight_options, hotel_options, budget, k)]),
+        ('best', python_best, numpy_best, lambda: best_trips(flight_options, hotel_options, budget, k)),
+    ):
+        expected, python_ms = timed(lambda: python(flight_options, hotel_options, budget, k), runs)
+        by_numpy, numpy_ms = timed(lambda: vectorized(flight_options, hotel_options, budget, k), heap_runs)
+        trips, heap_ms = timed(heap, heap_runs)
+        assert np.allclose(by_numpy, expected), label
+        if label == 'cheapest':
+            assert trips == expected, label
+        else:
+            flight_score, hotel_score = _scores(flight_options, hotel_options)
+            got = [flight_score[flight_options.index(f)] + hotel_score[hotel_options.index(h)] for f, h, _ in trips]
+            assert np.allclose(got, expected), label
+        print(f'{label:<10}{budget:>8,.0f}{size:>9}{size * size:>10,}{python_ms:>12.2f}{numpy_ms:>11.2f}{heap_ms:>10.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated options per side')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--budgets', default='1500,400', help='Comma-separated trip budgets')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print(f"{'query':<10}{'budget':>8}{'per side':>9}{'pairs':>10}{'python ms':>12}{'numpy ms':>11}{'heap ms':>10}")
+    for size in [int(n) for n in args.sizes.split(',')]:
+        flight_options, hotel_options = flights(size, rng), hotels(size, rng)
+        runs = 1 if size >= 1000 else args.runs
+        for budget in [float(b) for b in args.budgets.split(',')]:
+            report(flight_options, hotel_options, budget, args.k, runs, args.runs)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Import-time startup report for the app's entry modules, built on `python -X importtime`.
+
+Each module is imported in a fresh interpreter; the report shows its cumulative import
+time, the heaviest packages it pulled in, and whether any of the dependencies that are
+meant to load on first use (OpenAI, SendGrid, Playwright, SerpApi, ...) were imported
+at startup. With --history the results are appended as one JSON line per run, so the
+numbers can be tracked across commits.
+
+    python benchmarks/startup_report.py [--modules agents.agent app] [--runs 3] [--history .cache/startup.jsonl]
+"""
+import argparse
+import datetime
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ['app', 'agents.agent', 'agents.itinerary', 'agents.pdf']
+# Loaded on first use; importing any of them at startup is a regression
+LAZY_PACKAGES = ['langchain_openai', 'openai', 'langchain_groq', 'groq', 'sendgrid', 'playwright', 'serpapi', 'PIL']
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$')
+
+
+def import_times(module):
+    """[(package, self_us, cumulative_us)] for importing `module`, or None if the import failed."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE='1'))
+    if result.returncode != 0:
+        print(f'  {module}: import failed ({result.stderr.strip().splitlines()[-1]})')
+        return None
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(3), int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def summarize(rows, module, top):
+    by_package = {}
+    for package, _self_us, cumulative in rows:
+        root = package.split('.')[0]
+        # The first import of a root package includes everything it pulled in
+        if package == root and root != 'site':  # site is interpreter startup, not the module
+            by_package[root] = max(by_package.get(root, 0), cumulative)
+    total = next((cumulative for package, _, cumulative in rows if package == module), 0)
+    heaviest = sorted(((p, us) for p, us in by_package.items() if p != module.split('.')[0]), key=lambda x: -x[1])[:top]
+    eager = [package for package in LAZY_PACKAGES if package in by_package]
+    return {'total_ms': total / 1000, 'modules': len(rows), 'heaviest': [[p, us / 1000] for p, us in heaviest],
+            'eager_lazy_packages': eager}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES)
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters per module; the median total is reported')
+    parser.add_argument('--top', type=int, default=8, help='Heaviest packages to list per module')
+    parser.add_argument('--history', help='Append the results as a JSON line to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for module in args.modules:
+        runs = [rows for rows in (import_times(module) for _ in range(args.runs)) if rows]
+        if not runs:
+            continue
+        summaries = [summarize(rows, module, args.top) for rows in runs]
+        summary = summaries[-1]
+        summary['total_ms'] = statistics.median(s['total_ms'] for s in summaries)
+        results[module] = summary
+
+        print(f"\n{module}: {summary['total_ms']:.0f} ms, {summary['modules']} modules imported")
+        for package, ms in summary['heaviest']:
+            print(f'  {package:<28}{ms:>9.1f} ms')
+        eager = summary['eager_lazy_packages']
+        print(f"  loaded at startup (should be lazy): {', '.join(eager) if eager else 'none'}")
+
+    if args.history and results:
+        record = {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': _git_commit(),
+                  'python': sys.version.split()[0], 'results': results}
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        print(f'\nAppended to {args.history}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Display-sized variants of the page images under images/, built once and kept in memory.
+
+The originals are far larger than they are shown (c.jpg is 4500px wide, ai-travel.png is
+really a WebP), so st.image used to read, decode and downscale or re-encode them on every
+rerun. Each placement gets a JPEG at twice its CSS width for high-DPI screens, stored
+under UI_IMAGE_CACHE (default .cache/ui_images in the project root, wherever the app
+is started from) keyed by the source's size and mtime.
+Streamlit passes bytes that are already JPEG and narrow enough through untouched, and
+since its media URLs hash the content, browsers keep reusing the same files.
+
+    python -m ui.images    # build every variant ahead of the first page load
+"""
+import io
+import os
+from functools import lru_cache
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGES_DIR = os.path.join(PROJECT_ROOT, 'images')
+IMAGE_CACHE_DIR = os.path.join(PROJECT_ROOT, os.getenv('UI_IMAGE_CACHE', os.path.join('.cache', 'ui_images')))
+JPEG_QUALITY = 82
+
+# Pixel width per placement: CSS width x 2. st.image downsizes anything wider than
+# 1460px (2 x the 730px content column) itself, so the hero stops there.
+SLOTS = {
+    'hero': 1460,
+    'gallery': 480,
+    'sidebar': 600,
+}
+
+# What the page shows in each placement, top to bottom
+PAGE_IMAGES = {
+    'hero': ['a.jpg'],
+    'gallery': ['b.jpg', 'c.jpg', 'ai-travel.png'],
+    'sidebar': ['b.jpg', 'c.jpg', 'ai-travel.png'],
+}
+
+
+def _encode(path, width):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        if image.mode != 'RGB':
+            # The page background is white; flatten any transparency onto it
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+            image = background
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def image_variant(name, slot):
+    """JPEG bytes of images/`name` sized for `slot`, or None if the image does not exist."""
+    path = os.path.join(IMAGES_DIR, name)
+    if not os.path.isfile(path):
+        return None
+    stat = os.stat(path)
+    width = SLOTS[slot]
+    stem = os.path.splitext(name)[0]
+    cached = os.path.join(IMAGE_CACHE_DIR, f'{stem}-{width}w-{stat.st_size:x}-{stat.st_mtime_ns:x}.jpg')
+    if os.path.isfile(cached):
+        with open(cached, 'rb') as f:
+            return f.read()
+
+    data = _encode(path, width)
+    os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+    partial = f'{cached}.{os.getpid()}.tmp'
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, cached)
+    return data
+
+
+def page_images(slot):
+    """Bytes of the images shown in `slot`, in page order, leaving out missing ones."""
+    return [data for data in (image_variant(name, slot) for name in PAGE_IMAGES[slot]) if data is not None]
+
+
+def build_all():
+    """Build the variant of every image the page shows; returns {(name, slot): bytes}."""
+    variants = {}
+    for slot, names in PAGE_IMAGES.items():
+        for name in names:
+            data = image_variant(name, slot)
+            if data is not None:
+                variants[name, slot] = data
+    return variants
+
+
+if __name__ == '__main__':
+    for (name, slot), data in build_all().items():
+        original = os.path.getsize(os.path.join(IMAGES_DIR, name))
+        print(f'{name:<18}{slot:<10}{original / 1024:>9.0f} KB -> {len(data) / 1024:>6.0f} KB')
@@ -0,0 +1,38 @@
+"""
+The page theme, kept in static/theme.css and linked from the page instead of inlined.
+
+Streamlit resends every element on every rerun, so the ~500-line <style> block used to
+cross the websocket again with each click of every session. The stylesheet is now read
+once per process and published through Streamlit's media endpoint, whose file IDs are a
+hash of the content: the URL is fingerprinted, changes whenever the CSS does, and the
+browser fetches it once and revalidates it by ETag. A rerun only sends the <link> tag.
+
+The app/static route (server.enableStaticServing) is not used because Streamlit serves
+anything but images from it as text/plain with `nosniff`, which browsers refuse to apply
+as a stylesheet.
+"""
+import os
+from functools import lru_cache
+
+THEME_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'theme.css')
+# Media files are tracked per session and position; the theme has a fixed slot of its own
+_THEME_COORDINATES = 'ui.theme'
+
+
+@lru_cache(maxsize=1)
+def theme_css():
+    with open(THEME_PATH, 'rb') as f:
+        return f.read()
+
+
+def stylesheet_link():
+    """Markup that applies the theme: a <link> when served by Streamlit, else an inline <style>."""
+    from streamlit import config, runtime
+
+    if not runtime.exists():
+        return f'<style>\n{theme_css().decode()}</style>'
+    # Re-registered on every run: Streamlit drops media a session stops referencing
+    url = runtime.get_instance().media_file_mgr.add(theme_css(), 'text/css', _THEME_COORDINATES)
+    base = config.get_option('server.baseUrlPath').strip('/')
+    href = f"/{base}{url}" if base else url
+    return f'<link rel="stylesheet" href="{href}">'